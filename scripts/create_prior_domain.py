@@ -36,14 +36,12 @@ import pathlib
 
 import click
 import numpy as np
-import rasterio
-import rioxarray as rxr
 import xarray as xr
 
 from openmethane_prior.lib.cell_name import encode_grid_cell_name
 from openmethane_prior.lib.grid.create_grid import create_grid_from_mcip
 from openmethane_prior.lib.grid.grid import Grid
-from openmethane_prior.lib.raster import remap_raster
+from openmethane_prior.lib.raster import remap_geotiff
 from openmethane_prior.lib.utils import bounds_from_cell_edges, get_timestamped_command, get_version
 import openmethane_prior.lib.logger as logger
 
@@ -224,34 +222,17 @@ def create_mask_from_geotiff(
     geotiff_file: pathlib.Path,
     grid: Grid,
 ) -> np.array:
-    # this seems to need two approaches since rioxarray
-    # seems to always convert to float which we don't want but we need it for the other tif attributes
-    geo_xr = rxr.open_rasterio(geotiff_file, masked=True)
-    geo_x = geo_xr.x
-    geo_y = geo_xr.y
-    geo_crs = geo_xr.rio.crs
-    geo_xr.close()
-
-    geo_rio = rasterio.open(
+    # a cell is land if more than half of its pixels are, which is when
+    # land pixels (+1) outnumber the others (-1). only the part of the
+    # GeoTIFF covering the grid is read, one block of rows at a time
+    land_balance = remap_geotiff(
         geotiff_file,
-        engine='rasterio',
-    ).read()
-    geo_rio = geo_rio.squeeze()
-    geo_rio[geo_rio != 0] = 1 # now pure land-oc mask
-    sector_xr = xr.DataArray(geo_rio, coords={ 'y': geo_y, 'x': geo_x  })
-
-    # now aggregate to coarser resolution of the domain grid
-    mask_np = remap_raster(sector_xr, grid, input_crs=geo_crs)
-
-    # now count pixels in each coarse gridcell by aggregating array of 1
-    geo_rio[...] = 1
-    count_mask = remap_raster(sector_xr, grid, input_crs=geo_crs)
-    has_vals = count_mask > 0
-    mask_np[has_vals] /= count_mask[has_vals]
-    # binary choice land or ocean
-    mask_np = np.where( mask_np > 0.5, 1., 0.)
+        grid,
+        block_values=lambda block: np.where(block != 0, 1.0, -1.0),
+    )
 
-    return mask_np
+    # binary choice land or ocean
+    return np.where(land_balance > 0, 1., 0.)
 
 
 def write_domain_info(domain_ds: xr.Dataset, domain_path: pathlib.Path):
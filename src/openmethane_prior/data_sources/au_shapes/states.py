@@ -17,7 +17,7 @@
 #
 import pathlib
 
-from openmethane_prior.lib.data_manager.fetchers import fetch_zipped_shp_to_gdf
+from openmethane_prior.lib.data_manager.fetchers import fetch_zipped_shp_to_gdf, write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 from openmethane_prior.lib import (
     DataSource,
@@ -45,7 +45,7 @@ def map_state_name_to_short_name(state_name: str) -> str | None:
 
 
 def fetch_au_states(data_source: ConfiguredDataSource) -> pathlib.Path:
-    """Fetch a zipped Shapefile (.shp) and convert to GeoJSON using geopandas."""
+    """Fetch a zipped Shapefile (.shp) and convert to GeoPackage using geopandas."""
     # fetch the zipfile in data_source.url and read the included Shapefile
     gdf = fetch_zipped_shp_to_gdf(data_source.url, "STE_2021_AUST_GDA2020.shp")
 
@@ -57,17 +57,15 @@ def fetch_au_states(data_source: ConfiguredDataSource) -> pathlib.Path:
     gdf = gdf[["code", "name", "area_sqkm", "geometry"]]
     gdf["short_name"] = gdf["name"].map(map_state_name_to_short_name)
 
-    # write the data as geojson
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(gdf.to_json())
-
-    return data_source.asset_path
+    return write_geopackage(gdf, data_source.asset_path)
 
 
 au_shapes_states_data_source = DataSource(
     name="AU-states",
     url="https://www.abs.gov.au/statistics/standards/australian-statistical-geography-standard-asgs-edition-3/jul2021-jun2026/access-and-downloads/digital-boundary-files/STE_2021_AUST_SHP_GDA2020.zip",
-    file_path='AU-states.geojson',
+    file_path='AU-states.gpkg',
     fetch=fetch_au_states,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
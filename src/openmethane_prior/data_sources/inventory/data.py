@@ -96,6 +96,7 @@ inventory_data_source = DataSource(
     url="https://greenhouseaccounts.climatechange.gov.au/OData/AR5_ParisInventory_AUSTRALIA",
     data_sources=[unfccc_codes_data_source],
     parse=parse_inventory,
+    cache_parsed=True,
 )
 
 
@@ -104,6 +105,7 @@ qld_inventory_data_source = DataSource(
     url="https://greenhouseaccounts.climatechange.gov.au/OData/AR5_ParisInventory_QLD",
     data_sources=[unfccc_codes_data_source],
     parse=parse_inventory,
+    cache_parsed=True,
 )
 
 
@@ -1,2 +1,3 @@
 from .data import alum_sector_mapping_data_source, landuse_map_data_source
-from .alum import alum_codes_for_sector
\ No newline at end of file
+from .alum import alum_codes_for_sector
+from .counts import LanduseCounts, landuse_counts_data_source
@@ -0,0 +1,112 @@
+#
+# Copyright 2026 The Superpower Institute Ltd.
+#
+# This file is part of Open Methane.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pathlib
+
+import attrs
+import numpy as np
+import xarray as xr
+
+from openmethane_prior.data_sources.inventory import inventory_domain_data_source
+from openmethane_prior.lib import ConfiguredDataSource
+from openmethane_prior.lib.grid.grid import Grid
+from openmethane_prior.lib.raster import (
+    cached_raster_cell_index,
+    count_raster_categories,
+    open_raster_window,
+)
+
+from .data import alum_sector_mapping_data_source, landuse_map_data_source
+
+
+@attrs.define()
+class LanduseCounts:
+    """
+    Number of land use map pixels of each ALUM code in every cell of the
+    domain grid and the inventory grid, as (code, y, x) cubes. Sectors
+    select the codes they need with alum_codes_for_sector.
+    """
+
+    domain: xr.DataArray
+    """Pixel counts by ALUM code for each cell of the domain grid"""
+
+    inventory: xr.DataArray
+    """Pixel counts by ALUM code for each cell of the inventory grid"""
+
+    def sector_pixels(self, alum_codes: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Total pixel count for the provided ALUM codes in each cell of the
+        domain grid and the inventory grid.
+        """
+        return _sum_codes(self.domain, alum_codes), _sum_codes(self.inventory, alum_codes)
+
+
+def _sum_codes(counts: xr.DataArray, alum_codes: list[int]) -> np.ndarray:
+    selected = counts.code.isin(alum_codes).to_numpy()
+    return counts.to_numpy()[selected].sum(axis=0, dtype=np.float64)
+
+
+def count_landuse(
+    landuse_path: pathlib.Path,
+    alum_codes: np.ndarray,
+    grid: Grid,
+    cache_path: pathlib.Path,
+) -> xr.DataArray:
+    """Count land use pixels of each ALUM code in every cell of grid. Only
+    the part of the land use map covering the grid is read.
+    """
+    with open_raster_window(landuse_path, grid) as landuse:
+        cell_index = cached_raster_cell_index(
+            cache_path, landuse.x, landuse.y, landuse.crs, grid, landuse.block_rows,
+        )
+        counts = count_raster_categories(landuse, alum_codes, cell_index, grid, landuse.block_rows)
+
+    return xr.DataArray(counts, dims=("code", "y", "x"), coords={"code": alum_codes})
+
+
+def parse_landuse_counts(data_source: ConfiguredDataSource) -> LanduseCounts:
+    """Count the land use pixels of every ALUM code used by a sector, in the
+    domain grid and the inventory grid.
+    """
+    prior_config = data_source.prior_config
+    sector_mapping, inventory_domain = (asset.data for asset in data_source.data_assets)
+
+    # count every ALUM code assigned to a sector, so any land use based sector
+    # can be calculated from the same counts
+    alum_codes = np.unique(sector_mapping.iloc[:, 0].astype(int).to_numpy())
+
+    return LanduseCounts(
+        domain=count_landuse(
+            data_source.asset_path, alum_codes,
+            grid=prior_config.domain().grid,
+            cache_path=prior_config.intermediates_path,
+        ),
+        inventory=count_landuse(
+            data_source.asset_path, alum_codes,
+            grid=inventory_domain.grid,
+            cache_path=prior_config.intermediates_path,
+        ),
+    )
+
+
+# counts are calculated from the same GeoTIFF as landuse_map_data_source,
+# so it is fetched and stored in the same way
+landuse_counts_data_source = attrs.evolve(
+    landuse_map_data_source,
+    name="landuse-counts",
+    parse=parse_landuse_counts,
+    data_sources=[alum_sector_mapping_data_source, inventory_domain_data_source],
+)
@@ -40,18 +40,21 @@ def parse_ntlt_data_source(data_source: ConfiguredDataSource):
     ntlt = ntlData.sum(axis=0)
     np.nan_to_num(ntlt, copy=False)
 
-    om_ntlt = remap_raster(ntlt, domain.grid)
+    om_ntlt = remap_raster(ntlt, domain.grid, cache_path=prior_config.intermediates_path)
 
     # limit emissions to land points
     inventory_mask_regridded = regrid_data(
         inventory_domain.dataset["inventory_mask"],
         from_grid=inventory_domain.grid,
         to_grid=domain.grid,
+        cache_path=prior_config.intermediates_path,
     )
     om_ntlt *= inventory_mask_regridded
 
     # now collect total nightlights across inventory domain
-    inventory_ntlt = remap_raster(ntlt, inventory_domain.grid)
+    inventory_ntlt = remap_raster(
+        ntlt, inventory_domain.grid, cache_path=prior_config.intermediates_path
+    )
 
     # now mask to region of inventory
     inventory_ntlt *= inventory_domain.dataset["inventory_mask"]
@@ -64,5 +67,7 @@ night_lights_data_source = DataSource(
     name="nighttime-lights",
     url="https://openmethane.s3.amazonaws.com/prior/inputs/nasa-nighttime-lights.tiff",
     parse=parse_ntlt_data_source,
+    cache_parsed=True,
+    parse_uses_domain="grid",
     data_sources=[inventory_domain_data_source],
 )
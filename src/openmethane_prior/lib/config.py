@@ -1,17 +1,17 @@
 import argparse
-
-import attrs
-from attrs import field, frozen
-from attrs.converters import default_if_none
 import datetime
-from environs import Env
-from functools import cache
 import os
 import pathlib
 import shutil
-from typing import Self
 import urllib.request
+from functools import cache
+from typing import Self
+
+import attrs
 import yaml
+from attrs import field, frozen
+from attrs.converters import default_if_none
+from environs import Env
 
 from .grid.domain import Domain
 
@@ -60,6 +60,45 @@ class PriorConfig:
     input_cache: pathlib.Path = None
     """If provided, a local path where remote inputs can be cached."""
 
+    regrid_workers: int = field(
+        default=None, converter=default_if_none(1),
+    )
+    """Number of processes used to calculate regridding weights when they
+    are not already cached."""
+
+    regrid_chunk_size: int = field(
+        default=None, converter=default_if_none(32),
+    )
+    """Number of time steps of a gridded input which are read and regridded
+    at once. Limits peak memory use when regridding long input periods."""
+
+    regrid_dask: bool = field(
+        default=None, converter=default_if_none(False),
+    )
+    """If True, gridded inputs are opened as dask arrays in chunks of
+    regrid_chunk_size and regridded lazily. Requires the optional dask
+    dependency."""
+
+    jobs: int = field(
+        default=None, converter=default_if_none(1),
+    )
+    """Number of sectors which are calculated concurrently."""
+
+    parse_cache: bool = field(
+        default=None, converter=default_if_none(False),
+    )
+    """If True, parsed data sources which allow it are saved in
+    intermediates_path and reused by later runs. Tabular data requires the
+    optional pyarrow dependency."""
+
+    def input_chunks(self, dim: str) -> dict[str, int] | None:
+        """Chunks to use when opening a gridded input with xarray, which will
+        be None unless regrid_dask is enabled.
+        """
+        if not self.regrid_dask:
+            return None
+        return {dim: self.regrid_chunk_size}
+
     # __attrs_post_init__ is called automatically after the __init__ generated
     # by attrs has run.
     # @see: https://www.attrs.org/en/stable/init.html
@@ -168,6 +207,11 @@ class PriorConfig:
             static_path=env.path("STATIC_INPUTS", None),
             input_cache=env.path("INPUT_CACHE", None),
             output_filename=env.str("OUTPUT_FILENAME", None),
+            regrid_workers=env.int("REGRID_WORKERS", None),
+            regrid_chunk_size=env.int("REGRID_CHUNK_SIZE", None),
+            regrid_dask=env.bool("REGRID_DASK", None),
+            jobs=env.int("JOBS", None),
+            parse_cache=env.bool("PARSE_CACHE", None),
             sectors=sectors if len(sectors) > 0 else None,
         )
 
@@ -211,6 +255,12 @@ def parse_cli_args():
         default=None,
         help="list of sectors to process, comma-separated",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of sectors to calculate concurrently",
+    )
 
     return parser.parse_args()
 
@@ -228,4 +278,7 @@ def parse_cli_to_env():
         os.environ["END_DATE"] = args.end_date.strftime("%Y-%m-%d")
 
     if args.sectors is not None:
-        os.environ["SECTORS"] = args.sectors
\ No newline at end of file
+        os.environ["SECTORS"] = args.sectors
+
+    if args.jobs is not None:
+        os.environ["JOBS"] = str(args.jobs)
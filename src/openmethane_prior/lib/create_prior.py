@@ -15,12 +15,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import xarray as xr
+
+from openmethane_prior.lib import logger
+
 from .config import PriorConfig
 from .data_manager.manager import DataManager
-from .outputs import create_output_dataset, add_ch4_total, add_sector
+from .outputs import add_ch4_total, add_sector, create_output_dataset
 from .sector.config import PriorSectorConfig
 from .sector.sector import PriorSector
 
+logger = logger.get_logger(__name__)
+
 
 def create_prior(config: PriorConfig, sectors: list[PriorSector]):
     """
@@ -52,9 +62,13 @@ def create_prior(config: PriorConfig, sectors: list[PriorSector]):
         if not callable(sector.create_estimate):
             raise ValueError("PriorSector module must include a create_estimate function")
 
-        # calculate the emissions for the sector
-        sector_data = sector.create_estimate(sector, sector_config, prior_ds)
+    # prepare all the data used by the sectors up front, so independent data
+    # sources can be fetched and parsed concurrently
+    data_manager.prefetch(sectors, workers=config.jobs)
 
+    # calculate the emissions for each sector, and add them to the output in
+    # the order the sectors were provided
+    for sector, sector_data in estimate_sectors(sectors, sector_config, prior_ds, jobs=config.jobs):
         # add the sector emissions to the output
         add_sector(
             prior_ds=prior_ds,
@@ -68,3 +82,36 @@ def create_prior(config: PriorConfig, sectors: list[PriorSector]):
     config.cache_inputs()
 
     return prior_ds
+
+
+def estimate_sectors(
+    sectors: list[PriorSector],
+    sector_config: PriorSectorConfig,
+    prior_ds: xr.Dataset,
+    jobs: int = 1,
+) -> Iterator[tuple[PriorSector, Any]]:
+    """
+    Calculate the emissions estimate for each sector, yielding each sector
+    with its estimate in the same order as sectors.
+
+    If jobs is more than 1, up to jobs sectors are calculated concurrently
+    in a thread pool. Sectors share the DataManager in sector_config, so
+    each data asset is only fetched and parsed once.
+    """
+    if jobs <= 1 or len(sectors) <= 1:
+        for sector in sectors:
+            yield sector, sector.create_estimate(sector, sector_config, prior_ds)
+        return
+
+    logger.info(f"Calculating {len(sectors)} sectors with {jobs} jobs")
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="sector")
+    try:
+        futures = [
+            executor.submit(sector.create_estimate, sector, sector_config, prior_ds)
+            for sector in sectors
+        ]
+        for sector, future in zip(sectors, futures):
+            yield sector, future.result()
+    finally:
+        # if any sector fails, don't start any sectors which are still waiting
+        executor.shutdown(wait=True, cancel_futures=True)
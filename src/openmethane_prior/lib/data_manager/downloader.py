@@ -0,0 +1,392 @@
+#
+# Copyright 2026 The Superpower Institute Ltd.
+#
+# This file is part of Open Methane.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Thread-safe HTTP downloads with connection reuse, retries and resume."""
+import base64
+import http.client
+import os
+import pathlib
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import attrs
+
+from openmethane_prior.lib import logger
+
+logger = logger.get_logger(__name__)
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+"""HTTP status codes which indicate a request may succeed if retried"""
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+
+USER_AGENT = f"Python-urllib/{urllib.request.__version__}"
+"""User-Agent sent with every request, the same one urllib sends, as some
+data portals reject requests without one"""
+
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+"""Errors raised when sending a request on a kept-alive connection which the
+server has since closed"""
+
+PARTIAL_SUFFIX = ".part"
+"""Suffix of the temporary file a download is written to, which is kept
+after a failure so the download can be resumed"""
+
+# scheme, host, port and the proxy (if any) which connections are made through
+_HostKey = tuple[str, str, int, str | None]
+
+
+def _proxy_for(url: urllib.parse.SplitResult) -> str | None:
+    """URL of the proxy to fetch url through, using the same HTTP(S)_PROXY
+    and NO_PROXY environment variables as urllib.
+    """
+    proxy = urllib.request.getproxies().get(url.scheme)
+    if proxy is None or urllib.request.proxy_bypass(url.hostname):
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def _host_key(url: urllib.parse.SplitResult) -> _HostKey:
+    default_port = 443 if url.scheme == "https" else 80
+    return url.scheme, url.hostname, url.port or default_port, _proxy_for(url)
+
+
+def _proxy_headers(proxy: urllib.parse.SplitResult) -> dict[str, str]:
+    if proxy.username is None:
+        return {}
+    credentials = (
+        f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+    )
+    return {"Proxy-Authorization": f"Basic {base64.b64encode(credentials.encode()).decode()}"}
+
+
+def _request_target(
+    url: urllib.parse.SplitResult,
+    host_key: _HostKey,
+) -> tuple[str, dict[str, str]]:
+    """Path to request url with, and any headers the proxy needs."""
+    path = url.path or "/"
+    if url.query:
+        path = f"{path}?{url.query}"
+
+    scheme, _, _, proxy = host_key
+    if proxy is not None and scheme == "http":
+        # plain HTTP requests are forwarded by the proxy, which needs the
+        # whole URL. HTTPS requests are tunnelled instead.
+        return url._replace(fragment="").geturl(), _proxy_headers(urllib.parse.urlsplit(proxy))
+    return path, {}
+
+
+VALIDATOR_SUFFIX = ".validator"
+"""Suffix of the file recording the ETag or Last-Modified date of the
+response a partial file was written from"""
+
+
+def partial_path(save_path: pathlib.Path) -> pathlib.Path:
+    """Location of the temporary file used while downloading to save_path."""
+    return save_path.with_name(f".{save_path.name}{PARTIAL_SUFFIX}")
+
+
+def validator_path(save_path: pathlib.Path) -> pathlib.Path:
+    """Location of the file recording which version of the remote file the
+    partial download of save_path belongs to.
+    """
+    return save_path.with_name(f".{save_path.name}{PARTIAL_SUFFIX}{VALIDATOR_SUFFIX}")
+
+
+def _response_validator(response: http.client.HTTPResponse) -> str | None:
+    """Return a value which identifies the version of the file in a
+    response, for use in an If-Range header. Weak ETags can't be used with
+    If-Range.
+    """
+    etag = response.getheader("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return response.getheader("Last-Modified")
+
+
+def _content_range_start(response: http.client.HTTPResponse) -> int | None:
+    """First byte position of a 206 response, from its Content-Range."""
+    content_range = response.getheader("Content-Range", "")
+    unit, _, byte_range = content_range.partition(" ")
+    start, _, _ = byte_range.partition("-")
+    if unit != "bytes" or not start.isdigit():
+        return None
+    return int(start)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Return True if a request which failed with error may succeed if retried.
+    Failures such as an unknown host or an untrusted certificate will fail
+    the same way every time, so are not retried.
+    """
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRY_STATUSES
+    if isinstance(error, socket.gaierror | ssl.SSLCertVerificationError):
+        return False
+    return isinstance(
+        error, ConnectionError | TimeoutError | ssl.SSLEOFError | http.client.HTTPException
+    )
+
+
+def _discard_partial(tmp_path: pathlib.Path, tmp_validator_path: pathlib.Path):
+    tmp_path.unlink(missing_ok=True)
+    tmp_validator_path.unlink(missing_ok=True)
+
+
+@attrs.define()
+class Downloader:
+    """
+    Downloads files over HTTP(S), keeping connections to each host open for
+    reuse by later downloads. A Downloader can be shared between threads,
+    with at most max_per_host requests in flight to any single host.
+
+    Failed requests are retried with exponential backoff, and interrupted
+    downloads resume from the partially written file using HTTP Range
+    requests. An idle connection which the server has closed is replaced
+    without counting as a failed request. Requests are made through the proxy configured in the
+    HTTP_PROXY/HTTPS_PROXY environment variables, unless the host is
+    excluded by NO_PROXY. A download is only resumed if the server confirms, with
+    If-Range, that the file hasn't changed since the partial file was
+    written. Files are written to a temporary path and renamed once
+    complete, so a file at the save path is always whole.
+    """
+
+    max_per_host: int = 4
+    """Maximum number of concurrent requests to a single host"""
+
+    retries: int = 3
+    """Number of times a failed request is retried"""
+
+    backoff: float = 1.0
+    """Delay in seconds before the first retry, doubling for each retry"""
+
+    timeout: float = 60.0
+    """Socket timeout in seconds for each request"""
+
+    chunk_size: int = 1024 * 1024
+    """Number of bytes read from the response at a time"""
+
+    _idle: dict[_HostKey, list[http.client.HTTPConnection]] = attrs.field(
+        factory=dict, init=False, repr=False
+    )
+    _host_limits: dict[_HostKey, threading.BoundedSemaphore] = attrs.field(
+        factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = attrs.field(factory=threading.Lock, init=False, repr=False)
+
+    def download(self, url: str, save_path: pathlib.Path) -> pathlib.Path:
+        """Download url to save_path, blocking until complete. Requests are
+        retried with backoff if they fail in a way which might succeed on a
+        later attempt.
+        """
+        save_path = pathlib.Path(save_path)
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download(url, save_path)
+            except (OSError, http.client.HTTPException) as e:
+                if not _is_transient(e) or attempt == self.retries:
+                    if isinstance(e, urllib.error.URLError):
+                        raise
+                    # raise connection failures the same way urllib does
+                    raise urllib.error.URLError(e) from e
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f"Fetching {url} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+    def _download(self, url: str, save_path: pathlib.Path) -> pathlib.Path:
+        tmp_path = partial_path(save_path)
+        tmp_validator_path = validator_path(save_path)
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+
+        for _ in range(MAX_REDIRECTS + 1):
+            split_url = urllib.parse.urlsplit(url)
+            host_key = _host_key(split_url)
+            with self._host_limit(host_key):
+                location = self._request_to_file(split_url, host_key, tmp_path, tmp_validator_path)
+            if location is None:
+                os.replace(tmp_path, save_path)
+                tmp_validator_path.unlink(missing_ok=True)
+                return save_path
+            url = urllib.parse.urljoin(url, location)
+
+        raise urllib.error.URLError(f"too many redirects fetching {url}")
+
+    def _request_to_file(
+        self,
+        url: urllib.parse.SplitResult,
+        host_key: _HostKey,
+        tmp_path: pathlib.Path,
+        tmp_validator_path: pathlib.Path,
+    ) -> str | None:
+        """Request url and write the body to tmp_path, resuming from the end
+        of tmp_path if it exists and the remote file is unchanged. Returns
+        the redirect location if the server responded with a redirect,
+        otherwise None.
+        """
+        # a partial file can only be resumed if we know which version of the
+        # remote file it came from
+        validator = tmp_validator_path.read_text() if tmp_validator_path.exists() else None
+        if validator is None:
+            _discard_partial(tmp_path, tmp_validator_path)
+        resume_from = tmp_path.stat().st_size if tmp_path.exists() else 0
+        headers = {"User-Agent": USER_AGENT}
+        if resume_from > 0:
+            headers.update({"Range": f"bytes={resume_from}-", "If-Range": validator})
+        path, proxy_headers = _request_target(url, host_key)
+        headers.update(proxy_headers)
+
+        connection, response = self._send(host_key, path, headers)
+        reusable = False
+        try:
+            if response.status in REDIRECT_STATUSES:
+                response.read()
+                reusable = not response.will_close
+                return response.getheader("Location")
+
+            # the partial file can't be resumed if the server holds a
+            # different version of the file, or returns a different range
+            # than was requested
+            mismatched = response.status == http.HTTPStatus.PARTIAL_CONTENT and (
+                _content_range_start(response) != resume_from
+                or _response_validator(response) not in (None, validator)
+            )
+            if resume_from > 0 and (
+                response.status == http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE or mismatched
+            ):
+                # start again from scratch
+                response.read()
+                reusable = not response.will_close
+                logger.debug(
+                    f"Discarding partial download of {url.geturl()}, the remote file has changed"
+                )
+                _discard_partial(tmp_path, tmp_validator_path)
+                return self._request_to_file(url, host_key, tmp_path, tmp_validator_path)
+
+            if response.status not in (http.HTTPStatus.OK, http.HTTPStatus.PARTIAL_CONTENT):
+                response.read()
+                reusable = not response.will_close
+                raise urllib.error.HTTPError(
+                    url.geturl(), response.status, response.reason, response.headers, None,
+                )
+
+            # a 200 response to a Range request contains the whole file,
+            # either because the file changed or Range isn't supported
+            mode = "ab" if response.status == http.HTTPStatus.PARTIAL_CONTENT else "wb"
+            if response.status == http.HTTPStatus.OK:
+                response_validator = _response_validator(response)
+                if response_validator is None:
+                    tmp_validator_path.unlink(missing_ok=True)
+                else:
+                    tmp_validator_path.write_text(response_validator)
+            with open(tmp_path, mode) as tmp_file:
+                while chunk := response.read(self.chunk_size):
+                    tmp_file.write(chunk)
+
+            if response.length not in (None, 0):
+                raise http.client.IncompleteRead(b"", response.length)
+
+            reusable = not response.will_close
+            return None
+        finally:
+            self._release(host_key, connection, reusable)
+
+    def _host_limit(self, host_key: _HostKey) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host_key not in self._host_limits:
+                self._host_limits[host_key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host_key]
+
+    def _send(
+        self,
+        host_key: _HostKey,
+        path: str,
+        headers: dict[str, str],
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a GET request for path, returning the connection it was sent
+        on and the response. If a kept-alive connection has been closed by
+        the server while it was idle, the request is sent again straight
+        away on a new connection, as the request itself hasn't failed.
+        """
+        connection, reused = self._acquire(host_key)
+        while True:
+            try:
+                connection.request("GET", path, headers=headers)
+                return connection, connection.getresponse()
+            except STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if not reused:
+                    raise
+                logger.debug(f"Reconnecting to {host_key[1]}, idle connection was closed ({e!r})")
+            except Exception:
+                connection.close()
+                raise
+            connection, reused = self._connect(host_key), False
+
+    def _acquire(self, host_key: _HostKey) -> tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection to the host if there is one, otherwise
+        open a new one. Also returns whether the connection has been used
+        before.
+        """
+        with self._lock:
+            idle = self._idle.get(host_key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(host_key), False
+
+    def _connect(self, host_key: _HostKey) -> http.client.HTTPConnection:
+        scheme, host, port, proxy = host_key
+        connection_class = (
+            http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        )
+        if proxy is None:
+            return connection_class(host, port, timeout=self.timeout)
+
+        proxy_url = urllib.parse.urlsplit(proxy)
+        connection = connection_class(
+            proxy_url.hostname, proxy_url.port or 80, timeout=self.timeout
+        )
+        if scheme == "https":
+            # TLS is negotiated with the host through a CONNECT tunnel
+            connection.set_tunnel(host, port, headers=_proxy_headers(proxy_url))
+        return connection
+
+    def _release(self, host_key: _HostKey, connection: http.client.HTTPConnection, reusable: bool):
+        if not reusable:
+            connection.close()
+            return
+        with self._lock:
+            self._idle.setdefault(host_key, []).append(connection)
+
+
+default_downloader = Downloader()
+"""Downloader shared by all fetches, so connections are reused between
+data sources on the same host"""
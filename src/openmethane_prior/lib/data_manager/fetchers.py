@@ -16,6 +16,8 @@
 # limitations under the License.
 #
 import geopandas as gpd
+import io
+import json
 import os
 import pandas as pd
 import pathlib
@@ -96,3 +98,43 @@ def fetch_zipped_shp_to_gdf(
 
         # read the extracted Shapefile with geopandas
         return gpd.read_file(tmp_path / shp_file)
+
+
+def write_geopackage(
+    features: gpd.GeoDataFrame | dict | str,
+    asset_path: pathlib.Path,
+) -> pathlib.Path:
+    """Save vector features to asset_path as a GeoPackage. Unlike GeoJSON,
+    GeoPackage has a spatial index, so the features in a small area can be
+    read without reading the whole file.
+
+    features can be a GeoDataFrame, which is written as-is, or GeoJSON or
+    Esri JSON as a dict or text, which is read through the GDAL JSON driver
+    so that RFC3339 date strings become datetime columns. Features without
+    a CRS are assumed to be in EPSG:4326, as they would be in GeoJSON.
+    """
+    if isinstance(features, gpd.GeoDataFrame):
+        features_df = features
+    else:
+        if isinstance(features, dict):
+            features = json.dumps(features)
+        features_df = gpd.read_file(io.StringIO(features))
+    if features_df.crs is None:
+        features_df = features_df.set_crs("EPSG:4326")
+
+    # write to a unique temporary file so an incomplete GeoPackage is never
+    # left at asset_path, even if another process is fetching the same asset
+    asset_path = pathlib.Path(asset_path)
+    tmp_fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{asset_path.stem}.", suffix=f".tmp{asset_path.suffix}", dir=asset_path.parent,
+    )
+    os.close(tmp_fd)
+    tmp_path = pathlib.Path(tmp_name)
+    try:
+        features_df.to_file(tmp_path, driver="GPKG", layer=asset_path.stem)
+        os.replace(tmp_path, asset_path)
+    finally:
+        # only left behind if writing failed
+        tmp_path.unlink(missing_ok=True)
+
+    return asset_path
@@ -15,16 +15,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import pathlib
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Self
 
 import attrs
-import pathlib
 
+from openmethane_prior.lib import logger
 from openmethane_prior.lib.config import PriorConfig
 from openmethane_prior.lib.data_manager.asset import DataAsset
-from openmethane_prior.lib.data_manager.source import configure_data_source, ConfiguredDataSource, DataSource
-
-import openmethane_prior.lib.logger as logger
+from openmethane_prior.lib.data_manager.parse_cache import cached_parse
+from openmethane_prior.lib.data_manager.source import (
+    ConfiguredDataSource,
+    DataSource,
+    configure_data_source,
+)
 
 logger = logger.get_logger(__name__)
 
@@ -50,6 +57,16 @@ class DataManager:
     data_assets: dict[str, DataAsset] = attrs.Factory(dict)
     """All data assets that have been fetched and processed"""
 
+    _asset_locks: dict[str, threading.RLock] = attrs.field(factory=dict, init=False, repr=False)
+    """Locks which ensure each asset is only prepared once, even when assets
+    are requested from several threads at the same time"""
+
+    _asset_locks_lock: threading.Lock = attrs.field(factory=threading.Lock, init=False, repr=False)
+
+    _resolving: threading.local = attrs.field(factory=threading.local, init=False, repr=False)
+    """Names of the data sources currently being prepared by each thread,
+    used to detect circular dependencies"""
+
     # @see: https://www.attrs.org/en/stable/init.html
     def __attrs_post_init__(self):
         # if no static_path is provided, use the data_path
@@ -67,10 +84,18 @@ class DataManager:
                 logger.warning(f"multiple DataSource instances with name '{source.name}' providing different URLs")
 
         # if data source depends on other data, prepare dependencies first
+        resolving = self._resolving_names()
+        if source.name in resolving:
+            cycle = resolving[resolving.index(source.name):] + [source.name]
+            raise ValueError(f"circular dependency between data sources: {' -> '.join(cycle)}")
+
         dependency_assets: list[DataAsset] = []
-        for data_source_dependency in source.data_sources:
-            # TODO: add circular dependency detection?
-            dependency_assets.append(self.get_asset(data_source_dependency))
+        resolving.append(source.name)
+        try:
+            for data_source_dependency in source.data_sources:
+                dependency_assets.append(self.get_asset(data_source_dependency))
+        finally:
+            resolving.pop()
 
         self.data_sources[source.name] = configure_data_source(
             data_source=source,
@@ -112,23 +137,65 @@ class DataManager:
         # data, call it and add the result to the asset
         if source.parseable:
             logger.debug(f"Parsing '{source.name}' data source")
-            data_asset.data = source.parse()
+            if self.prior_config.parse_cache and source.cache_parsed:
+                data_asset.data = cached_parse(source, self.prior_config.intermediates_path)
+            else:
+                data_asset.data = source.parse()
 
         return data_asset
 
     def get_asset(self, source: DataSource) -> DataAsset:
         """Get a data asset by fetching and processing a data source."""
-        configured_source = self.add_source(source)
+        # other threads requesting the same asset wait until it is ready
+        with self._asset_lock(source.name):
+            configured_source = self.add_source(source)
 
-        asset = self.data_assets.get(source.name)
-        if asset is None:
-            asset = self.prepare_asset(configured_source)
+            asset = self.data_assets.get(source.name)
+            if asset is None:
+                asset = self.prepare_asset(configured_source)
 
-            # cache the asset for any subsequent get calls
-            self.data_assets[source.name] = asset
+                # cache the asset for any subsequent get calls
+                self.data_assets[source.name] = asset
 
         return asset
 
+    def prefetch(self, sectors: Iterable, workers: int = 1):
+        """
+        Fetch and parse all data sources used by sectors, and the data
+        sources they depend on, before any emissions are estimated.
+
+        Data sources are prepared in waves, where each wave only contains
+        data sources whose dependencies were prepared in earlier waves. Up to
+        workers data sources in a wave are prepared at the same time.
+        """
+        data_sources = [data_source for sector in sectors for data_source in sector.data_sources]
+        waves = data_source_waves(data_sources)
+
+        logger.debug(
+            f"Prefetching {sum(len(wave) for wave in waves)} data sources in {len(waves)} waves"
+        )
+        if workers <= 1:
+            for wave in waves:
+                for data_source in wave:
+                    self.get_asset(data_source)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") as executor:
+            for wave in waves:
+                # list() waits for the whole wave and raises any errors
+                list(executor.map(self.get_asset, wave))
+
+    def _resolving_names(self) -> list[str]:
+        if not hasattr(self._resolving, "names"):
+            self._resolving.names = []
+        return self._resolving.names
+
+    def _asset_lock(self, name: str) -> threading.RLock:
+        with self._asset_locks_lock:
+            if name not in self._asset_locks:
+                self._asset_locks[name] = threading.RLock()
+            return self._asset_locks[name]
+
 
     @classmethod
     def from_config(cls, config: PriorConfig) -> Self:
@@ -137,4 +204,58 @@ class DataManager:
             data_path=config.input_path,
             static_path=config.static_path,
             prior_config=config,
-        )
\ No newline at end of file
+        )
+
+
+def data_source_graph(data_sources: Iterable[DataSource]) -> dict[str, DataSource]:
+    """
+    Collect data_sources and every data source they depend on, by name.
+    Raises a ValueError if any data sources depend on each other in a cycle.
+    """
+    graph: dict[str, DataSource] = {}
+    # data sources which are done, or still having their dependencies visited
+    visited: set[str] = set()
+    path: list[str] = []
+
+    def _visit(data_source: DataSource):
+        if data_source.name in path:
+            cycle = path[path.index(data_source.name):] + [data_source.name]
+            raise ValueError(f"circular dependency between data sources: {' -> '.join(cycle)}")
+        if data_source.name in visited:
+            return
+
+        path.append(data_source.name)
+        for dependency in data_source.data_sources:
+            _visit(dependency)
+        path.pop()
+
+        visited.add(data_source.name)
+        graph[data_source.name] = data_source
+
+    for data_source in data_sources:
+        _visit(data_source)
+
+    return graph
+
+
+def data_source_waves(data_sources: Iterable[DataSource]) -> list[list[DataSource]]:
+    """
+    Group data_sources and their dependencies into waves in topological
+    order, so every data source comes in a later wave than all of its
+    dependencies. Data sources within a wave are independent of each other.
+    """
+    graph = data_source_graph(data_sources)
+
+    # graph is built depth first, so each data source appears after its
+    # dependencies and waves can be assigned in a single pass
+    wave_index: dict[str, int] = {}
+    for name, data_source in graph.items():
+        wave_index[name] = 1 + max(
+            (wave_index[dependency.name] for dependency in data_source.data_sources),
+            default=-1,
+        )
+
+    waves: list[list[DataSource]] = [[] for _ in range(max(wave_index.values(), default=-1) + 1)]
+    for name, data_source in graph.items():
+        waves[wave_index[name]].append(data_source)
+    return waves
@@ -0,0 +1,368 @@
+#
+# Copyright 2026 The Superpower Institute Ltd.
+#
+# This file is part of Open Methane.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Cache of parsed data sources, stored alongside other intermediates."""
+import hashlib
+import importlib.util
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import types
+from collections.abc import Callable
+from typing import Any
+
+import attrs
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+import openmethane_prior
+from openmethane_prior.lib import logger
+from openmethane_prior.lib.data_manager.source import ConfiguredDataSource
+
+logger = logger.get_logger(__name__)
+
+PARSE_CACHE_FOLDER = "parsed"
+
+# digests of fetched assets, reused while the files are unchanged
+DIGEST_FOLDER = "digests"
+
+# parsed results are evicted, least recently used first, beyond this size
+PARSE_CACHE_MAX_BYTES = 2 * 1024**3
+
+
+@attrs.define(frozen=True)
+class _CacheFormat:
+    extension: str
+    matches: Callable[[Any], bool]
+    save: Callable[[Any, pathlib.Path], None]
+    load: Callable[[pathlib.Path], Any]
+    available: bool = True
+    unavailable_reason: str | None = None
+
+
+def _save_netcdf(data: xr.DataArray, path: pathlib.Path):
+    data.to_netcdf(path)
+
+
+def _save_numpy(data: np.ndarray, path: pathlib.Path):
+    with open(path, "wb") as npy_file:
+        np.save(npy_file, data, allow_pickle=False)
+
+
+# writing Parquet requires the optional pyarrow dependency
+_parquet_available = importlib.util.find_spec("pyarrow") is not None
+
+# formats are checked in order, so subclasses must come before their parents
+_CACHE_FORMATS = [
+    _CacheFormat(
+        extension="geoparquet",
+        matches=lambda data: isinstance(data, gpd.GeoDataFrame),
+        save=gpd.GeoDataFrame.to_parquet,
+        load=gpd.read_parquet,
+        available=_parquet_available,
+        unavailable_reason="pyarrow is not installed (uv sync --extra parquet)",
+    ),
+    _CacheFormat(
+        extension="parquet",
+        matches=lambda data: isinstance(data, pd.DataFrame),
+        save=pd.DataFrame.to_parquet,
+        load=pd.read_parquet,
+        available=_parquet_available,
+        unavailable_reason="pyarrow is not installed (uv sync --extra parquet)",
+    ),
+    _CacheFormat(
+        extension="nc",
+        matches=lambda data: isinstance(data, xr.DataArray),
+        save=_save_netcdf,
+        load=xr.load_dataarray,
+    ),
+    _CacheFormat(
+        extension="npy",
+        matches=lambda data: isinstance(data, np.ndarray) and data.dtype != object,
+        save=_save_numpy,
+        load=np.load,
+    ),
+]
+
+# formats we have already warned are unavailable, so each is reported once
+_warned_formats: set[str] = set()
+_warned_lock = threading.Lock()
+
+
+def _warn_unavailable(cache_format: _CacheFormat):
+    with _warned_lock:
+        if cache_format.extension in _warned_formats:
+            return
+        _warned_formats.add(cache_format.extension)
+    logger.warning(
+        f"Parsed inputs stored as {cache_format.extension} will not be cached: "
+        f"{cache_format.unavailable_reason}"
+    )
+
+
+def _asset_files(path: pathlib.Path) -> list[tuple[str, pathlib.Path]]:
+    """Name and path of a file, or of every file in a folder."""
+    if not path.is_dir():
+        return [(path.name, path)]
+    return [
+        (str(file.relative_to(path)), file) for file in sorted(path.rglob("*")) if file.is_file()
+    ]
+
+
+def file_digest(path: pathlib.Path, digest_folder: pathlib.Path | None = None) -> str:
+    """sha256 digest of the contents of a file, or of every file in a
+    folder.
+
+    If digest_folder is provided, the digest is recorded there and reused
+    while the size and modification time of the files are unchanged, so
+    large assets are only read once.
+    """
+    path = pathlib.Path(path)
+    files = _asset_files(path)
+
+    record_path = None
+    if digest_folder is not None:
+        signature = repr(
+            [(name, file.stat().st_size, file.stat().st_mtime_ns) for name, file in files]
+        )
+        path_key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+        record_path = pathlib.Path(digest_folder) / f"{path_key}.json"
+        try:
+            record = json.loads(record_path.read_text())
+            if record["signature"] == signature:
+                return record["digest"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    digest = hashlib.sha256()
+    for name, file in files:
+        digest.update(name.encode())
+        with open(file, "rb") as f:
+            digest.update(hashlib.file_digest(f, "sha256").digest())
+    hexdigest = digest.hexdigest()
+
+    if record_path is not None:
+        # other runs may be recording the same digest
+        record_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fd, tmp_name = tempfile.mkstemp(
+            prefix=f".{path_key}.", suffix=".tmp", dir=record_path.parent
+        )
+        with os.fdopen(tmp_fd, "w") as tmp_file:
+            json.dump({"signature": signature, "digest": hexdigest}, tmp_file)
+        os.replace(tmp_name, record_path)
+
+    return hexdigest
+
+
+def _own_package(module_name: str | None) -> str:
+    return (module_name or "").split(".")[0]
+
+
+def _value_identity(value: Any, packages: set[str], seen: set) -> str:
+    if isinstance(value, types.FunctionType) and _own_package(value.__module__) in packages:
+        if value in seen:
+            # recursive helpers only need to be described once
+            return repr((value.__module__, value.__qualname__))
+        seen.add(value)
+        return _function_identity(value, packages, seen)
+    if isinstance(value, types.FunctionType | types.BuiltinFunctionType | type):
+        # the repr of other functions includes their address, which differs between runs
+        return repr((value.__module__, value.__qualname__))
+    if isinstance(value, tuple | list):
+        return repr(tuple(_value_identity(v, packages, seen) for v in value))
+    return repr(value)
+
+
+def _code_identity(code: types.CodeType, func_globals: dict, packages: set[str], seen: set) -> str:
+    # functions defined in other modules of our packages may be referenced
+    # as attributes of the module, like `parsers.parse_geo`
+    modules = [
+        value
+        for name in code.co_names
+        if isinstance(value := func_globals.get(name), types.ModuleType)
+        and _own_package(value.__name__) in packages
+    ]
+    referenced = []
+    for name in code.co_names:
+        for value in [func_globals.get(name), *(getattr(module, name, None) for module in modules)]:
+            if isinstance(value, types.FunctionType) and _own_package(value.__module__) in packages:
+                referenced.append(_value_identity(value, packages, seen))
+    return repr((
+        hashlib.sha256(code.co_code).hexdigest(),
+        repr(tuple(const for const in code.co_consts if not isinstance(const, types.CodeType))),
+        # nested functions, lambdas and comprehensions
+        tuple(
+            _code_identity(const, func_globals, packages, seen)
+            for const in code.co_consts if isinstance(const, types.CodeType)
+        ),
+        tuple(referenced),
+    ))
+
+
+def _function_identity(func: Callable, packages: set[str], seen: set) -> str:
+    code = getattr(func, "__code__", None)
+    closure = getattr(func, "__closure__", None) or ()
+    return repr((
+        getattr(func, "__module__", None),
+        getattr(func, "__qualname__", repr(func)),
+        _code_identity(code, func.__globals__, packages, seen) if code is not None else None,
+        _value_identity(getattr(func, "__defaults__", None), packages, seen),
+        tuple(_value_identity(cell.cell_contents, packages, seen) for cell in closure),
+    ))
+
+
+def function_identity(func: Callable) -> str:
+    """Describe a function by its name and implementation, including any
+    values captured by a closure, so the description changes whenever the
+    result of calling the function could. Helper functions it calls from its
+    own package or this one are described too, so editing them changes the
+    description; other libraries are covered by their pinned versions.
+    """
+    packages = {
+        _own_package(openmethane_prior.__name__),
+        _own_package(getattr(func, "__module__", None)),
+    }
+    return _function_identity(func, packages, {func})
+
+
+def parsed_asset_key(
+    data_source: ConfiguredDataSource, digest_folder: pathlib.Path | None = None
+) -> str:
+    """
+    Key which identifies the parsed result of a data source. The key changes
+    if the fetched asset, the parse function or the assets it depends on
+    change, or if the domain changes in a way the data source declares in
+    parse_uses_domain. Asset digests are reused from digest_folder if
+    provided, see file_digest.
+    """
+    prior_config = data_source.prior_config
+    if data_source.parse_uses_domain == "grid":
+        domain_key = prior_config.domain().grid.fingerprint()
+    elif data_source.parse_uses_domain == "crs":
+        domain_key = prior_config.crs.to_wkt()
+    else:
+        domain_key = None
+
+    key = (
+        openmethane_prior.__version__,
+        data_source.name,
+        file_digest(data_source.asset_path, digest_folder),
+        function_identity(data_source.source_parse),
+        tuple(
+            (asset.name, file_digest(asset.path, digest_folder))
+            for asset in data_source.data_assets
+        ),
+        domain_key,
+    )
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _cached_files(folder: pathlib.Path) -> list[pathlib.Path]:
+    if not folder.exists():
+        return []
+    # temporary files start with a "."
+    return [
+        cached
+        for cached in folder.iterdir()
+        if cached.is_file() and not cached.name.startswith(".")
+    ]
+
+
+def evict(folder: pathlib.Path, max_bytes: int | None = None, keep: pathlib.Path | None = None):
+    """Remove the least recently used parsed results until the cache in
+    folder is within max_bytes, by default PARSE_CACHE_MAX_BYTES. The result
+    at keep is never removed.
+    """
+    if max_bytes is None:
+        max_bytes = PARSE_CACHE_MAX_BYTES
+
+    cached_stats = []
+    for cached in _cached_files(folder):
+        try:
+            cached_stats.append((cached, cached.stat()))
+        except FileNotFoundError:
+            # removed by another run sharing the cache
+            continue
+
+    cached_stats.sort(key=lambda cached_stat: cached_stat[1].st_mtime)
+    total_bytes = sum(stat.st_size for _, stat in cached_stats)
+    for cached, stat in cached_stats:
+        if total_bytes <= max_bytes:
+            break
+        if cached == keep:
+            continue
+        logger.debug(f"Evicting parsed result {cached.name}")
+        cached.unlink(missing_ok=True)
+        total_bytes -= stat.st_size
+
+
+def cached_parse(data_source: ConfiguredDataSource, cache_path: pathlib.Path) -> Any:
+    """
+    Parse a data source, reusing the result from a previous run if one
+    was saved with the same parsed_asset_key. New results are saved in
+    cache_path when their type can be stored, evicting the least recently
+    used results if the cache grows beyond PARSE_CACHE_MAX_BYTES.
+    """
+    folder = pathlib.Path(cache_path) / PARSE_CACHE_FOLDER
+    key = parsed_asset_key(data_source, digest_folder=folder / DIGEST_FOLDER)
+    stem = f"{data_source.name}-{key[:32]}"
+
+    for cache_format in _CACHE_FORMATS:
+        cached_path = folder / f"{stem}.{cache_format.extension}"
+        if cache_format.available and cached_path.exists():
+            logger.debug(f"Loading parsed '{data_source.name}' from {cached_path}")
+            data = cache_format.load(cached_path)
+            # record the access so recently used results are evicted last
+            os.utime(cached_path)
+            return data
+
+    data = data_source.parse()
+
+    cache_format = next((f for f in _CACHE_FORMATS if f.matches(data)), None)
+    if cache_format is None:
+        logger.debug(
+            f"Not caching parsed '{data_source.name}', {type(data).__name__} is not supported"
+        )
+        return data
+    if not cache_format.available:
+        _warn_unavailable(cache_format)
+        logger.debug(f"Not caching parsed '{data_source.name}', {cache_format.unavailable_reason}")
+        return data
+
+    folder.mkdir(parents=True, exist_ok=True)
+    cached_path = folder / f"{stem}.{cache_format.extension}"
+    # other runs or threads may be caching the same result
+    tmp_fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{stem}.", suffix=f".tmp.{cache_format.extension}", dir=folder
+    )
+    os.close(tmp_fd)
+    tmp_path = pathlib.Path(tmp_name)
+    try:
+        cache_format.save(data, tmp_path)
+    except Exception as e:
+        # results which can't be stored are still valid
+        logger.warning(f"Could not cache parsed '{data_source.name}': {e}")
+        tmp_path.unlink(missing_ok=True)
+        return data
+    os.replace(tmp_path, cached_path)
+
+    evict(folder, keep=cached_path)
+    return data
@@ -30,8 +30,13 @@ def parse_csv(data_source: ConfiguredDataSource) -> pd.DataFrame:
 def parse_geo(data_source: ConfiguredDataSource, source_crs: pyproj.CRS = None):
     """Read and parse a file containing a collection of geometry vector data
     into a geopandas GeoDataFrame. Asset file type can be anything supported by
-    pyogrio, which includes GeoJSON, GeoPackage, Shapefiles, etc."""
-    geo_df = gpd.read_file(data_source.asset_path)
+    pyogrio, which includes GeoJSON, GeoPackage, Shapefiles, etc, or
+    GeoParquet if pyarrow is installed.
+    """
+    if data_source.asset_path.suffix == ".parquet":
+        geo_df = gpd.read_parquet(data_source.asset_path)
+    else:
+        geo_df = gpd.read_file(data_source.asset_path)
 
     if geo_df.crs is None:
         if source_crs is not None:
@@ -21,10 +21,10 @@ from typing import Any, Callable
 import attrs
 import os
 import pathlib
-import urllib.request
 
 from openmethane_prior.lib.config import PriorConfig
 from openmethane_prior.lib.data_manager.asset import DataAsset
+from openmethane_prior.lib.data_manager.downloader import default_downloader
 
 
 def file_path_from_url(_self: DataSource, prior_config: PriorConfig) -> str:
@@ -39,14 +39,10 @@ def basic_fetch(data_source: ConfiguredDataSource) -> pathlib.Path:
     if data_source.url is None:
         raise ValueError("DataSource must have url set to use default fetch")
 
-    save_path, response = urllib.request.urlretrieve(
-        url=data_source.url,
-        # predictable path so we can check if the file already exists
-        filename=data_source.asset_path,
-    )
-    # urlretrieve will throw on non-successful fetches
-
-    return pathlib.Path(save_path)
+    # predictable path so we can check if the file already exists. The shared
+    # downloader retries failures and reuses connections between sources.
+    # It will throw on non-successful fetches
+    return default_downloader.download(data_source.url, data_source.asset_path)
 
 
 @attrs.define()
@@ -114,6 +110,22 @@ class DataSource:
     """If this data source depends on other data sources, they can be provided
     in data_sources to ensure they will be loaded first."""
 
+    cache_parsed: bool = False
+    """Set to True if the result of parse can be saved and reused by later
+    runs when the PriorConfig parse_cache option is enabled. The result is
+    reused until the fetched file, the parse method or the data sources this
+    depends on change, so parse must not depend on anything else unless it
+    is declared in parse_uses_domain."""
+
+    parse_uses_domain: str | None = attrs.field(
+        default=None,
+        validator=attrs.validators.in_([None, "crs", "grid"]),
+    )
+    """What parse uses from the domain of the prior, so a cached result is
+    only reused for domains which match: "crs" if results are projected into
+    the domain CRS, "grid" if they depend on the domain grid itself, or None
+    if parse doesn't use the domain at all."""
+
 
 @attrs.define()
 class ConfiguredDataSource:
@@ -149,6 +161,12 @@ class ConfiguredDataSource:
     data_assets: list[DataAsset]
     """Assets loaded from DataSources defined in DataSource.data_sources"""
 
+    cache_parsed: bool = False
+    """If True, the parsed result may be cached between runs"""
+
+    parse_uses_domain: str | None = None
+    """What the parsed result depends on from the domain, see DataSource"""
+
     @property
     def parseable(self) -> bool:
         return self.source_parse is not None
@@ -195,4 +213,6 @@ def configure_data_source(
         prior_config=prior_config,
         data_path=data_storage_path,
         data_assets=data_assets if data_assets is not None else [],
+        cache_parsed=data_source.cache_parsed,
+        parse_uses_domain=data_source.parse_uses_domain,
     )
@@ -0,0 +1,196 @@
+#
+# Copyright 2026 The Superpower Institute Ltd.
+#
+# This file is part of Open Methane.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import annotations
+
+import weakref
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pyproj
+
+if TYPE_CHECKING:
+    from .grid import Grid
+
+
+class GridGeometry:
+    """
+    Lazily computed arrays describing the geometry of a Grid, such as the
+    lon/lat coordinates of cell corners. Each array is computed the first time
+    it is requested and kept until the cache is cleared or the Grid is
+    garbage collected.
+
+    GridGeometry instances should be obtained with grid_geometry(grid), so
+    that equal grids share a single cache.
+    """
+
+    def __init__(self, grid: Grid):
+        # a weak reference allows the Grid, and this cache with it, to be
+        # garbage collected when it is no longer used
+        self._grid = weakref.ref(grid)
+        self._arrays: dict[str, Any] = {}
+
+    @property
+    def grid(self) -> Grid:
+        """The Grid this geometry describes."""
+        grid = self._grid()
+        if grid is None:
+            raise ReferenceError("Grid for this GridGeometry no longer exists")
+        return grid
+
+    def _cached(self, name: str, compute: Callable[[Grid], Any]) -> Any:
+        if name not in self._arrays:
+            self._arrays[name] = compute(self.grid)
+        return self._arrays[name]
+
+    def bounds_x(self) -> np.ndarray:
+        """Cell edge coordinates along the x axis, in grid projection coordinates."""
+        return self._cached(
+            "bounds_x",
+            lambda grid: grid.origin_xy[0] + np.arange(grid.dimensions[0] + 1) * grid.cell_size[0],
+        )
+
+    def bounds_y(self) -> np.ndarray:
+        """Cell edge coordinates along the y axis, in grid projection coordinates."""
+        return self._cached(
+            "bounds_y",
+            lambda grid: grid.origin_xy[1] + np.arange(grid.dimensions[1] + 1) * grid.cell_size[1],
+        )
+
+    def coords_x(self) -> np.ndarray:
+        """Cell centre coordinates along the x axis, in grid projection coordinates."""
+        return self._cached(
+            "coords_x",
+            lambda grid: grid.llc_center_xy[0] + np.arange(grid.dimensions[0]) * grid.cell_size[0],
+        )
+
+    def coords_y(self) -> np.ndarray:
+        """Cell centre coordinates along the y axis, in grid projection coordinates."""
+        return self._cached(
+            "coords_y",
+            lambda grid: grid.llc_center_xy[1] + np.arange(grid.dimensions[1]) * grid.cell_size[1],
+        )
+
+    def corners_lonlat(self) -> tuple[np.ndarray, np.ndarray]:
+        """Lon/lat coordinates of the (ny + 1, nx + 1) lattice of cell corners."""
+        def _compute(grid: Grid):
+            corners_x, corners_y = np.meshgrid(self.bounds_x(), self.bounds_y())
+            corners_lon, corners_lat = grid.xy_to_lonlat(corners_x, corners_y)
+            return np.asarray(corners_lon), np.asarray(corners_lat)
+
+        return self._cached("corners_lonlat", _compute)
+
+    def cell_bounds_lonlat(self) -> tuple[np.ndarray, np.ndarray]:
+        """Lon/lat coordinates of the 4 corners of every cell, in (ny, nx, 4)
+        arrays, ordered counter-clockwise from the lower left corner.
+        """
+        def _compute(grid: Grid):
+            corners_lon, corners_lat = self.corners_lonlat()
+            return _gather_cell_corners(corners_lon), _gather_cell_corners(corners_lat)
+
+        return self._cached("cell_bounds_lonlat", _compute)
+
+    def cell_centres_lonlat(self) -> tuple[np.ndarray, np.ndarray]:
+        """Lon/lat coordinates of the centre of every cell, in (ny, nx) arrays."""
+        def _compute(grid: Grid):
+            centres_x, centres_y = np.meshgrid(self.coords_x(), self.coords_y())
+            centres_lon, centres_lat = grid.xy_to_lonlat(centres_x, centres_y)
+            return np.asarray(centres_lon), np.asarray(centres_lat)
+
+        return self._cached("cell_centres_lonlat", _compute)
+
+    def cell_areas_m2(self) -> np.ndarray:
+        """Area of every cell on the surface of the grid's ellipsoid in m², in
+        a (ny, nx) array. Unlike Grid.cell_area, this accounts for the
+        distortion of the grid projection.
+        """
+        def _compute(grid: Grid):
+            ellipsoid = grid.projection.crs.ellipsoid
+            equal_area_crs = pyproj.CRS.from_dict({
+                "proj": "cea",
+                "a": ellipsoid.semi_major_metre,
+                "b": ellipsoid.semi_minor_metre,
+            })
+            transformer = pyproj.Transformer.from_crs(
+                grid.projection.crs, equal_area_crs, always_xy=True
+            )
+            corners_x, corners_y = np.meshgrid(self.bounds_x(), self.bounds_y())
+            ea_x, ea_y = transformer.transform(corners_x, corners_y)
+            # offset corners relative to the first corner of each cell to
+            # limit floating point cancellation in the shoelace formula
+            cell_x = _gather_cell_corners(np.asarray(ea_x))
+            cell_y = _gather_cell_corners(np.asarray(ea_y))
+            cell_x = cell_x - cell_x[..., :1]
+            cell_y = cell_y - cell_y[..., :1]
+            # shoelace formula over the 4 corners of each cell
+            return 0.5 * np.abs(
+                (cell_x * np.roll(cell_y, -1, axis=-1)).sum(axis=-1)
+                - (cell_y * np.roll(cell_x, -1, axis=-1)).sum(axis=-1)
+            )
+
+        return self._cached("cell_areas_m2", _compute)
+
+    def memory_usage(self) -> int:
+        """Return the combined size in bytes of all arrays held in the cache."""
+        return sum(_nbytes(value) for value in self._arrays.values())
+
+    def clear(self):
+        """Release all cached arrays. They will be recomputed if requested."""
+        self._arrays.clear()
+
+
+def _gather_cell_corners(corners: np.ndarray) -> np.ndarray:
+    return np.stack([
+        corners[:-1, :-1], # lower left
+        corners[:-1, 1:], # lower right
+        corners[1:, 1:], # upper right
+        corners[1:, :-1], # upper left
+    ], axis=-1)
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+
+_grid_geometries: weakref.WeakKeyDictionary[Grid, GridGeometry] = weakref.WeakKeyDictionary()
+
+
+def grid_geometry(grid: Grid) -> GridGeometry:
+    """Return the geometry cache for a Grid. Grids which are equal share a
+    single cache, which is released when the Grid is garbage collected.
+    """
+    geometry = _grid_geometries.get(grid)
+    if geometry is None:
+        geometry = GridGeometry(grid)
+        _grid_geometries[grid] = geometry
+    return geometry
+
+
+def clear_grid_geometries():
+    """Release the cached geometry of every Grid."""
+    for geometry in list(_grid_geometries.values()):
+        geometry.clear()
+
+
+def grid_geometries_memory_usage() -> int:
+    """Return the combined size in bytes of the cached geometry of every Grid."""
+    return sum(geometry.memory_usage() for geometry in list(_grid_geometries.values()))
@@ -16,10 +16,12 @@
 # limitations under the License.
 #
 from typing import Any
-from functools import cache
+import hashlib
 import numpy as np
 import pyproj
 
+from .geometry_cache import GridGeometry, grid_geometry
+
 class Grid:
     """
     Grid details and utilities for working with grid coordinates.
@@ -80,11 +82,32 @@ class Grid:
             and self.projection.is_exact_same(other.projection)
         )
 
-    # Grid must be hashable to use @cached methods
+    # Grid must be hashable to key its geometry cache
     def __hash__(self):
         return hash((self.dimensions, self.origin_xy, self.llc_center_xy, self.cell_size, self.projection.to_wkt()))
 
+    def fingerprint(self) -> str:
+        """
+        Digest of the grid geometry which, unlike __hash__, is stable between
+        python processes so it can be used to identify files derived from
+        the grid.
+        """
+        geometry = (
+            tuple(int(d) for d in self.dimensions),
+            tuple(float(o) for o in self.origin_xy),
+            tuple(float(c) for c in self.cell_size),
+            self.projection.to_wkt(),
+        )
+        return hashlib.sha256(repr(geometry).encode()).hexdigest()
+
     def is_aligned(self, other):
+        """
+        Grids are aligned if their grid lines are parallel, so that
+        coordinates in one grid projection differ from coordinates in the
+        other only by a constant offset. This is the case when both grids use
+        the same projection with the same parameters, ignoring any false
+        easting/northing.
+        """
         if self == other or self.projection.is_exact_same(other.projection):
             return True
 
@@ -92,14 +115,10 @@ class Grid:
         if self.projection.name != other.projection.name:
             return False
 
-        # lambert projections are aligned if parameters are the same, ignoring x/y offset
-        if self.projection.name == "lcc":
-            self_srs_parts = [part for part in self.projection.srs.split(" ") if not (part.startswith("+x_0") or part.startswith("+y_0"))]
-            other_srs_parts = [part for part in other.projection.srs.split(" ") if not (part.startswith("+x_0") or part.startswith("+y_0"))]
-            return " ".join(self_srs_parts) == " ".join(other_srs_parts)
-
-        # non-lambert projections comparisons are not implemented
-        return False
+        return _without_false_origin(self.projection.crs).equals(
+            _without_false_origin(other.projection.crs),
+            ignore_axis_order=True,
+        )
 
     def lonlat_to_xy(self, lon, lat) -> tuple[float, float]:
         return self.projection.transform(xx=lon, yy=lat, direction=pyproj.enums.TransformDirection.FORWARD)
@@ -107,23 +126,28 @@ class Grid:
     def xy_to_lonlat(self, x, y) -> tuple[float, float]:
         return self.projection.transform(xx=x, yy=y, direction=pyproj.enums.TransformDirection.INVERSE)
 
-    @cache
+    @property
+    def geometry(self) -> GridGeometry:
+        """
+        Cache of derived geometry arrays for this grid, which is shared with
+        any other equal Grid.
+        """
+        return grid_geometry(self)
+
     def cell_coords_x(self) -> np.ndarray[int, np.float64]:
         """
         Cell center coordinates for every grid cell along the x axis, in grid
         projection coordinates.
         """
-        return self.llc_center_xy[0] + np.arange(self.dimensions[0]) * self.cell_size[0]
+        return self.geometry.coords_x()
 
-    @cache
     def cell_coords_y(self) -> np.ndarray[int, np.float64]:
         """
         Cell center coordinates for every grid cell along the y axis, in grid
         projection coordinates.
         """
-        return self.llc_center_xy[1] + np.arange(self.dimensions[1]) * self.cell_size[1]
+        return self.geometry.coords_y()
 
-    @cache
     def cell_bounds_x(self) -> np.ndarray[int, np.float64]:
         """
         Boundary coordinates for the edges of every grid cell along the x axis,
@@ -132,9 +156,8 @@ class Grid:
         grid cells, with the bounds of the first cell in bounds[0], bounds[1],
         and the bounds of the last cell as bounds[n], bounds[n + 1].
         """
-        return self.origin_xy[0] + np.arange(self.dimensions[0] + 1) * self.cell_size[0]
+        return self.geometry.bounds_x()
 
-    @cache
     def cell_bounds_y(self) -> np.ndarray[int, np.float64]:
         """
         Boundary coordinates for the edges of every grid cell along the y axis,
@@ -143,26 +166,15 @@ class Grid:
         grid cells, with the bounds of the first cell in bounds[0], bounds[1],
         and the bounds of the last cell as bounds[n], bounds[n + 1].
         """
-        return self.origin_xy[1] + np.arange(self.dimensions[1] + 1) * self.cell_size[1]
+        return self.geometry.bounds_y()
 
-    @cache
     def cell_bounds_lonlat(self) -> tuple[np.ndarray, np.ndarray]:
-        bounds_x = self.cell_bounds_x()
-        bounds_y = self.cell_bounds_y()
-
-        # return values in the shape of the grid, with 4 corners for each cell
-        lon_bounds = np.ndarray(shape=(self.shape[0], self.shape[1], 4), dtype=np.float64)
-        lat_bounds = np.ndarray(shape=(self.shape[0], self.shape[1], 4), dtype=np.float64)
-
-        for iy in range(self.shape[0]):
-            for ix in range(self.shape[1]):
-                cell_bounds_x = [bounds_x[ix], bounds_x[ix + 1], bounds_x[ix + 1], bounds_x[ix]]
-                cell_bounds_y = [bounds_y[iy], bounds_y[iy], bounds_y[iy + 1], bounds_y[iy + 1]]
-                cell_bounds_lon, cell_bounds_lat = self.xy_to_lonlat(cell_bounds_x, cell_bounds_y)
-                lon_bounds[iy, ix] = cell_bounds_lon
-                lat_bounds[iy, ix] = cell_bounds_lat
-
-        return lon_bounds, lat_bounds
+        """
+        Lon/lat coordinates of the 4 corners of every grid cell, ordered
+        counter-clockwise from the lower left corner. Both arrays have the
+        shape (ny, nx, 4).
+        """
+        return self.geometry.cell_bounds_lonlat()
 
     def valid_cell_coords(self, coord_x: Any, coord_y: Any) -> Any:
         """
@@ -197,3 +209,27 @@ class Grid:
         x, y = self.lonlat_to_xy(lon=lon, lat=lat)
 
         return self.xy_to_cell_index(x, y)
+
+
+_FALSE_ORIGIN_PARAMETERS = (
+    "False easting",
+    "False northing",
+    "Easting at false origin",
+    "Northing at false origin",
+)
+
+
+def _without_false_origin(crs: pyproj.CRS) -> pyproj.CRS:
+    """Copy of crs with any false easting/northing set to 0, which only
+    offsets projected coordinates without changing the shape of grid lines.
+    """
+    def _reset(part):
+        if isinstance(part, dict):
+            if part.get("name") in _FALSE_ORIGIN_PARAMETERS:
+                return {**part, "value": 0}
+            return {key: _reset(value) for key, value in part.items()}
+        if isinstance(part, list):
+            return [_reset(value) for value in part]
+        return part
+
+    return pyproj.CRS.from_json_dict(_reset(crs.to_json_dict()))
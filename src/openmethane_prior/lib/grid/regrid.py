@@ -15,20 +15,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-import itertools
+import pathlib
+
 import numpy as np
 import pyproj
-from shapely import geometry
+import shapely
+from scipy.sparse import csr_array
 
-from .grid import Grid
 import openmethane_prior.lib.logger as logger
 
+from ..regrid import cell_polygons, overlap_areas
+from ..weight_store import WeightStore, overlap_key
+from .grid import Grid
+
 logger = logger.get_logger(__name__)
 
 def regrid_data(
     data: np.ndarray,
     from_grid: Grid,
     to_grid: Grid,
+    cache_path: pathlib.Path | None = None,
 ) -> np.ndarray:
     """
     Re-grids a dataset to a shape defined by to_grid, using a nearest neighbor
@@ -36,6 +42,8 @@ def regrid_data(
     :param data: 2d gridded data
     :param from_grid: Grid of the source data
     :param to_grid: Target grid to reshape the data to
+    :param cache_path: If provided, cell overlaps between unaligned grids
+      are stored in this folder and reused
     :return: 2d dataset of gridded cell values in the target grid
     """
     # if grids are exactly the same, no regridding is necessary
@@ -44,13 +52,14 @@ def regrid_data(
         return data
 
     # if grids share the same base projection, we can apply an efficient
-    # regridding method using np.digitize
+    # regridding method using np.digitize, or reshaping for grids which are
+    # an exact multiple of the source grid
     if to_grid.is_aligned(from_grid):
         logger.debug("aligned grids, fast regridding")
         return regrid_aligned(data=data, from_grid=from_grid, to_grid=to_grid)
 
-    logger.debug("unaligned grids, slow regridding")
-    return regrid_any(data=data, from_grid=from_grid, to_grid=to_grid)
+    logger.debug("unaligned grids, regridding by cell overlap")
+    return regrid_any(data=data, from_grid=from_grid, to_grid=to_grid, cache_path=cache_path)
 
 
 def regrid_aligned(
@@ -71,82 +80,178 @@ def regrid_aligned(
     if not to_grid.is_aligned(from_grid):
         raise ValueError("regrid_aligned can only be used between aligned grids")
 
-    # transform to_grid coordinates into from_grid coordinates to
-    # efficiently bin them
-    grid_transform = pyproj.Transformer.from_crs(crs_from=to_grid.projection.crs, crs_to=from_grid.projection.crs)
-    to_grid_x_transformed, to_grid_y_transformed = grid_transform.transform(xx=to_grid.cell_coords_x(), yy=to_grid.cell_coords_y())
+    # aligned grid coordinates differ only by a constant offset, which can
+    # be found by transforming a single point
+    grid_transform = pyproj.Transformer.from_crs(
+        crs_from=to_grid.projection.crs, crs_to=from_grid.projection.crs, always_xy=True
+    )
+    origin_x_transformed, origin_y_transformed = grid_transform.transform(
+        xx=to_grid.origin_xy[0], yy=to_grid.origin_xy[1]
+    )
+    offset_x = origin_x_transformed - to_grid.origin_xy[0]
+    offset_y = origin_y_transformed - to_grid.origin_xy[1]
 
     data_np = data if type(data) is np.ndarray else data.to_numpy()
 
+    coarsening = _coarsening_blocks(
+        from_grid=from_grid, to_grid=to_grid, offset_xy=(offset_x, offset_y)
+    )
+    if coarsening is not None:
+        return regrid_coarsened(data_np, *coarsening, to_shape=to_grid.shape)
+
+    # transform to_grid coordinates into from_grid coordinates to
+    # efficiently bin them
+    to_grid_x_transformed = to_grid.cell_coords_x() + offset_x
+    to_grid_y_transformed = to_grid.cell_coords_y() + offset_y
+
     source_x_indices = np.digitize(to_grid_x_transformed, from_grid.cell_bounds_x()) - 1
     source_y_indices = np.digitize(to_grid_y_transformed, from_grid.cell_bounds_y()) - 1
     xmesh, ymesh = np.meshgrid(source_x_indices, source_y_indices)
     return data_np[ymesh, xmesh]
 
 
+def regrid_coarsened(
+    data: np.ndarray,
+    factor_xy: tuple[int, int],
+    start_xy: tuple[int, int],
+    to_shape: tuple[int, int],
+) -> np.ndarray:
+    """
+    Re-grids a dataset to a grid whose cells are exactly factor_xy source
+    cells in size, using a nearest neighbor strategy. The data is reshaped
+    into blocks of source cells and each block is reduced to the cell at its
+    centre, which gives the same result as regrid_aligned without any search.
+    :param data: 2d gridded data
+    :param factor_xy: Number of source cells along each axis of a target cell
+    :param start_xy: Index of the source cell at the origin of the target grid
+    :param to_shape: (y, x) shape of the target grid
+    :return: 2d dataset of gridded cell values in the target grid
+    """
+    factor_x, factor_y = factor_xy
+    start_x, start_y = start_xy
+    ny, nx = to_shape
+
+    blocks = data[
+        start_y:start_y + ny * factor_y,
+        start_x:start_x + nx * factor_x,
+    ].reshape(ny, factor_y, nx, factor_x)
+    return blocks[:, factor_y // 2, :, factor_x // 2]
+
+
+def _coarsening_blocks(
+    from_grid: Grid,
+    to_grid: Grid,
+    offset_xy: tuple[float, float],
+) -> tuple[tuple[int, int], tuple[int, int]] | None:
+    """
+    If every to_grid cell is made up of a whole block of from_grid cells,
+    return the (x, y) block size and the (x, y) index of the first source
+    cell, otherwise None.
+    """
+    factors = []
+    starts = []
+    for axis in (0, 1):
+        ratio = to_grid.cell_size[axis] / from_grid.cell_size[axis]
+        factor = round(ratio)
+        if factor < 1 or not np.isclose(ratio, factor):
+            return None
+
+        position = (
+            to_grid.origin_xy[axis] + offset_xy[axis] - from_grid.origin_xy[axis]
+        ) / from_grid.cell_size[axis]
+        start = round(position)
+        if not np.isclose(position, start):
+            return None
+
+        # target grid must be entirely inside the source grid
+        if start < 0 or start + to_grid.dimensions[axis] * factor > from_grid.dimensions[axis]:
+            return None
+
+        factors.append(factor)
+        starts.append(start)
+
+    return (factors[0], factors[1]), (starts[0], starts[1])
+
+
+def grid_overlap_areas(
+    from_grid: Grid,
+    to_grid: Grid,
+    cache_path: pathlib.Path | None = None,
+) -> csr_array:
+    """
+    Sparse (to_grid cells, from_grid cells) matrix of the area of overlap
+    between every pair of intersecting cells, measured in lon/lat
+    coordinates. Cells are indexed in row-major (y, x) order.
+    Cells are intersected the same way as for the conservative regridding
+    weights, but the source grid may use any projection, so candidate pairs
+    are found with a spatial index rather than from lon/lat edges.
+    :param from_grid: Grid of the source data
+    :param to_grid: Target grid
+    :param cache_path: If provided, the matrix is kept in the weight store
+      in this folder and reused for the same pair of grids
+    :return: csr_array with shape (to_grid cells, from_grid cells)
+    """
+    n_from = from_grid.shape[0] * from_grid.shape[1]
+    n_to = to_grid.shape[0] * to_grid.shape[1]
+
+    weight_store = WeightStore.from_cache_path(cache_path) if cache_path is not None else None
+    key = overlap_key(from_grid, to_grid)
+    if weight_store is not None:
+        overlap = weight_store.load(key, (n_to, n_from))
+        if overlap is not None:
+            return overlap
+
+    from_cells = cell_polygons(*from_grid.cell_bounds_lonlat()).reshape(n_from)
+    to_cells = cell_polygons(*to_grid.cell_bounds_lonlat()).reshape(n_to)
+
+    # a spatial index over source cells finds all intersecting pairs in bulk
+    to_index, from_index = shapely.STRtree(from_cells).query(to_cells, predicate="intersects")
+
+    overlapping, areas = overlap_areas(to_cells[to_index], from_cells[from_index])
+    overlap = csr_array(
+        (areas, (to_index[overlapping], from_index[overlapping])),
+        shape=(n_to, n_from),
+    )
+
+    if weight_store is not None:
+        weight_store.save(key, overlap)
+    return overlap
+
+
 def regrid_any(
     data: np.ndarray,
     from_grid: Grid,
     to_grid: Grid,
+    cache_path: pathlib.Path | None = None,
 ) -> np.ndarray:
     """
     Re-grids a dataset to a shape defined by to_grid, using a nearest neighbor
     strategy. Values are **not** conserved, so this is mostly useful for masks.
-    The source data and to_grid can use different projections, but this
-    implementation is quite slow. If the grids use the same projection then
-    regrid_aligned should be used.
+    The source data and to_grid can use different projections. Each target
+    cell takes the value of the source cell it overlaps the most, or 0 if it
+    does not overlap the source grid. If the grids use the same projection
+    then regrid_aligned is faster.
     :param data: 2d gridded data
     :param from_grid: Grid of the source data
     :param to_grid: Target grid to reshape the data to
+    :param cache_path: If provided, the cell overlaps are stored in this
+      folder and reused for the same pair of grids
     :return: 2d dataset of gridded cell values in the target grid
     """
-    # when grids dont share a projection, compare individual cells
-    regridded_data = np.zeros(to_grid.shape)
+    overlap = grid_overlap_areas(
+        from_grid=from_grid, to_grid=to_grid, cache_path=cache_path
+    ).tocoo()
 
-    # generate corner points for both grids, in the same crs (lon / lat)
-    from_grid_bounds_lon, from_grid_bounds_lat = from_grid.cell_bounds_lonlat()
-    to_grid_bounds_lon, to_grid_bounds_lat = to_grid.cell_bounds_lonlat()
-
-    # find a subset of the from_grid that should be examined
-    to_grid_lon_min, to_grid_lon_max = to_grid_bounds_lon.min(), to_grid_bounds_lon.max()
-    to_grid_lat_min, to_grid_lat_max = to_grid_bounds_lat.min(), to_grid_bounds_lat.max()
-    # find the bounding box of to_grid, in from_grid cell coords
-    from_grid_ix_bounds, from_grid_iy_bounds, _ = from_grid.lonlat_to_cell_index(
-        np.array([to_grid_lon_min, to_grid_lon_max, to_grid_lon_max, to_grid_lon_min]),
-        np.array([to_grid_lat_min, to_grid_lat_min, to_grid_lat_max, to_grid_lat_max])
-    )
-    # clip any "out of bounds" coords to edges
-    from_grid_ix_bounds = np.clip(from_grid_ix_bounds, 0, from_grid.dimensions[0] - 1)
-    from_grid_iy_bounds = np.clip(from_grid_iy_bounds, 0, from_grid.dimensions[1] - 1)
-
-    for to_grid_iy, to_grid_ix in itertools.product(range(to_grid.shape[0]), range(to_grid.shape[1])):
-        to_grid_cell_polygon = geometry.Polygon(zip(to_grid_bounds_lon[to_grid_iy, to_grid_ix], to_grid_bounds_lat[to_grid_iy, to_grid_ix]))
-
-        # search the source grid for the cell with the largest intersection
-        largest_intersection = 0
-        total_intersection = 0
-
-        for from_grid_iy in range(from_grid_iy_bounds.min(), from_grid_iy_bounds.max() + 1):
-            for from_grid_ix in range(from_grid_ix_bounds.min(), from_grid_ix_bounds.max() + 1):
-                from_grid_cell_polygon = geometry.Polygon(zip(from_grid_bounds_lon[from_grid_iy, from_grid_ix], from_grid_bounds_lat[from_grid_iy, from_grid_ix]))
-                intersection = from_grid_cell_polygon.intersection(to_grid_cell_polygon)
-
-                # cells dont overlap
-                if intersection.area <= 0:
-                    continue
-
-                # accumulate the sum of the area that has been considered
-                total_intersection += intersection.area
-
-                # take the value from the target cell with the largest proportion
-                cell_intersection_ratio = intersection.area / to_grid_cell_polygon.area
-                if cell_intersection_ratio > largest_intersection:
-                    largest_intersection = cell_intersection_ratio
-                    regridded_data[to_grid_iy, to_grid_ix] = data[from_grid_iy, from_grid_ix]
-
-                # if we've seen a cell with an intersection larger than the remaining area,
-                # we've found the largest intersection
-                if largest_intersection > to_grid_cell_polygon.area - total_intersection:
-                    break
+    # argmax of each row of the sparse matrix, choosing the lowest source
+    # index when overlaps are equal
+    order = np.lexsort((overlap.col, -overlap.data, overlap.row))
+    rows = overlap.row[order]
+    first_in_row = np.ones(len(rows), dtype=bool)
+    first_in_row[1:] = rows[1:] != rows[:-1]
+
+    data_np = data if type(data) is np.ndarray else np.asarray(data)
+
+    regridded_data = np.zeros(to_grid.shape)
+    regridded_data.ravel()[rows[first_in_row]] = data_np.ravel()[overlap.col[order][first_in_row]]
 
     return regridded_data
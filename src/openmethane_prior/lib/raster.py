@@ -1,14 +1,32 @@
+import hashlib
+import math
+import os
+import pathlib
+import tempfile
+from collections.abc import Callable
+
 import numpy as np
 import pyproj
+import rasterio
+import rasterio.windows
+import rioxarray as rxr
 import xarray as xr
 
 from openmethane_prior.lib.grid.grid import Grid
 
+REMAP_BLOCK_ROWS = 256
+"""Default number of raster rows projected together by remap_raster"""
+
+RASTER_INDEX_FOLDER = "raster-index"
+"""Folder inside the cache path where raster index maps are stored"""
+
 
 def remap_raster(
     input_xr: xr.DataArray,
     target_grid: Grid,
     input_crs: pyproj.crs.CRS = 4326, # EPSG:4362
+    block_rows: int = REMAP_BLOCK_ROWS,
+    cache_path: pathlib.Path | None = None,
 ) -> np.ndarray:
     """
     Maps a rasterio dataset onto the domain grid defined by config.
@@ -16,13 +34,49 @@ def remap_raster(
     If the input dataset uses a non-standard CRS, input coordinates can be
     mapped to the grid by specifying input_crs.
 
+    The raster is projected block_rows rows at a time, so memory use is
+    bounded by the size of a block rather than the whole raster. If
+    cache_path is provided, the mapping from raster pixels to grid cells is
+    stored there and reused by any later remap of the same raster onto the
+    same grid.
+
     Returns an np.array in the shape of the domain grid, each cell containing
     the aggregate of raster values who's center point fell within the cell.
     """
+    # limit our search space for mapping input values to target cells
+    window_y, window_x = raster_window(
+        input_xr.x.to_numpy(), input_xr.y.to_numpy(), target_grid, input_crs
+    )
+    input_search_space = input_xr.isel(y=window_y, x=window_x)
+    input_search_space_np = input_search_space.to_numpy()
+
+    input_x = input_search_space.x.to_numpy()
+    input_y = input_search_space.y.to_numpy()
+
+    if cache_path is not None:
+        cell_index = cached_raster_cell_index(
+            cache_path, input_x, input_y, input_crs, target_grid, block_rows
+        )
+    else:
+        cell_index = raster_cell_index(input_x, input_y, input_crs, target_grid, block_rows)
+
+    return accumulate_raster(input_search_space_np, cell_index, target_grid, block_rows)
+
+
+def raster_window(
+    input_x: np.ndarray,
+    input_y: np.ndarray,
+    target_grid: Grid,
+    input_crs: pyproj.crs.CRS = 4326,
+) -> tuple[slice, slice]:
+    """
+    Find the (y, x) window of a raster with the provided pixel coordinates
+    which covers the bounding box of target_grid. Pixels outside the window
+    can not fall inside the grid.
+    """
     projection_transformer = pyproj.Transformer.from_crs(crs_from=input_crs, crs_to=target_grid.projection.crs, always_xy=True)
 
     # construct a bounding box for the target grid, over the input grid
-    # this will limit our search space for mapping input values to target cells
     target_grid_bounds_x = target_grid.cell_bounds_x()
     target_grid_bounds_y = target_grid.cell_bounds_y()
     target_grid_x_min, target_grid_x_max = target_grid_bounds_x.min(), target_grid_bounds_x.max()
@@ -33,42 +87,312 @@ def remap_raster(
         direction=pyproj.enums.TransformDirection.INVERSE,
     )
 
-    # rioxarray makes this easy with clip_box
-    if 'rio' in input_xr:
-        input_search_space = input_xr.rio.clip_box(
-            minx=target_bbox_input_x.min(),
-            maxx=target_bbox_input_x.max(),
-            miny=target_bbox_input_y.min(),
-            maxy=target_bbox_input_y.max()
-        )
-    else: # support native xarray.DataArray as well
-        input_search_space = input_xr.where(
-            (target_bbox_input_x.min() <= input_xr.x) &
-            (input_xr.x <= target_bbox_input_x.max()) &
-            (target_bbox_input_y.min() <= input_xr.y) &
-            (input_xr.y <= target_bbox_input_y.max()),
-            drop=True
-        )
-    input_search_space_np = input_search_space.to_numpy()
+    def _window(coords: np.ndarray, bbox_coords: np.ndarray) -> slice:
+        inside = np.flatnonzero((bbox_coords.min() <= coords) & (coords <= bbox_coords.max()))
+        if inside.size == 0:
+            return slice(0, 0)
+        return slice(inside[0], inside[-1] + 1)
 
-    # the raster is defined lat-lon so we need to reproject each row separately onto the LCC grid
-    result = np.zeros(target_grid.shape)
-    for iy in range(input_search_space.y.size):
-        y = input_search_space.y.item(iy)
-        # proj needs x,y coords in equal-sized lists, each point in the row
-        # will have the same y coord
-        y_row = np.array([y]).repeat(input_search_space.x.size)
+    return _window(input_y, target_bbox_input_y), _window(input_x, target_bbox_input_x)
+
+
+def raster_cell_index(
+    input_x: np.ndarray,
+    input_y: np.ndarray,
+    input_crs: pyproj.crs.CRS,
+    target_grid: Grid,
+    block_rows: int = REMAP_BLOCK_ROWS,
+) -> np.ndarray:
+    """
+    Find the flat (row-major) index of the target_grid cell containing the
+    center point of every pixel of a raster with the provided coordinates.
+    Returns an int32 array in the shape of the raster, with -1 for pixels
+    which are outside the grid.
+    """
+    projection_transformer = pyproj.Transformer.from_crs(
+        crs_from=input_crs, crs_to=target_grid.projection.crs, always_xy=True
+    )
+
+    # the raster is defined lat-lon so we need to reproject each point onto
+    # the LCC grid, which is done for a block of rows at a time
+    cell_index = np.full((input_y.size, input_x.size), -1, dtype=np.int32)
+    for block_start in range(0, input_y.size, max(1, block_rows)):
+        block_y = input_y[block_start:block_start + block_rows]
+        block_x_2d, block_y_2d = np.meshgrid(input_x, block_y)
 
         # the central point in the high-res raster cell lies inside the cell
         # defined on the domain grid
-        target_x, target_y = projection_transformer.transform(xx=input_search_space.x, yy=y_row)
+        target_x, target_y = projection_transformer.transform(xx=block_x_2d, yy=block_y_2d)
         target_ix, target_iy, mask = target_grid.xy_to_cell_index(target_x, target_y)
 
-        # input domain is bigger so mask indices out of range
-        if mask.any():
-            # we accumulate values from each high-res grid in the raster onto
-            # our domain.
-            # the following needs to use .at method since target_iy,target_ix indices may be repeated and we need to acumulate
-            np.add.at(result, (target_iy[mask], target_ix[mask]), input_search_space_np[iy, mask])
+        # input domain is bigger so leave indices out of range as -1
+        block_index = cell_index[block_start:block_start + block_rows]
+        block_index[mask] = target_iy[mask] * target_grid.shape[1] + target_ix[mask]
+
+    return cell_index
+
+
+def raster_index_key(
+    input_x: np.ndarray,
+    input_y: np.ndarray,
+    input_crs: pyproj.crs.CRS,
+    target_grid: Grid,
+) -> str:
+    """Identify a raster index map by the raster coordinates and CRS and the
+    geometry of the target grid.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(input_x, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(input_y, dtype=np.float64).tobytes())
+    digest.update(pyproj.CRS.from_user_input(input_crs).to_wkt().encode())
+    digest.update(target_grid.fingerprint().encode())
+    return digest.hexdigest()
+
+
+def cached_raster_cell_index(
+    cache_path: pathlib.Path,
+    input_x: np.ndarray,
+    input_y: np.ndarray,
+    input_crs: pyproj.crs.CRS,
+    target_grid: Grid,
+    block_rows: int = REMAP_BLOCK_ROWS,
+) -> np.ndarray:
+    """
+    Load the raster index map from cache_path, or compute it with
+    raster_cell_index and store it for next time. Stored maps are
+    memory-mapped read-only when loaded.
+    """
+    index_key = raster_index_key(input_x, input_y, input_crs, target_grid)
+    index_path = pathlib.Path(cache_path) / RASTER_INDEX_FOLDER / f"{index_key}.npy"
+
+    if index_path.exists():
+        cell_index = np.load(index_path, mmap_mode="r")
+        if cell_index.shape == (input_y.size, input_x.size):
+            return cell_index
+
+    cell_index = raster_cell_index(input_x, input_y, input_crs, target_grid, block_rows)
+
+    # write to a temporary file first so other processes sharing the cache
+    # never read a partially written index, unique to this thread as sectors
+    # processed in parallel may index the same raster
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{index_path.stem}.", suffix=".tmp.npy", dir=index_path.parent
+    )
+    with os.fdopen(tmp_fd, "wb") as tmp_file:
+        np.save(tmp_file, cell_index)
+    os.replace(tmp_name, index_path)
+
+    return cell_index
+
+
+def accumulate_raster(
+    values: np.ndarray,
+    cell_index: np.ndarray,
+    target_grid: Grid,
+    block_rows: int = REMAP_BLOCK_ROWS,
+) -> np.ndarray:
+    """
+    Sum raster values into the target_grid cells given by a raster index
+    map from raster_cell_index, block_rows rows at a time.
+    """
+    result = np.zeros(target_grid.shape[0] * target_grid.shape[1])
+    for block_start in range(0, cell_index.shape[0], max(1, block_rows)):
+        block_index = np.asarray(cell_index[block_start:block_start + block_rows])
+        mask = block_index >= 0
+        if not mask.any():
+            continue
+
+        # we accumulate values from each high-res grid in the raster onto
+        # our domain. np.add.at adds one pixel at a time in row order, so the
+        # values are summed in exactly the same order whatever the block size.
+        # matching the result dtype keeps np.add.at on its fast path
+        block_values = values[block_start:block_start + block_rows][mask]
+        np.add.at(result, block_index[mask], block_values.astype(np.float64))
+
+    return result.reshape(target_grid.shape)
+
+
+def count_raster_categories(
+    categories: np.ndarray,
+    codes: np.ndarray,
+    cell_index: np.ndarray,
+    target_grid: Grid,
+    block_rows: int = REMAP_BLOCK_ROWS,
+) -> np.ndarray:
+    """
+    Count the raster pixels of each category code in every target_grid cell,
+    given a raster of category codes and its index map from
+    raster_cell_index. Pixels with a code which is not in codes are ignored.
+
+    Returns an int32 array with shape (code, y, x), ordered like codes.
+    """
+    codes = np.asarray(codes)
+    code_order = np.argsort(codes)
+    sorted_codes = codes[code_order]
+    code_count = codes.size
+    cell_count = target_grid.shape[0] * target_grid.shape[1]
+
+    # counts are accumulated by (cell, code) so each block is a single bincount
+    counts = np.zeros(cell_count * code_count, dtype=np.int64)
+    if code_count == 0:
+        return counts.reshape(0, *target_grid.shape).astype(np.int32)
+
+    for block_start in range(0, cell_index.shape[0], max(1, block_rows)):
+        block_index = np.asarray(cell_index[block_start:block_start + block_rows])
+        block_categories = np.asarray(categories[block_start:block_start + block_rows])
+
+        code_position = np.minimum(np.searchsorted(sorted_codes, block_categories), code_count - 1)
+        mask = (block_index >= 0) & (sorted_codes[code_position] == block_categories)
+        if not mask.any():
+            continue
+
+        # raster rows map to a narrow band of grid cells, so only count the
+        # range of (cell, code) pairs touched by this block
+        flat = block_index[mask].astype(np.int64) * code_count + code_order[code_position[mask]]
+        flat_min = flat.min()
+        block_counts = np.bincount(flat - flat_min)
+        counts[flat_min:flat_min + block_counts.size] += block_counts
+
+    return counts.reshape(*target_grid.shape, code_count).transpose(2, 0, 1).astype(np.int32)
+
+
+class RasterWindow:
+    """
+    A window of a single GeoTIFF band covering a target grid. Rows are read
+    from disk only when they are sliced, so the window can be processed a
+    block of rows at a time without loading the whole band into memory.
+
+    Use open_raster_window to find the window for a grid.
+    """
+
+    def __init__(
+        self,
+        geotiff_path: pathlib.Path,
+        window_y: slice,
+        window_x: slice,
+        x: np.ndarray,
+        y: np.ndarray,
+        crs: pyproj.crs.CRS,
+        band: int = 1,
+    ):
+        self.dataset = rasterio.open(geotiff_path)
+        self.window_y = window_y
+        self.window_x = window_x
+        self.x = x
+        """Coordinates of pixel centres along the x axis of the window"""
+        self.y = y
+        """Coordinates of pixel centres along the y axis of the window"""
+        self.crs = crs
+        self.band = band
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Number of pixels in the window along the (y, x) axes."""
+        return self.y.size, self.x.size
+
+    @property
+    def block_rows(self) -> int:
+        """Number of rows to read at a time, which is a whole number of the
+        GeoTIFF's internal blocks (tiles or strips) so that each block is
+        only decoded once.
+        """
+        tile_rows = self.dataset.block_shapes[self.band - 1][0]
+        return tile_rows * max(1, math.ceil(REMAP_BLOCK_ROWS / tile_rows))
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        start, stop, _ = rows.indices(self.shape[0])
+        return self.dataset.read(
+            self.band,
+            window=rasterio.windows.Window.from_slices(
+                rows=(self.window_y.start + start, self.window_y.start + max(start, stop)),
+                cols=(self.window_x.start, self.window_x.stop),
+            ),
+        )
+
+    def map(self, func: Callable[[np.ndarray], np.ndarray]) -> "MappedRasterWindow":
+        """Apply func to each block of rows as it is read."""
+        return MappedRasterWindow(self, func)
+
+    def close(self):
+        """Close the underlying GeoTIFF."""
+        self.dataset.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class MappedRasterWindow:
+    """Rows of a RasterWindow transformed by a function as they are read."""
+
+    def __init__(self, window: RasterWindow, func: Callable[[np.ndarray], np.ndarray]):
+        self.window = window
+        self.func = func
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Number of pixels in the window along the (y, x) axes."""
+        return self.window.shape
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        return self.func(self.window[rows])
+
+
+def open_raster_window(
+    geotiff_path: pathlib.Path,
+    target_grid: Grid,
+    band: int = 1,
+) -> RasterWindow:
+    """Open the window of a GeoTIFF band which covers target_grid, without
+    reading any pixel values.
+    """
+    # rioxarray is only used for the pixel coordinates and CRS
+    geotiff_xr = rxr.open_rasterio(geotiff_path)
+    geotiff_x = geotiff_xr.x.to_numpy()
+    geotiff_y = geotiff_xr.y.to_numpy()
+    geotiff_crs = geotiff_xr.rio.crs
+    geotiff_xr.close()
+
+    window_y, window_x = raster_window(geotiff_x, geotiff_y, target_grid, geotiff_crs)
+    return RasterWindow(
+        geotiff_path,
+        window_y=window_y,
+        window_x=window_x,
+        x=geotiff_x[window_x],
+        y=geotiff_y[window_y],
+        crs=geotiff_crs,
+        band=band,
+    )
+
+
+def remap_geotiff(
+    geotiff_path: pathlib.Path,
+    target_grid: Grid,
+    band: int = 1,
+    block_values: Callable[[np.ndarray], np.ndarray] | None = None,
+    cache_path: pathlib.Path | None = None,
+) -> np.ndarray:
+    """
+    Map a GeoTIFF band onto target_grid like remap_raster, but only reads
+    the window of the GeoTIFF which covers the grid, one block of rows at a
+    time, so memory use scales with the area of the grid rather than the
+    size of the GeoTIFF.
+
+    If provided, block_values is applied to each block of raw values before
+    they are aggregated, for example to build a mask.
+    """
+    with open_raster_window(geotiff_path, target_grid, band=band) as window:
+        if cache_path is not None:
+            cell_index = cached_raster_cell_index(
+                cache_path, window.x, window.y, window.crs, target_grid, window.block_rows
+            )
+        else:
+            cell_index = raster_cell_index(
+                window.x, window.y, window.crs, target_grid, window.block_rows
+            )
 
-    return result
+        values = window if block_values is None else window.map(block_values)
+        return accumulate_raster(values, cell_index, target_grid, window.block_rows)
@@ -18,17 +18,19 @@
 
 """Area-weighted regridding of geospatial datasets onto the domain grid."""
 
-import bisect
-import itertools
+import multiprocessing
 import pathlib
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import shapely
 import xarray as xr
 from scipy.sparse import csr_array
-from shapely import geometry
 
 from .grid.grid import Grid
 from .logger import get_logger
-from .utils import area_of_rectangle_m2, load_zipped_pickle, save_zipped_pickle
+from .utils import area_of_rectangle_m2
+from .weight_store import WeightStore, weights_key
 
 logger = get_logger(__name__)
 
@@ -55,68 +57,249 @@ def _compute_from_areas(lat_edges: np.ndarray, lon_edges: np.ndarray) -> np.ndar
     return areas
 
 
+def cell_polygons(cell_bounds_lon: np.ndarray, cell_bounds_lat: np.ndarray) -> np.ndarray:
+    """Polygons for cells given the lon/lat of their 4 corners along the
+    last axis, such as from Grid.cell_bounds_lonlat.
+    """
+    return shapely.polygons(np.stack([cell_bounds_lon, cell_bounds_lat], axis=-1))
+
+
+def overlap_areas(cells: np.ndarray, other_cells: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Intersect each of a set of candidate pairs of cells, returning a mask
+    of the pairs which overlap and the area of each of those overlaps.
+    """
+    intersection_area = shapely.area(shapely.intersection(cells, other_cells))
+    overlapping = intersection_area > 0
+    return overlapping, intersection_area[overlapping]
+
+
+def _candidate_pairs(
+    cell_bounds_lon: np.ndarray,
+    cell_bounds_lat: np.ndarray,
+    lat_edges: np.ndarray,
+    lon_edges: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find every (domain cell, input cell) pair whose bounding boxes may overlap.
+
+    Returns flat domain cell indices alongside the lon/lat indices of the
+    candidate input cells, all as equal-length 1d arrays.
+    """
+    n_lon = len(lon_edges) - 1
+    n_lat = len(lat_edges) - 1
+
+    # equivalent to bisect.bisect_right for every domain cell at once
+    ix_start = np.maximum(
+        np.searchsorted(lon_edges, cell_bounds_lon.min(axis=-1), side="right") - 1, 0
+    )
+    ix_end = np.minimum(
+        np.searchsorted(lon_edges, cell_bounds_lon.max(axis=-1), side="right"), n_lon
+    )
+    iy_start = np.maximum(
+        np.searchsorted(lat_edges, cell_bounds_lat.min(axis=-1), side="right") - 1, 0
+    )
+    iy_end = np.minimum(
+        np.searchsorted(lat_edges, cell_bounds_lat.max(axis=-1), side="right"), n_lat
+    )
+
+    n_x = np.maximum(ix_end - ix_start, 0)
+    n_y = np.maximum(iy_end - iy_start, 0)
+    n_candidates = n_x * n_y
+
+    # expand each domain cell into its rectangular block of candidate input
+    # cells without a python loop
+    cell_index = np.repeat(np.arange(len(n_candidates)), n_candidates)
+    offset = np.arange(n_candidates.sum()) - np.repeat(
+        np.cumsum(n_candidates) - n_candidates, n_candidates
+    )
+    n_x_rep = n_x[cell_index]
+    in_ix = ix_start[cell_index] + offset % np.maximum(n_x_rep, 1)
+    in_iy = iy_start[cell_index] + offset // np.maximum(n_x_rep, 1)
+
+    return cell_index, in_ix, in_iy
+
+
+def _intersect_cells(
+    cell_bounds_lon: np.ndarray,
+    cell_bounds_lat: np.ndarray,
+    lat_edges: np.ndarray,
+    lon_edges: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Intersect a set of domain cells with the input grid.
+
+    Returns the domain cell index (relative to the cells provided), the lon/lat
+    indices of each overlapping input cell, and the fraction of that input
+    cell covered by the domain cell.
+    """
+    cell_index, in_ix, in_iy = _candidate_pairs(
+        cell_bounds_lon, cell_bounds_lat, lat_edges, lon_edges
+    )
+
+    domain_cells = cell_polygons(cell_bounds_lon, cell_bounds_lat)
+    input_cells = shapely.box(
+        lon_edges[in_ix], lat_edges[in_iy], lon_edges[in_ix + 1], lat_edges[in_iy + 1]
+    )
+
+    overlapping, intersection_area = overlap_areas(domain_cells[cell_index], input_cells)
+
+    coef = intersection_area / shapely.area(input_cells[overlapping])
+    return cell_index[overlapping], in_ix[overlapping], in_iy[overlapping], coef
+
+
+def _intersect_band(args: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Process pool entrypoint for _intersect_cells, which offsets the
+    resulting cell indices by the position of the band in the domain.
+    """
+    cell_offset, cell_bounds_lon, cell_bounds_lat, lat_edges, lon_edges = args
+    cell_index, in_ix, in_iy, coef = _intersect_cells(
+        cell_bounds_lon, cell_bounds_lat, lat_edges, lon_edges
+    )
+    return cell_index + cell_offset, in_ix, in_iy, coef
+
+
 def _build_weights(
     domain_grid: Grid,
     lat_edges: np.ndarray,
     lon_edges: np.ndarray,
     from_areas: np.ndarray,
+    workers: int = 1,
 ) -> csr_array:
     """Build a sparse (n_out_cells, n_in_cells) weight matrix via Shapely polygon intersection.
 
     Each entry W[out, inp] = (fraction of input cell covered by output cell)
     * from_area[inp] / domain_grid.cell_area, so that W @ data.ravel() yields
     area-conserving regridded values in the same units as the input.
+
+    Candidate pairs are found for all domain cells at once and intersected
+    using vectorised shapely operations, so the cost scales with the number
+    of overlapping pairs rather than requiring a python loop per cell.
+
+    When ``workers`` is greater than 1, the domain is split into bands of rows
+    which are intersected in a process pool. Bands are stitched back together
+    in order, so the result is identical to the serial calculation.
     """
     n_lon = len(lon_edges) - 1
     n_lat = len(lat_edges) - 1
-    n_out = domain_grid.shape[0] * domain_grid.shape[1]
+    n_rows, n_cols = domain_grid.shape
+    n_out = n_rows * n_cols
     n_in = n_lat * n_lon
 
     cell_bounds_lon, cell_bounds_lat = domain_grid.cell_bounds_lonlat()
 
-    rows, cols, data = [], [], []
-
-    for i, j in itertools.product(range(domain_grid.shape[0]), range(domain_grid.shape[1])):
-        ij = i * domain_grid.shape[1] + j
-        xvals = cell_bounds_lon[i, j]
-        yvals = cell_bounds_lat[i, j]
-        domain_cell = geometry.Polygon(zip(xvals, yvals))
-
-        ixminl = bisect.bisect_right(lon_edges, np.min(xvals))
-        ixmaxr = bisect.bisect_right(lon_edges, np.max(xvals))
-        iyminl = bisect.bisect_right(lat_edges, np.min(yvals))
-        iymaxr = bisect.bisect_right(lat_edges, np.max(yvals))
-
-        for ix, iy in itertools.product(
-            range(max(0, ixminl - 1), min(n_lon, ixmaxr)),
-            range(max(0, iyminl - 1), min(n_lat, iymaxr)),
-        ):
-            input_cell = geometry.box(
-                lon_edges[ix], lat_edges[iy], lon_edges[ix + 1], lat_edges[iy + 1]
-            )
-            if domain_cell.intersects(input_cell):
-                intersection = domain_cell.intersection(input_cell)
-                coef = intersection.area / input_cell.area
-                rows.append(ij)
-                cols.append(iy * n_lon + ix)
-                data.append(coef * from_areas[iy, ix] / domain_grid.cell_area)
+    # several bands per worker keeps the pool busy when bands cover areas
+    # with different input densities
+    n_bands = 1 if workers <= 1 else min(n_rows, workers * 4)
+    bands = [
+        (
+            band_rows[0] * n_cols,
+            cell_bounds_lon[band_rows].reshape(-1, 4),
+            cell_bounds_lat[band_rows].reshape(-1, 4),
+            lat_edges,
+            lon_edges,
+        )
+        for band_rows in np.array_split(np.arange(n_rows), n_bands)
+        if len(band_rows) > 0
+    ]
+
+    if n_bands == 1:
+        band_results = [_intersect_band(band) for band in bands]
+    else:
+        logger.debug(f"Calculating weights in {len(bands)} bands over {workers} workers")
+        # sectors are processed in threads which may hold locks, so workers
+        # must not be forked from this process (forkserver isn't on Windows)
+        start_method = (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(start_method)
+        ) as executor:
+            band_results = list(executor.map(_intersect_band, bands))
+
+    rows, in_ix, in_iy, coef = (np.concatenate(parts) for parts in zip(*band_results))
+
+    cols = in_iy * n_lon + in_ix
+    data = coef * from_areas[in_iy, in_ix] / domain_grid.cell_area
 
     return csr_array((data, (rows, cols)), shape=(n_out, n_in))
 
 
+def _cached_weights(
+    domain_grid: Grid,
+    lat_edges: np.ndarray,
+    lon_edges: np.ndarray,
+    weight_store: WeightStore,
+    cache_name: str | None = None,
+    workers: int = 1,
+) -> csr_array:
+    """Load the weight matrix between the input edges and the domain grid
+    from the weight store, calculating and storing it if necessary.
+    """
+    description = cache_name or "input"
+    key = weights_key(domain_grid, lat_edges, lon_edges)
+    shape = (
+        domain_grid.shape[0] * domain_grid.shape[1],
+        (len(lat_edges) - 1) * (len(lon_edges) - 1),
+    )
+
+    # weights calculated before the store existed were saved by cache_name,
+    # which doesn't identify their geometry, so they are removed and rebuilt
+    W = weight_store.load(key, shape, legacy_name=cache_name)
+    if W is not None:
+        logger.info(f"Loading existing Grid weights for {description}")
+        return W
+
+    logger.info(f"No existing Grid weights for {description}, calculating")
+    from_areas = _compute_from_areas(lat_edges, lon_edges)
+    W = _build_weights(domain_grid, lat_edges, lon_edges, from_areas, workers=workers)
+    weight_store.save(key, W)
+    return W
+
+
+def _regrid_chunk(
+    W: csr_array,
+    values: np.ndarray,
+    from_areas: np.ndarray | None = None,
+) -> np.ndarray:
+    """Apply the weight matrix to a block of input values with the spatial
+    dimensions last, returning a (n_steps, n_out_cells) array. If from_areas
+    is provided, the input is extensive and is first divided by the flattened
+    source cell areas.
+    """
+    flat = values.reshape(-1, values.shape[-2] * values.shape[-1]).astype(np.float64)
+    if from_areas is not None:
+        flat /= from_areas
+    np.nan_to_num(flat, copy=False, nan=0.0)
+    return (W @ flat.T).T
+
+
+def _regrid_block(
+    values: np.ndarray,
+    W: csr_array,
+    from_areas: np.ndarray | None,
+    out_shape: tuple[int, int],
+) -> np.ndarray:
+    """Regrid a single dask block, replacing the trailing spatial dimensions
+    with the domain grid dimensions.
+    """
+    regridded = _regrid_chunk(W, values, from_areas)
+    return regridded.reshape(*values.shape[:-2], *out_shape).astype(np.float32)
+
+
 def regrid_data_array_conservative(
     data_da: xr.DataArray,
     domain_grid: Grid,
     cache_path: pathlib.Path,
-    cache_name: str,
+    cache_name: str | None = None,
     lat_dim: str = "latitude",
     lon_dim: str = "longitude",
     extensive: bool = False,
+    workers: int = 1,
+    chunk_size: int | None = None,
 ) -> xr.DataArray:
     """Regrid a DataArray onto the domain grid using area-weighted interpolation.
 
     The sparse weight matrix is computed on the first call and cached to disk;
-    subsequent calls with the same ``cache_name`` load it directly.
+    subsequent calls mapping between the same input coordinates and domain
+    grid load it directly, even if they come from a different sector.
 
     Parameters
     ----------
@@ -128,8 +311,8 @@ def regrid_data_array_conservative(
     cache_path
         Directory in which to save/load the sparse weight matrix.
     cache_name
-        Unique identifier used to name the cache file. Using a combination of
-        data asset name and domain name is recommended.
+        Descriptive name for the input and domain, used in log messages.
+        Cached weights are identified by the grid geometry, not by name.
     lat_dim
         Name of the latitude dimension in ``data_da``.
     lon_dim
@@ -140,16 +323,24 @@ def regrid_data_array_conservative(
         regridding so that the weight matrix, which expects a density, receives
         the correct units. The output is then in the same per-m² units as a
         density input would produce.
+    workers
+        Number of processes used to calculate the weight matrix when it is
+        not already cached. The result does not depend on the number of
+        workers.
+    chunk_size
+        If provided, the input is read and regridded this many steps of its
+        first leading dimension (usually time) at a time, so peak memory
+        scales with the chunk size rather than the length of the input.
+        The result does not depend on the chunk size.
 
     Returns
     -------
         DataArray with the same leading dimensions/coordinates as ``data_da``
         and spatial dimensions replaced by ``(y, x)`` on the domain grid.
+        If ``data_da`` is backed by dask, the result is a lazy dask-backed
+        DataArray with the same leading chunks, computed one block at a time.
     """
-    cache_path = pathlib.Path(cache_path)
-    cache_file = cache_path / f"{cache_name}_weights.p.gz"
-
-    # bisect-based candidate search requires ascending lat order
+    # searchsorted-based candidate search requires ascending lat order
     data_da = data_da.sortby(lat_dim)
 
     lat_centres = np.around(np.float64(data_da[lat_dim].values), 3)
@@ -157,45 +348,67 @@ def regrid_data_array_conservative(
     lat_edges = _compute_cell_edges(lat_centres)
     lon_edges = _compute_cell_edges(lon_centres)
 
-    if cache_file.exists():
-        logger.info(f"Loading existing Grid weights for {cache_name}")
-        W = load_zipped_pickle(cache_file)
-    else:
-        logger.info(f"No existing Grid weights for {cache_name}, calculating")
-        from_areas = _compute_from_areas(lat_edges, lon_edges)
-        W = _build_weights(domain_grid, lat_edges, lon_edges, from_areas)
-        save_zipped_pickle(W, cache_file)
-
-    if extensive:
-        from_areas = _compute_from_areas(lat_edges, lon_edges)
-        area_da = xr.DataArray(
-            from_areas,
-            dims=[lat_dim, lon_dim],
-            coords={lat_dim: data_da[lat_dim], lon_dim: data_da[lon_dim]},
-        )
-        data_da = data_da / area_da
+    W = _cached_weights(
+        domain_grid=domain_grid,
+        lat_edges=lat_edges,
+        lon_edges=lon_edges,
+        weight_store=WeightStore.from_cache_path(cache_path),
+        cache_name=cache_name,
+        workers=workers,
+    )
 
     spatial_dims = {lat_dim, lon_dim}
     leading_dims = [d for d in data_da.dims if d not in spatial_dims]
 
     data_da = data_da.transpose(*leading_dims, lat_dim, lon_dim)
 
-    values = data_da.values.astype(np.float64)
-    n_lat, n_lon = values.shape[-2], values.shape[-1]
-    leading_shape = values.shape[:-2]
+    leading_shape = data_da.shape[:-2]
 
-    flat = values.reshape(-1, n_lat * n_lon)
-    flat = np.nan_to_num(flat, nan=0.0)
-    regridded = (W @ flat.T).T.reshape(*leading_shape, *domain_grid.shape)
+    # extensive inputs are divided by source cell area in each chunk, so the
+    # full input never has to be materialised
+    from_areas = None
+    if extensive:
+        from_areas = _compute_from_areas(lat_edges, lon_edges).ravel()
 
     leading_coords = {d: data_da[d].values for d in leading_dims if d in data_da.coords}
+    output_coords = {
+        **leading_coords,
+        "y": np.arange(domain_grid.shape[0]),
+        "x": np.arange(domain_grid.shape[1]),
+    }
+
+    # dask-backed inputs are regridded block by block, returning a lazy result
+    if data_da.chunks is not None:
+        regridded_lazy = xr.apply_ufunc(
+            _regrid_block,
+            data_da.chunk({lat_dim: -1, lon_dim: -1}),
+            kwargs={"W": W, "from_areas": from_areas, "out_shape": domain_grid.shape},
+            input_core_dims=[[lat_dim, lon_dim]],
+            output_core_dims=[["y", "x"]],
+            dask="parallelized",
+            output_dtypes=[np.float32],
+            dask_gufunc_kwargs={
+                "output_sizes": {"y": domain_grid.shape[0], "x": domain_grid.shape[1]}
+            },
+        )
+        return xr.DataArray(
+            regridded_lazy.data, dims=[*leading_dims, "y", "x"], coords=output_coords
+        )
 
-    return xr.DataArray(
-        regridded.astype(np.float32),
-        dims=[*leading_dims, "y", "x"],
-        coords={
-            **leading_coords,
-            "y": np.arange(domain_grid.shape[0]),
-            "x": np.arange(domain_grid.shape[1]),
-        },
-    )
+    regridded = np.empty((*leading_shape, *domain_grid.shape), dtype=np.float32)
+
+    if len(leading_dims) == 0:
+        regridded[...] = _regrid_chunk(W, data_da.values, from_areas).reshape(domain_grid.shape)
+    else:
+        # stream over the first leading dimension so peak memory is bounded
+        # by the chunk size rather than the length of the input
+        n_leading = leading_shape[0]
+        step = max(1, n_leading if chunk_size is None else chunk_size)
+        for start in range(0, n_leading, step):
+            stop = min(start + step, n_leading)
+            chunk = data_da[start:stop].values
+            regridded[start:stop] = _regrid_chunk(W, chunk, from_areas).reshape(
+                stop - start, *leading_shape[1:], *domain_grid.shape
+            )
+
+    return xr.DataArray(regridded, dims=[*leading_dims, "y", "x"], coords=output_coords)
@@ -23,6 +23,7 @@ from collections.abc import Callable
 import numpy as np
 import xarray as xr
 
+from openmethane_prior.lib.data_manager.source import DataSource
 from .config import PriorSectorConfig
 
 emission_categories = [
@@ -77,3 +78,8 @@ class PriorSector:
 
     cf_long_name: str = None
     """The CF Conventions `long_name` attribute, if needed."""
+
+    data_sources: list[DataSource] = attrs.field(factory=list)
+    """DataSources used by create_estimate. These are fetched and parsed
+    ahead of time by DataManager.prefetch, so they can be prepared
+    concurrently with the data sources of other sectors."""
@@ -0,0 +1,259 @@
+#
+# Copyright 2026 The Superpower Institute Ltd.
+#
+# This file is part of Open Methane.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""On-disk store for regridding weight matrices, keyed by grid geometry."""
+
+import hashlib
+import os
+import pathlib
+import shutil
+import tempfile
+
+import attrs
+import numpy as np
+from scipy.sparse import csr_array
+
+from .grid.grid import Grid
+from .logger import get_logger
+from .utils import load_zipped_pickle
+
+logger = get_logger(__name__)
+
+WEIGHT_STORE_FOLDER = "regrid-weights"
+"""Folder inside the cache path where weight matrices are stored"""
+
+WEIGHT_STORE_MAX_BYTES = 4 * 1024**3
+"""Default size limit for all weight matrices in a store"""
+
+WEIGHT_STORE_SUFFIX = ".weights"
+"""Suffix for the folder holding the arrays of a single weight matrix"""
+
+LEGACY_WEIGHT_STORE_SUFFIX = ".p.gz"
+"""Suffix for weight matrices stored as gzipped pickles, which are migrated
+to the current format when they are first read"""
+
+LEGACY_NAMED_WEIGHTS_SUFFIX = "_weights.p.gz"
+"""Suffix for weight matrices stored directly in the cache path, named after
+the input and domain rather than keyed by geometry, which are removed rather
+than migrated"""
+
+CSR_ARRAYS = ("indptr", "indices", "data")
+"""Arrays which fully describe a CSR matrix alongside its shape"""
+
+
+def save_csr_arrays(weights: csr_array, path: pathlib.Path):
+    """Save a CSR matrix as a folder of uncompressed .npy files, one for each
+    of the underlying arrays, which can be memory-mapped when loaded.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    for name in CSR_ARRAYS:
+        np.save(path / f"{name}.npy", getattr(weights, name))
+    np.save(path / "shape.npy", np.array(weights.shape, dtype=np.int64))
+
+
+def load_csr_arrays(path: pathlib.Path) -> csr_array:
+    """Load a CSR matrix saved with save_csr_arrays. The underlying arrays are
+    memory-mapped read-only, so loading is near-instant and the pages are
+    shared between processes using the same matrix.
+    """
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in CSR_ARRAYS}
+    shape = tuple(int(n) for n in np.load(path / "shape.npy"))
+    return csr_array((arrays["data"], arrays["indices"], arrays["indptr"]), shape=shape, copy=False)
+
+
+def weights_key(domain_grid: Grid, lat_edges: np.ndarray, lon_edges: np.ndarray) -> str:
+    """Identify a weight matrix by the geometry of the grids it maps between,
+    so that weights are reused whenever the geometry matches and recalculated
+    whenever it changes, regardless of the name of the input or domain.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(lat_edges, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lon_edges, dtype=np.float64).tobytes())
+    digest.update(domain_grid.fingerprint().encode())
+    return digest.hexdigest()
+
+
+def overlap_key(from_grid: Grid, to_grid: Grid) -> str:
+    """Identify a matrix of the overlap between the cells of two grids by
+    their geometry, like weights_key.
+    """
+    digest = hashlib.sha256(b"overlap")
+    digest.update(from_grid.fingerprint().encode())
+    digest.update(to_grid.fingerprint().encode())
+    return digest.hexdigest()
+
+
+@attrs.define()
+class WeightStore:
+    """
+    Folder of regridding weight matrices shared by every sector and domain
+    using the same cache path. Matrices are stored under a key derived from
+    the geometry of the source and target grids, as raw arrays which are
+    memory-mapped when loaded.
+
+    The total size of the store is limited to max_bytes, evicting the least
+    recently used matrices first.
+    """
+
+    path: pathlib.Path = attrs.field(converter=pathlib.Path)
+    """Folder where weight matrices are stored"""
+
+    max_bytes: int | None = WEIGHT_STORE_MAX_BYTES
+    """Maximum combined size of stored matrices, or None for no limit"""
+
+    legacy_path: pathlib.Path | None = attrs.field(
+        default=None, converter=attrs.converters.optional(pathlib.Path)
+    )
+    """Folder where weight matrices were stored by name before the store
+    existed, which are removed when first looked up"""
+
+    @classmethod
+    def from_cache_path(cls, cache_path: pathlib.Path, **kwargs) -> "WeightStore":
+        """Create a WeightStore in the standard location inside cache_path."""
+        return cls(
+            path=pathlib.Path(cache_path) / WEIGHT_STORE_FOLDER,
+            legacy_path=pathlib.Path(cache_path),
+            **kwargs,
+        )
+
+    def file_path(self, key: str) -> pathlib.Path:
+        """Location on disk of the weight matrix stored with key."""
+        return self.path / f"{key}{WEIGHT_STORE_SUFFIX}"
+
+    def load(
+        self, key: str, shape: tuple[int, int], legacy_name: str | None = None
+    ) -> csr_array | None:
+        """Load a stored weight matrix, or return None if no matrix is stored
+        for key or the stored matrix does not have the expected shape.
+
+        If legacy_name is provided, a matrix stored under that name in
+        legacy_path is removed. Its name doesn't identify the geometry it was
+        calculated for, so it can't be trusted to match key and is rebuilt.
+        """
+        if legacy_name is not None:
+            self._remove_legacy_named(legacy_name)
+
+        file_path = self.file_path(key)
+        if not file_path.exists():
+            self._migrate_legacy(key)
+        if not file_path.exists():
+            return None
+
+        weights = load_csr_arrays(file_path)
+        if weights.shape != tuple(shape):
+            logger.warning(
+                f"Discarding stored weights {key} with shape {weights.shape}, expected {shape}"
+            )
+            shutil.rmtree(file_path, ignore_errors=True)
+            return None
+
+        # record the access so recently used matrices are evicted last
+        os.utime(file_path)
+        return weights
+
+    def save(self, key: str, weights: csr_array):
+        """Store a weight matrix, evicting older matrices if the store has
+        grown beyond max_bytes.
+        """
+        file_path = self.file_path(key)
+
+        # write to a temporary folder first so other processes sharing the
+        # store never read a partially written matrix, unique to this thread
+        # as sectors processed in parallel may store the same matrix
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = pathlib.Path(
+            tempfile.mkdtemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=self.path)
+        )
+        save_csr_arrays(weights, tmp_path)
+        try:
+            os.replace(tmp_path, file_path)
+        except OSError:
+            # another process stored the same matrix first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        self.evict(keep=file_path)
+
+    def size(self) -> int:
+        """Return the combined size in bytes of all stored matrices."""
+        total_bytes = 0
+        for stored in self._stored_files():
+            try:
+                total_bytes += _stored_size(stored)
+            except FileNotFoundError:
+                continue
+        return total_bytes
+
+    def evict(self, keep: pathlib.Path | None = None):
+        """Remove least recently used matrices until the store is within
+        max_bytes. The matrix at keep is never removed.
+        """
+        if self.max_bytes is None:
+            return
+
+        stored_stats = []
+        for stored in self._stored_files():
+            try:
+                stored_stats.append((stored, stored.stat().st_mtime, _stored_size(stored)))
+            except FileNotFoundError:
+                # removed by another process or thread sharing the store
+                continue
+
+        stored_stats.sort(key=lambda stored_stat: stored_stat[1])
+        total_bytes = sum(size for _, _, size in stored_stats)
+        for stored, _, size in stored_stats:
+            if total_bytes <= self.max_bytes:
+                break
+            if stored == keep:
+                continue
+            logger.debug(f"Evicting stored weights {stored.name}")
+            total_bytes -= size
+            shutil.rmtree(stored, ignore_errors=True)
+
+    def _migrate_legacy(self, key: str):
+        """Convert a matrix stored under key as a gzipped pickle to the
+        current format.
+        """
+        legacy_path = self.path / f"{key}{LEGACY_WEIGHT_STORE_SUFFIX}"
+        if not legacy_path.exists():
+            return
+
+        logger.info(f"Migrating stored weights {key} from {legacy_path.name}")
+        weights = csr_array(load_zipped_pickle(legacy_path))
+        self.save(key, weights)
+        legacy_path.unlink(missing_ok=True)
+
+    def _remove_legacy_named(self, legacy_name: str):
+        """Remove a matrix stored in legacy_path under legacy_name."""
+        if self.legacy_path is None:
+            return
+
+        legacy_path = self.legacy_path / f"{legacy_name}{LEGACY_NAMED_WEIGHTS_SUFFIX}"
+        if legacy_path.exists():
+            logger.info(f"Removing legacy weights {legacy_path.name}, they will be rebuilt")
+            legacy_path.unlink(missing_ok=True)
+
+    def _stored_files(self) -> list[pathlib.Path]:
+        if not self.path.exists():
+            return []
+        return [
+            stored for stored in self.path.iterdir() if stored.name.endswith(WEIGHT_STORE_SUFFIX)
+        ]
+
+
+def _stored_size(stored: pathlib.Path) -> int:
+    return sum(part.stat().st_size for part in stored.iterdir())
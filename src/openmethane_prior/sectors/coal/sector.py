@@ -108,4 +108,10 @@ sector = AustraliaPriorSector(
     anzsic_codes=["06"], # Coal mining
     cf_standard_name="extraction_production_and_transport_of_fuel",
     create_estimate=process_emissions,
+    data_sources=[
+        safeguard_mechanism_data_source,
+        safeguard_locations_data_source,
+        coal_facilities_data_source,
+        inventory_data_source,
+    ],
 )
@@ -81,4 +81,8 @@ sector = PriorSector(
     unfccc_categories=["1.A.1.a"], # Public electricity and heat production
     cf_standard_name="energy_production_and_distribution",
     create_estimate=process_emissions,
+    data_sources=[
+        inventory_data_source,
+        electricity_facilities_data_source,
+    ],
 )
@@ -44,7 +44,7 @@ def process_emissions(sector: PriorSector, sector_config: PriorSectorConfig, pri
     config = sector_config.prior_config
 
     gfas_asset = sector_config.data_manager.get_asset(gfas_data_source)
-    gfas_ds = xr.open_dataset(gfas_asset.path)
+    gfas_ds = xr.open_dataset(gfas_asset.path, chunks=config.input_chunks("valid_time"))
 
     # GFAS times are labelled at midnight at the end of the day (i.e. they look
     # like the following day); subtract one day to correct to the actual date
@@ -57,10 +57,13 @@ def process_emissions(sector: PriorSector, sector_config: PriorSectorConfig, pri
         domain_grid=config.domain().grid,
         cache_path=config.intermediates_path,
         cache_name=f"{gfas_asset.name}_{prior_ds.domain_name}",
+        workers=config.regrid_workers,
+        chunk_size=config.regrid_chunk_size,
     )
-    gfas_ds.close()
-
+    # lazily regridded inputs are read from the file here, so this must
+    # happen before the file is closed
     result = np.expand_dims(regridded_da.values, 1)  # add single vertical dimension
+    gfas_ds.close()
 
     return xr.DataArray(
         result,
@@ -78,4 +81,7 @@ sector: PriorSector = PriorSector(
     emission_category="natural",
     cf_standard_name="fires",
     create_estimate=process_emissions,
+    data_sources=[
+        gfas_data_source,
+    ],
 )
@@ -60,4 +60,8 @@ sector = PriorSector(
     unfccc_categories=["2"], # Industrial Processes
     cf_standard_name="industrial_processes_and_combustion",
     create_estimate=process_emissions,
+    data_sources=[
+        night_lights_data_source,
+        inventory_data_source,
+    ],
 )
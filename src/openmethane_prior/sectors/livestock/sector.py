@@ -75,4 +75,7 @@ sector = PriorSector(
     unfccc_categories=["3.A"], # Enteric Fermentation
     cf_standard_name="domesticated_livestock",
     create_estimate=process_emissions,
+    data_sources=[
+        livestock_data_source,
+    ],
 )
@@ -16,9 +16,6 @@
 # limitations under the License.
 #
 
-import numpy as np
-import rasterio
-import rioxarray as rxr
 import xarray as xr
 
 from openmethane_prior.data_sources.inventory import (
@@ -29,13 +26,12 @@ from openmethane_prior.data_sources.inventory import (
 from openmethane_prior.data_sources.landuse import (
     alum_codes_for_sector,
     alum_sector_mapping_data_source,
-    landuse_map_data_source,
+    landuse_counts_data_source,
 )
 from openmethane_prior.lib import (
     kg_to_period_cell_flux,
     logger,
     regrid_data,
-    remap_raster,
     PriorSectorConfig,
     PriorSector,
 )
@@ -58,38 +54,21 @@ def process_emissions(
     # load the national inventory data, ready to calculate sectoral totals
     emissions_inventory = sector_config.data_manager.get_asset(inventory_data_source).data
 
-    # Read the land use type data band
-    logger.debug("Loading land use data")
-    # this seems to need two approaches since rioxarray
-    # seems to always convert to float which we don't want but we need it for the other tif attributes
-    landuse_asset = sector_config.data_manager.get_asset(landuse_map_data_source)
-    landUseData = rxr.open_rasterio(landuse_asset.path, masked=True)
-    lu_x = landUseData.x
-    lu_y = landUseData.y
-    lu_crs = landUseData.rio.crs
-    landUseData.close()
-
-    dataBand = rasterio.open(landuse_asset.path, engine='rasterio').read()
-    dataBand = dataBand.squeeze()
+    # count land use pixels for the sector codes in each grid cell
+    landuse_counts = sector_config.data_manager.get_asset(landuse_counts_data_source).data
+    sector_gridded, inventory_gridded = landuse_counts.sector_pixels(sector_alum_codes)
 
     inventory_domain = sector_config.data_manager.get_asset(inventory_domain_data_source).data
     inventory_mask_regridded = regrid_data(
         inventory_domain.dataset['inventory_mask'],
         from_grid=inventory_domain.grid,
         to_grid=config.domain().grid,
+        cache_path=config.intermediates_path,
     )
 
-    # create a mask of pixels which match the sector code
-    sector_mask = np.isin(dataBand, sector_alum_codes)
-    sector_xr = xr.DataArray(sector_mask, coords={ 'y': lu_y, 'x': lu_x  })
-
-    # now aggregate to coarser resolution of the domain grid
-    sector_gridded = remap_raster(sector_xr, config.domain().grid, input_crs=lu_crs)
-
     # apply inventory mask before counting any land use
     sector_gridded *= inventory_mask_regridded
 
-    inventory_gridded = remap_raster(sector_xr, inventory_domain.grid, input_crs=lu_crs)
     # now mask to region of inventory
     inventory_gridded *= inventory_domain.dataset['inventory_mask']
 
@@ -114,4 +93,10 @@ sector = PriorSector(
     unfccc_categories=["4"], # Land Use, Land-Use Change and Forestry
     cf_standard_name="anthropogenic_land_use_change",
     create_estimate=process_emissions,
+    data_sources=[
+        alum_sector_mapping_data_source,
+        inventory_data_source,
+        landuse_counts_data_source,
+        inventory_domain_data_source,
+    ],
 )
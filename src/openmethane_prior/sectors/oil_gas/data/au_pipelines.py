@@ -19,6 +19,7 @@ import geopandas as gpd
 import restapi # https://github.com/Bolton-and-Menk-GIS/restapi
 
 from openmethane_prior.lib import ConfiguredDataSource, DataSource
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 
 
@@ -43,9 +44,7 @@ def fetch_au_gas_pipelines(data_source: ConfiguredDataSource):
     )
     df = gpd.GeoDataFrame.from_features(pipelines_features.features)
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-        return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of gas pipelines in Australia, via Geoscience Australia.
@@ -53,7 +52,9 @@ def fetch_au_gas_pipelines(data_source: ConfiguredDataSource):
 au_gas_pipelines_data_source = DataSource(
     name="AU-gas-pipelines",
     url="https://services.ga.gov.au/gis/rest/services/Oil_Gas_Pipelines/MapServer",
-    file_path="AU-gas-pipelines.geojson",
+    file_path="AU-gas-pipelines.gpkg",
     fetch=fetch_au_gas_pipelines,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
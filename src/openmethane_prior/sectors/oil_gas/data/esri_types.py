@@ -17,6 +17,7 @@
 #
 import datetime
 import numpy as np
+import pandas as pd
 
 
 def map_esri_date_to_date(esri_date_milliseconds) -> datetime.date | None:
@@ -37,3 +38,10 @@ def map_esri_date_to_str(esri_date_milliseconds) -> str | None:
     """Convert an esriFieldTypeDate value to RFC3339 date string."""
     date = map_esri_date_to_date(esri_date_milliseconds)
     return date.isoformat() if date is not None else None
+
+
+def map_esri_dates_to_datetime(esri_dates: pd.Series) -> pd.Series:
+    """Convert a column of esriFieldTypeDate values to a datetime64 column
+    of UTC dates.
+    """
+    return pd.to_datetime(esri_dates.map(map_esri_date_to_str))
@@ -19,6 +19,7 @@ import json
 import restapi # https://github.com/Bolton-and-Menk-GIS/restapi
 
 from openmethane_prior.lib import DataSource, ConfiguredDataSource
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 
 from .esri_types import map_esri_date_to_str
@@ -83,9 +84,7 @@ def fetch_nopta_titles(data_source: ConfiguredDataSource):
             if feature_key.endswith("Date"):
                 feature["properties"][feature_key] = map_esri_date_to_str(feature["properties"][feature_key])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        json.dump(layer_features.json, asset_file)
-        return data_source.asset_path
+    return write_geopackage(json.dumps(layer_features.json), data_source.asset_path)
 
 
 def parse_nopta_titles(data_source: ConfiguredDataSource):
@@ -102,10 +101,12 @@ def parse_nopta_titles(data_source: ConfiguredDataSource):
 # Source: https://www.nopta.gov.au/maps-and-public-data/neats-info.html
 nopta_titles_data_source = DataSource(
     name="NOPTA-titles",
-    file_path="NOPTA-titles.geojson",
+    file_path="NOPTA-titles.gpkg",
     url=f"{NOPTA_ARCGIS_URL}/Public/TitlesCompany_NOPTA/MapServer",
     fetch=fetch_nopta_titles,
     parse=parse_nopta_titles,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
@@ -136,9 +137,7 @@ def fetch_nopta_wells(data_source: ConfiguredDataSource):
         # convert esriFieldTypeDate to RFC3339 date
         feature["properties"]["RigReleaseDate"] = map_esri_date_to_str(feature["properties"]["RigReleaseDate"])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        json.dump(layer_features.json, asset_file)
-        return data_source.asset_path
+    return write_geopackage(json.dumps(layer_features.json), data_source.asset_path)
 
 
 def parse_nopta_wells(data_source: ConfiguredDataSource):
@@ -165,7 +164,9 @@ def parse_nopta_wells(data_source: ConfiguredDataSource):
 # Source: https://www.nopta.gov.au/maps-and-public-data/nopims-info.html
 nopta_wells_data_source = DataSource(
     name="NOPTA-wells",
-    file_path="NOPTA-wells.geojson",
+    file_path="NOPTA-wells.gpkg",
     fetch=fetch_nopta_wells,
     parse=parse_nopta_wells,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
@@ -16,11 +16,12 @@
 # limitations under the License.
 #
 import geopandas as gpd
-import json
+import io
 import pandas as pd
 from owslib.wfs import WebFeatureService
 
 from openmethane_prior.lib import DataSource
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 from openmethane_prior.lib.data_manager.source import ConfiguredDataSource
 
@@ -61,17 +62,15 @@ def fetch_nsw_drillholes(data_source: ConfiguredDataSource):
     )
 
     features_df = pd.concat([
-        gpd.GeoDataFrame.from_features(json.loads(nsw_drillholes_feature_csg.read())),
-        gpd.GeoDataFrame.from_features(json.loads(nsw_drillholes_feature_petroleum.read())),
+        gpd.read_file(io.BytesIO(nsw_drillholes_feature_csg.read())),
+        gpd.read_file(io.BytesIO(nsw_drillholes_feature_petroleum.read())),
     ])
 
     # only include drillholes relevant to CSG and petroleum production
     features_df = features_df[features_df["business_purpose"].isin(["Coal seam methane", "Petroleum"])]
     features_df = features_df[features_df["hole_purpose"].isin(["Production"])]
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(features_df.to_json())
-        return data_source.asset_path
+    return write_geopackage(features_df, data_source.asset_path)
 
 
 # Locations of coal seam gas and petroleum production drillholes in the
@@ -80,9 +79,11 @@ def fetch_nsw_drillholes(data_source: ConfiguredDataSource):
 # Source: https://data.nsw.gov.au/data/dataset/nsw-drillholes-petroleum
 nsw_drillholes_data_source = DataSource(
     name="NSW-drillholes-csg-petroleum",
-    file_path="NSW-drillholes-csg-petroleum.geojson",
+    file_path="NSW-drillholes-csg-petroleum.gpkg",
     fetch=fetch_nsw_drillholes,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
@@ -109,15 +110,13 @@ def fetch_nsw_titles(data_source: ConfiguredDataSource):
         outputFormat="application/json",
     )
 
-    features_df = gpd.GeoDataFrame.from_features(json.loads(nsw_titles_feature.read()))
+    features_df = gpd.read_file(io.BytesIO(nsw_titles_feature.read()))
 
     # only include titles relevant to petroleum production
     features_df = features_df[features_df["resource"] == "PETROLEUM"]
     features_df = features_df[features_df["operation"] == "MINING"]
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(features_df.to_json())
-        return data_source.asset_path
+    return write_geopackage(features_df, data_source.asset_path)
 
 
 # Locations of coal seam gas and petroleum production titles in the
@@ -125,7 +124,9 @@ def fetch_nsw_titles(data_source: ConfiguredDataSource):
 # Source: https://data.nsw.gov.au/data/dataset/nsw-mining-titles
 nsw_titles_data_source = DataSource(
     name="NSW-titles-csg-petroleum",
-    file_path="NSW-titles-csg-petroleum.geojson",
+    file_path="NSW-titles-csg-petroleum.gpkg",
     fetch=fetch_nsw_titles,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
@@ -15,36 +15,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-import datetime
 import numpy as np
+import pandas as pd
 import pathlib
 
 from openmethane_prior.lib import DataSource, ConfiguredDataSource
-from openmethane_prior.lib.data_manager.fetchers import fetch_zipped_shp_to_gdf
+from openmethane_prior.lib.data_manager.fetchers import fetch_zipped_shp_to_gdf, write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 
 
 def fetch_nt_titles(data_source: ConfiguredDataSource) -> pathlib.Path:
-    """Fetch a zipped Shapefile (.shp) and convert to GeoJSON using geopandas."""
+    """Fetch a zipped Shapefile (.shp) and convert to GeoPackage using geopandas."""
     # fetch the zipfile in data_source.url and read the included Shapefile
     df = fetch_zipped_shp_to_gdf(data_source.url, "PETRO_TITLE_PROD_GRNT.shp")
 
     # remove entries with no granted date, these are unusable
     df = df[~np.isnat(df["DT_GRNT"])]
 
-    # datetime64 objects aren't JSON serialisable, convert them to string
-    for field_name in df.columns:
-        if df.dtypes[field_name] == "datetime64[ms]":
-            df[field_name] = [
-                str(dt) if not np.isnat(dt) else None
-                for dt in df[field_name].values
-            ]
-
-    # write the data as geojson
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-
-    return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of petroleum production titles in Australia's Northern Territories,
@@ -54,30 +42,25 @@ def fetch_nt_titles(data_source: ConfiguredDataSource) -> pathlib.Path:
 nt_titles_data_source = DataSource(
     name="NT-petroleum-titles",
     url="https://geoscience.nt.gov.au/contents/prod/Downloads/NT_PetroleumPipelineTitles_shp.zip",
-    file_path='NT-petroleum-titles.geojson',
+    file_path='NT-petroleum-titles.gpkg',
     fetch=fetch_nt_titles,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
 def fetch_nt_wells(data_source: ConfiguredDataSource) -> pathlib.Path:
-    """Fetch a zipped Shapefile (.shp) and convert to GeoJSON using geopandas."""
+    """Fetch a zipped Shapefile (.shp) and convert to GeoPackage using geopandas."""
     # fetch the zipfile in data_source.url and read the included Shapefile
     df = fetch_zipped_shp_to_gdf(data_source.url, "PETROLEUM_WELLS.shp")
 
-    # convert datetime fields with strings like "19891229000000" into RFC3339
+    # convert datetime fields with strings like "19891229000000" into datetimes
     for field_name in df.columns:
         if field_name.startswith("DT_"):
-            df[field_name] = [
-                str(datetime.datetime.strptime(dt_str, "%Y%m%d%H%M%S")) if dt_str is not None else None
-                for dt_str in df[field_name].values
-            ]
-
-    # write the data as geojson
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
+            df[field_name] = pd.to_datetime(df[field_name], format="%Y%m%d%H%M%S")
 
-    return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of petroleum wells in Australia's Northern Territories, via the
@@ -88,7 +71,9 @@ def fetch_nt_wells(data_source: ConfiguredDataSource) -> pathlib.Path:
 nt_wells_data_source = DataSource(
     name="NT-petroleum-wells",
     url="https://geoscience.nt.gov.au/contents/prod/Downloads/Drilling/PETROLEUM_WELLS_shp.zip",
-    file_path='NT-petroleum-wells.geojson',
+    file_path='NT-petroleum-wells.gpkg',
     fetch=fetch_nt_wells,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
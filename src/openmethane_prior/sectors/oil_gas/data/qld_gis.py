@@ -21,9 +21,10 @@ import pandas as pd
 import restapi # https://github.com/Bolton-and-Menk-GIS/restapi
 
 from openmethane_prior.lib import DataSource
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 from openmethane_prior.lib.data_manager.source import ConfiguredDataSource
-from openmethane_prior.sectors.oil_gas.data.esri_types import map_esri_date_to_str
+from openmethane_prior.sectors.oil_gas.data.esri_types import map_esri_dates_to_datetime
 
 QLD_SPATIAL_ARCGIS_URL="https://spatial-gis.information.qld.gov.au/arcgis/rest/services"
 
@@ -65,11 +66,9 @@ def fetch_qld_boreholes(data_source: ConfiguredDataSource):
             boreholes_features.features.extend(layer_features.features)
 
     df = gpd.GeoDataFrame.from_features(boreholes_features.features)
-    df["rig_release_date"] = df["rig_release_date"].map(map_esri_date_to_str)
+    df["rig_release_date"] = map_esri_dates_to_datetime(df["rig_release_date"])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-        return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 def parse_qld_boreholes(data_source: ConfiguredDataSource):
@@ -90,9 +89,11 @@ def parse_qld_boreholes(data_source: ConfiguredDataSource):
 # Source: https://www.data.qld.gov.au/dataset/queensland-borehole-series
 qld_boreholes_data_source = DataSource(
     name="QLD-boreholes",
-    file_path="QLD-boreholes.geojson",
+    file_path="QLD-boreholes.gpkg",
     fetch=fetch_qld_boreholes,
     parse=parse_qld_boreholes,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
@@ -135,12 +136,10 @@ def fetch_qld_leases(data_source: ConfiguredDataSource):
         gpd.GeoDataFrame.from_features(historic_features.features),
     ])
 
-    df["approvedate"] = df["approvedate"].map(map_esri_date_to_str)
-    df["expirydate"] = df["expirydate"].map(map_esri_date_to_str)
+    df["approvedate"] = map_esri_dates_to_datetime(df["approvedate"])
+    df["expirydate"] = map_esri_dates_to_datetime(df["expirydate"])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-        return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of all mining leases in the Australian state of Queensland, via the
@@ -148,7 +147,9 @@ def fetch_qld_leases(data_source: ConfiguredDataSource):
 # Source: https://www.data.qld.gov.au/dataset/queensland-mining-and-exploration-tenure-series
 qld_leases_data_source = DataSource(
     name="QLD-leases",
-    file_path="QLD-leases.geojson",
+    file_path="QLD-leases.gpkg",
     fetch=fetch_qld_leases,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
@@ -31,6 +31,8 @@ sa_wells_data_source = DataSource(
     file_path="SAPetroleumWells.xlsx",
     url="https://onepeps-api.azurewebsites.net/api/excel/file/Wells.xlsx",
     parse=parse_geo_xlsx("GDA20 X", "GDA20 Y", "EPSG:7844"),
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
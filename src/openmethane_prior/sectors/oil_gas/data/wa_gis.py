@@ -20,9 +20,10 @@ import pandas as pd
 import restapi # https://github.com/Bolton-and-Menk-GIS/restapi
 
 from openmethane_prior.lib import DataSource
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
 from openmethane_prior.lib.data_manager.parsers import parse_geo
 from openmethane_prior.lib.data_manager.source import ConfiguredDataSource
-from .esri_types import map_esri_date_to_str
+from .esri_types import map_esri_dates_to_datetime
 
 
 WA_ARCGIS_URL="https://public-services.slip.wa.gov.au/public/rest/services"
@@ -75,13 +76,11 @@ def fetch_wa_titles(data_source: ConfiguredDataSource):
     # combine current and historic title datasets
     df = pd.concat([titles_df, historic_df])
 
-    # convert date fields to RFC3339
-    df["issued_date"] = df["issued_date"].map(map_esri_date_to_str)
-    df["end_date"] = df["end_date"].map(map_esri_date_to_str)
+    # convert date fields to datetimes
+    df["issued_date"] = map_esri_dates_to_datetime(df["issued_date"])
+    df["end_date"] = map_esri_dates_to_datetime(df["end_date"])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-        return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of all petroleum titles in the Australian state of Western
@@ -89,10 +88,12 @@ def fetch_wa_titles(data_source: ConfiguredDataSource):
 # Source: https://catalogue.data.wa.gov.au/dataset/wa-petroleum-titles-dmirs-011
 wa_titles_data_source = DataSource(
     name="WA-petroleum-titles",
-    file_path="WA-petroleum-titles.geojson",
+    file_path="WA-petroleum-titles.gpkg",
     url=f"{WA_ARCGIS_URL}/SLIP_Public_Services/Industry_and_Mining/MapServer",
     fetch=fetch_wa_titles,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
 
 
@@ -115,11 +116,9 @@ def fetch_wa_wells(data_source: ConfiguredDataSource):
     )
 
     df = gpd.GeoDataFrame.from_features(wells_features.features)
-    df["rig_release_date"] = df["rig_release_date"].map(map_esri_date_to_str)
+    df["rig_release_date"] = map_esri_dates_to_datetime(df["rig_release_date"])
 
-    with open(data_source.asset_path, "w") as asset_file:
-        asset_file.write(df.to_json())
-        return data_source.asset_path
+    return write_geopackage(df, data_source.asset_path)
 
 
 # Locations of all petroleum wells in the Australian state of Western Australia
@@ -127,8 +126,10 @@ def fetch_wa_wells(data_source: ConfiguredDataSource):
 # Source: https://catalogue.data.wa.gov.au/dataset/wa-onshore-petroleum-wells-dmirs-025
 wa_wells_data_source = DataSource(
     name="WA-petroleum-wells",
-    file_path="WA-petroleum-wells.geojson",
+    file_path="WA-petroleum-wells.gpkg",
     url=f"{WA_ARCGIS_URL}/SLIP_Public_Services/Industry_and_Mining/MapServer",
     fetch=fetch_wa_wells,
     parse=parse_geo,
+    cache_parsed=True,
+    parse_uses_domain="crs",
 )
@@ -18,6 +18,9 @@
 import numpy as np
 import geopandas as gpd
 import pandas as pd
+from numpy.typing import ArrayLike
+from pandas.api.types import union_categoricals
+from scipy.sparse import csr_array, sparray
 from typing import Any
 
 from openmethane_prior.lib import logger
@@ -38,7 +41,12 @@ emission_source_dtypes = {
 
     # A string which can be used to determine what type of site/facility is at
     # this location. Valid values are documented in emission_source_site_types.
-    "site_type": str,
+    "site_type": "category",
+
+    # The family of site_type, one of the SITE_FAMILY_* values, so sources can
+    # be divided into drillholes, pipelines and facilities without comparing
+    # strings. Derived from site_type by normalise_emission_source_df.
+    "site_family": np.int8,
 
     # The earliest date emissions may have occurred at this site.
     "activity_start": np.datetime64,
@@ -48,7 +56,7 @@ emission_source_dtypes = {
 
     # (Optional) the "name" value of the data source where this site was
     # included.
-    "data_source": str,
+    "data_source": "category",
 
     # (Optional) a unique id for this site in the specified data source.
     "data_source_id": str,
@@ -59,7 +67,7 @@ emission_source_dtypes = {
 
     # (Optional) the state/region the emission source is in the jurisdiction
     # of. Can be useful for attributing inventory emissions, for example.
-    "state": str,
+    "state": "category",
 
     # (Optional) a weighting which can be used to scale emissions from this
     # source relative to others of the same site_type. I.e. for a pipeline,
@@ -67,6 +75,31 @@ emission_source_dtypes = {
     "weight": np.float64,
 }
 
+# values of the site_family column
+SITE_FAMILY_DRILLHOLE = 0
+SITE_FAMILY_PIPELINE = 1
+SITE_FAMILY_FACILITY = 2
+
+# columns stored as pandas Categoricals, since many sources share each value
+_categorical_columns = [
+    name for name, dtype in emission_source_dtypes.items() if dtype == "category"
+]
+
+
+def site_type_family(site_type: pd.Series) -> np.ndarray:
+    """Classify each site_type as a drillhole, pipeline or other facility,
+    returning SITE_FAMILY_* values. Missing site types are facilities.
+    """
+    site_type = site_type.astype("category")
+    categories = site_type.cat.categories.astype(str)
+    category_family = np.select(
+        [categories.str.startswith("drillhole"), categories.str.startswith("pipeline")],
+        [SITE_FAMILY_DRILLHOLE, SITE_FAMILY_PIPELINE],
+        default=SITE_FAMILY_FACILITY,
+    ).astype(np.int8)
+    codes = site_type.cat.codes.to_numpy()
+    return np.where(codes >= 0, category_family[codes], SITE_FAMILY_FACILITY).astype(np.int8)
+
 
 def normalise_emission_source_df(
     df: gpd.GeoDataFrame,
@@ -80,6 +113,12 @@ def normalise_emission_source_df(
     else:
         normalised_df["weight"].fillna(1.0)
 
+    # repeated strings are stored once as categories, and the site family is
+    # derived once here rather than each time sources are allocated
+    for column in _categorical_columns:
+        normalised_df[column] = normalised_df[column].astype(object).astype("category")
+    normalised_df["site_family"] = site_type_family(normalised_df["site_type"])
+
     # select only columns which are present in emission_source_dtypes
     normalised_df = normalised_df[list(emission_source_dtypes.keys())].set_crs(df.crs)
 
@@ -88,6 +127,16 @@ def normalise_emission_source_df(
     return normalised_df
 
 
+def concat_emission_source_dfs(dfs: list[gpd.GeoDataFrame]) -> gpd.GeoDataFrame:
+    """Concatenate normalised emission source DataFrames. Unlike pd.concat,
+    categorical columns remain categorical when their categories differ.
+    """
+    concat_df = pd.concat(dfs)
+    for column in _categorical_columns:
+        concat_df[column] = union_categoricals([df[column].astype("category") for df in dfs])
+    return concat_df
+
+
 def allocate_emissions_to_sources(
     sources_df: pd.DataFrame,
     sources_mask: "pd.Series[bool] | np.typing.NDArray[np.bool_]",
@@ -95,42 +144,125 @@ def allocate_emissions_to_sources(
 ):
     """Distribute a single total emission across all emission sources in
     sources_df which match sources_mask."""
-    # since we will use addition to allocate emission to each source, ensure
-    # nans are replaced with zeros prior to addition
-    is_nan = pd.isna(sources_df["emissions_quantity"])
-    sources_df.loc[sources_mask & is_nan, "emissions_quantity"] = 0
-
-    # divide the selected sources into drillholes and other facilities
-    drillholes_mask = sources_mask \
-                      & ~pd.isna(sources_df["site_type"]) \
-                      & sources_df["site_type"].str.startswith("drillhole")
-    pipelines_mask = sources_mask \
-                      & ~pd.isna(sources_df["site_type"]) \
-                      & sources_df["site_type"].str.startswith("pipeline")
-    facilities_mask = sources_mask & ~drillholes_mask & ~pipelines_mask
-
-    # each source in the set may already have a weight based on the source type
-    # i.e. for pipelines this might be their length, so that longer pipelines
-    # get a larger share of the emission being distributed
-    sources_weight = sources_df["weight"].copy()
+    allocate_emissions_to_source_groups(
+        sources_df=sources_df,
+        group_sources=csr_array(np.asarray(sources_mask, dtype=bool).reshape(1, -1)),
+        emission_masses=[emission_mass],
+    )
+
+
+def allocate_emissions_to_source_groups(
+    sources_df: pd.DataFrame,
+    group_sources: sparray,
+    emission_masses: ArrayLike,
+):
+    """Distribute the total emission of each group of sources across the
+    emission sources in sources_df which belong to the group.
+
+    group_sources is a sparse (groups, sources) incidence matrix where a
+    non-zero entry at (i, j) means the source in position j of sources_df is
+    part of group i, and emission_masses holds the emission of each group.
+    The result is the same as calling allocate_emissions_to_sources once per
+    group, but all groups are weighted together and allocated in a single
+    pass over sources_df.
+    """
+    group_sources = csr_array(group_sources)
+    group_sources.sum_duplicates()
+    group_sources.eliminate_zeros()
+    incidence = group_sources.tocoo()
+    group_index, source_index = incidence.row, incidence.col
+    emission_masses = np.asarray(emission_masses, dtype=np.float64)
+
+    # divide the sources in each group into drillholes, pipelines and other
+    # facilities
+    if "site_family" in sources_df.columns:
+        site_family = sources_df["site_family"].to_numpy()[source_index]
+    else:
+        site_family = site_type_family(sources_df["site_type"].iloc[source_index])
+    is_drillhole = site_family == SITE_FAMILY_DRILLHOLE
+    members_df = pd.DataFrame({
+        "group": group_index,
+        "family": site_family,
+        # each source in the set may already have a weight based on the
+        # source type i.e. for pipelines this might be their length, so that
+        # longer pipelines get a larger share of the emission being distributed
+        "weight": sources_df["weight"].to_numpy(dtype=np.float64)[source_index],
+    })
 
     # when there's a mix of drillholes and facilities, give the set of
     # facilities an equal weight to the set of drillholes. this naive
     # distribution assumes that every unit of extracted resource generates
     # emissions at the point of extraction and at least one facility.
-    drillhole_count = drillholes_mask.sum()
-    pipeline_count = pipelines_mask.sum()
-    facility_count = facilities_mask.sum()
-
-    drillhole_dividend = drillhole_count if drillhole_count > 0 else 1
-    if pipeline_count > 0:
-        # turn pipeline weights into a proportion of total length
-        sources_weight[pipelines_mask] *= drillhole_dividend / sources_weight[pipelines_mask].sum()
-    if facility_count > 0:
-        sources_weight[facilities_mask] *= drillhole_dividend / sources_weight[facilities_mask].sum()
-
-    # turn all weights into a proportion of the total
-    sources_weight[sources_mask] /= sources_weight[sources_mask].sum()
-
-    # naively allocate the emissions across each emission source equally
-    sources_df.loc[sources_mask, "emissions_quantity"] += sources_weight[sources_mask] * emission_mass
+    drillhole_count = pd.Series(is_drillhole).groupby(group_index).transform("sum").to_numpy()
+    drillhole_dividend = np.where(drillhole_count > 0, drillhole_count, 1)
+    family_weight = members_df.groupby(["group", "family"])["weight"].transform("sum").to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(
+            is_drillhole,
+            members_df["weight"],
+            # turn pipeline and facility weights into a proportion of their total
+            members_df["weight"] * (drillhole_dividend / family_weight),
+        )
+
+    # turn all weights into a proportion of the group total
+    weight /= pd.Series(weight).groupby(group_index).transform("sum").to_numpy()
+
+    allocated = np.bincount(
+        source_index,
+        weights=weight * emission_masses[group_index],
+        minlength=len(sources_df),
+    )
+
+    # since we use addition to allocate emission to each source, nans in
+    # allocated sources are replaced with zeros prior to addition
+    allocated_mask = np.zeros(len(sources_df), dtype=bool)
+    allocated_mask[source_index] = True
+    emissions_quantity = sources_df["emissions_quantity"].to_numpy(dtype=np.float64, copy=True)
+    emissions_quantity[allocated_mask & np.isnan(emissions_quantity)] = 0
+    emissions_quantity[allocated_mask] += allocated[allocated_mask]
+    sources_df["emissions_quantity"] = emissions_quantity
+
+
+def match_facility_sources(
+    sources_df: pd.DataFrame,
+    locations_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """Find the emission sources which belong to each facility location.
+    A location in locations_df refers to a source in sources_df when its
+    data_source_name matches the source data_source, and its data_source_id
+    matches either the data_source_id of the source or the group_id of the
+    group the source is part of.
+
+    Returns a DataFrame with one row per matched (facility_name,
+    source_index) pair, where source_index is the position of the source in
+    sources_df. Each pair appears once, even if it is matched by more than
+    one location.
+    """
+    # compare keys as objects, so values of different types never match
+    # each other, which is the same as comparing them with ==
+    location_keys = pd.DataFrame({
+        "facility_name": locations_df["facility_name"].to_numpy(),
+        "data_source": locations_df["data_source_name"].astype(object).to_numpy(),
+        "id": locations_df["data_source_id"].astype(object).to_numpy(),
+    })
+
+    matches = []
+    for id_column in ["data_source_id", "group_id"]:
+        source_keys = pd.DataFrame({
+            "source_index": np.arange(len(sources_df)),
+            "data_source": sources_df["data_source"].astype(object).to_numpy(),
+            "id": sources_df[id_column].astype(object).to_numpy(),
+        })
+        # merge would match missing keys to each other, but a missing id
+        # never refers to a source
+        source_keys = source_keys.dropna(subset=["data_source", "id"])
+        matches.append(
+            location_keys.merge(source_keys, on=["data_source", "id"])[
+                ["facility_name", "source_index"]
+            ]
+        )
+
+    return pd.concat(matches, ignore_index=True) \
+        .drop_duplicates() \
+        .sort_values(["facility_name", "source_index"], kind="stable") \
+        .reset_index(drop=True)
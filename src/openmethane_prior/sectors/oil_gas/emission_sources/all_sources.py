@@ -16,7 +16,6 @@
 # limitations under the License.
 #
 import geopandas as gpd
-import pandas as pd
 
 from openmethane_prior.data_sources.npi import npi_facilities_data_source
 from openmethane_prior.lib import (
@@ -25,7 +24,7 @@ from openmethane_prior.lib import (
     PriorConfig,
 )
 
-from ..emission_source import normalise_emission_source_df
+from ..emission_source import concat_emission_source_dfs, normalise_emission_source_df
 from .nsw_sources import nsw_emission_sources
 from .nt_sources import nt_emission_sources
 from .offshore_sources import offshore_emission_sources
@@ -45,6 +44,25 @@ from ..data.wa_gis import wa_titles_data_source, wa_wells_data_source
 
 logger = logger.get_logger(__name__)
 
+oil_gas_emission_data_sources = [
+    nsw_drillholes_data_source,
+    nsw_titles_data_source,
+    nt_wells_data_source,
+    nt_titles_data_source,
+    qld_boreholes_data_source,
+    qld_leases_data_source,
+    sa_wells_data_source,
+    sa_wells_production_data_source,
+    wa_wells_data_source,
+    wa_titles_data_source,
+    nopta_wells_data_source,
+    nopta_titles_data_source,
+    oil_gas_sites_data_source,
+    npi_facilities_data_source,
+    au_gas_pipelines_data_source,
+]
+"""DataSources used by all_emission_sources"""
+
 def all_emission_sources(
     data_manager: DataManager,
     prior_config: PriorConfig,
@@ -115,7 +133,7 @@ def all_emission_sources(
     wa_df = normalise_emission_source_df(wa_df, prior_config.crs)
     logger.debug(f"found {len(wa_df)} WA sources in {len(wa_df['group_id'].unique())} titles")
 
-    states_df: gpd.GeoDataFrame = pd.concat([
+    states_df: gpd.GeoDataFrame = concat_emission_source_dfs([
         nsw_df,
         nt_df,
         qld_df,
@@ -164,7 +182,7 @@ def all_emission_sources(
     pipelines_df = normalise_emission_source_df(pipelines_df, prior_config.crs)
     logger.debug(f"found {len(pipelines_df)} pipelines")
 
-    all_df: gpd.GeoDataFrame = pd.concat([
+    all_df: gpd.GeoDataFrame = concat_emission_source_dfs([
         states_df,
         offshore_new,
         sites_df,
@@ -16,7 +16,9 @@
 # limitations under the License.
 #
 import numpy as np
+import pandas as pd
 import xarray as xr
+from scipy.sparse import csr_array
 
 from openmethane_prior.lib import (
     logger,
@@ -35,11 +37,15 @@ from openmethane_prior.data_sources.safeguard import (
     safeguard_mechanism_data_source,
     safeguard_locations_data_source,
 )
-from openmethane_prior.lib.grid.geometry import grid_weights_from_linestring
+from openmethane_prior.lib.grid.geometry import grid_weights_from_linestrings
 from openmethane_prior.lib.sector.au_sector import AustraliaPriorSector
 
-from .emission_source import allocate_emissions_to_sources
-from .emission_sources.all_sources import all_emission_sources
+from .emission_source import (
+    allocate_emissions_to_source_groups,
+    allocate_emissions_to_sources,
+    match_facility_sources,
+)
+from .emission_sources.all_sources import all_emission_sources, oil_gas_emission_data_sources
 from .safeguard import gas_supply_emissions
 
 logger = logger.get_logger(__name__)
@@ -122,32 +128,35 @@ def process_emissions(sector: AustraliaPriorSector, sector_config: PriorSectorCo
         right_on="safeguard_facility_name",
     )
 
-    for idx_fac, facility in sector_facilities_df.iterrows():
-        locations = located_facilities_df[located_facilities_df["facility_name"] == facility.facility_name]
-
-        # build a list of emission sources related to this SGM facility
-        facility_emission_sources_mask = emission_sources_df["data_source"] == False
-        for idx_loc, location in located_facilities_df.loc[locations.index].iterrows():
-            location_exact_match = (emission_sources_df["data_source"] == location["data_source_name"]) \
-                & (emission_sources_df["data_source_id"] == location["data_source_id"])
-            location_group_match = (emission_sources_df["data_source"] == location["data_source_name"]) \
-                & (emission_sources_df["group_id"] == location["data_source_id"])
-            location_emission_sources_mask = location_exact_match | location_group_match
-
-            # add the emission sources for this location
-            facility_emission_sources_mask |= location_emission_sources_mask
-
-        # if no locations can be related to an SGM facility, that's a problem
-        if facility_emission_sources_mask.sum() == 0:
-            logger.warning(f"No sources found for facility '{facility.facility_name}', unable to allocate {facility['ch4_kg']:.2f}kg CH4")
-            continue
-
-        # allocate SGM emissions for this facility equally to its locations
-        allocate_emissions_to_sources(
-            sources_df=emission_sources_df,
-            sources_mask=facility_emission_sources_mask,
-            emission_mass=facility["ch4_kg"],
-        )
+    # find the emission sources for every facility location in a single
+    # join, rather than comparing every location to every source
+    facility_sources_df = match_facility_sources(
+        sources_df=emission_sources_df,
+        locations_df=located_facilities_df,
+    )
+    facility_source_counts = facility_sources_df.groupby("facility_name").size()
+    logger.debug(f"{len(facility_source_counts)} / {len(sector_facilities_df)} Safeguard facilities matched to {facility_sources_df['source_index'].nunique()} sources")
+
+    # if no locations can be related to an SGM facility, that's a problem
+    for facility_name, ch4_kg in sector_facilities_df[["facility_name", "ch4_kg"]].itertuples(index=False):
+        if facility_source_counts.get(facility_name, 0) == 0:
+            logger.warning(f"No sources found for facility '{facility_name}', unable to allocate {ch4_kg:.2f}kg CH4")
+
+    # allocate SGM emissions for each facility equally to its locations, each
+    # row of the incidence matrix holds the sources of one facility
+    facility_members_df = pd.DataFrame({
+        "facility_name": sector_facilities_df["facility_name"].to_numpy(),
+        "facility_index": np.arange(len(sector_facilities_df)),
+    }).merge(facility_sources_df, on="facility_name")
+    facility_sources = csr_array(
+        (np.ones(len(facility_members_df)), (facility_members_df["facility_index"], facility_members_df["source_index"])),
+        shape=(len(sector_facilities_df), len(emission_sources_df)),
+    )
+    allocate_emissions_to_source_groups(
+        sources_df=emission_sources_df,
+        group_sources=facility_sources,
+        emission_masses=sector_facilities_df["ch4_kg"].to_numpy(),
+    )
 
     total_allocated_emissions += emission_sources_df['emissions_quantity'].sum()
     logger.debug(f"{total_allocated_emissions / 1e6:.2f} kt allocated to SGM facilities")
@@ -203,9 +212,11 @@ def process_emissions(sector: AustraliaPriorSector, sector_config: PriorSectorCo
     line_sources_mask = emission_sources_df.geom_type.isin(["LineString", "MultiLineString"])
     logger.debug(f"Allocating {line_sources_mask.sum()} line source emissions")
     line_sources_df = emission_sources_df[line_sources_mask]
-    for index, line in line_sources_df.iterrows():
-        line_grid_weights = grid_weights_from_linestring(domain_grid, line["geometry"])
-        methane_nd += line_grid_weights * line["emissions_quantity"]
+    methane_nd += grid_weights_from_linestrings(
+        domain_grid,
+        line_sources_df["geometry"].values,
+        line_sources_df["emissions_quantity"].to_numpy(),
+    )
 
     return kg_to_period_cell_flux(methane_nd, config)
 
@@ -222,4 +233,13 @@ sector = AustraliaPriorSector(
     ],
     cf_standard_name="extraction_production_and_transport_of_fuel",
     create_estimate=process_emissions,
+    data_sources=[
+        inventory_data_source,
+        qld_inventory_data_source,
+        safeguard_mechanism_data_source,
+        au_shapes_states_data_source,
+        night_lights_data_source,
+        safeguard_locations_data_source,
+        *oil_gas_emission_data_sources,
+    ],
 )
@@ -67,4 +67,8 @@ sector = PriorSector(
     ],
     cf_standard_name="industrial_energy_production",
     create_estimate=process_emissions,
+    data_sources=[
+        night_lights_data_source,
+        inventory_data_source,
+    ],
 )
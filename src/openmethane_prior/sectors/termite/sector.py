@@ -59,6 +59,7 @@ def process_emissions(
         lat_dim="lat",
         lon_dim="lon",
         extensive=True,
+        workers=config.regrid_workers,
     ).values
 
     # convert from mtCH4/m²/year → kg/m²/s
@@ -76,4 +77,7 @@ sector = PriorSector(
     emission_category="natural",
     cf_standard_name="termites",
     create_estimate=process_emissions,
+    data_sources=[
+        termites_data_source,
+    ],
 )
@@ -61,4 +61,8 @@ sector = PriorSector(
     unfccc_categories=["1.A.3"], # Transport
     cf_standard_name="land_transport",
     create_estimate=process_emissions,
+    data_sources=[
+        night_lights_data_source,
+        inventory_data_source,
+    ],
 )
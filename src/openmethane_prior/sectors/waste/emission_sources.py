@@ -30,11 +30,20 @@ from openmethane_prior.lib import (
 )
 
 from .data import (
+    ct_solid_waste_data_source,
     ct_wastewaster_domestic_data_source,
     ct_wastewaster_industrial_data_source,
-    ct_solid_waste_data_source,
 )
 
+waste_emission_data_sources = [
+    ct_wastewaster_domestic_data_source,
+    ct_wastewaster_industrial_data_source,
+    ct_solid_waste_data_source,
+    npi_facilities_data_source,
+]
+"""DataSources used by waste_emission_sources"""
+
+
 def waste_emission_sources(
     config: PriorConfig,
     data_manager: DataManager,
@@ -113,4 +122,4 @@ def waste_emission_sources(
     # NaN to indicate "not yet allocated" instead of "no emission"
     emission_sources_df["inventory_quantity"] = np.nan
 
-    return emission_sources_df
\ No newline at end of file
+    return emission_sources_df
@@ -31,7 +31,7 @@ from openmethane_prior.lib import (
 )
 from openmethane_prior.lib.sector.au_sector import AustraliaPriorSector
 
-from .emission_sources import waste_emission_sources
+from .emission_sources import waste_emission_data_sources, waste_emission_sources
 
 logger = logger.get_logger(__name__)
 
@@ -141,4 +141,10 @@ sector = AustraliaPriorSector(
     ],
     cf_standard_name="waste_treatment_and_disposal",
     create_estimate=process_emissions,
+    data_sources=[
+        inventory_data_source,
+        safeguard_mechanism_data_source,
+        safeguard_locations_data_source,
+        *waste_emission_data_sources,
+    ],
 )
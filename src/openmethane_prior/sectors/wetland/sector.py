@@ -47,7 +47,7 @@ def process_emissions(
     config = sector_config.prior_config
     domain_grid = config.domain().grid
     wetlands_da = sector_config.data_manager.get_asset(satwet_giems_data_source)
-    wetlands_ds = xr.open_dataset(wetlands_da.path)
+    wetlands_ds = xr.open_dataset(wetlands_da.path, chunks=config.input_chunks("time"))
 
     # SatWet time coordinates are first-of-month; compare at (year, month) granularity
     wetlands_time = wetlands_ds["time"].values
@@ -67,10 +67,13 @@ def process_emissions(
         domain_grid=domain_grid,
         cache_path=config.intermediates_path,
         cache_name=f"{wetlands_da.name}_{prior_ds.domain_name}",
+        workers=config.regrid_workers,
+        chunk_size=config.regrid_chunk_size,
     )
-    wetlands_ds.close()
-
+    # lazily regridded inputs are read from the file here, so this must
+    # happen before the file is closed
     regridded = regridded_da.values
+    wetlands_ds.close()
 
     # Convert units: gCH4/m2/month → kg/m2/s using the actual year+month per time step
     for t_idx, t in enumerate(wetlands_time):
@@ -142,4 +145,7 @@ sector = PriorSector(
     emission_category="natural",
     cf_standard_name="wetland_biological_processes",
     create_estimate=process_emissions,
+    data_sources=[
+        satwet_giems_data_source,
+    ],
 )
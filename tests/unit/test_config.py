@@ -39,6 +39,12 @@ def test_prior_config_defaults(start_date, end_date):
     assert test_config.output_filename == "prior-emissions.nc"
     assert test_config.static_path == test_config.input_path
     assert test_config.input_cache is None
+    assert test_config.regrid_workers == 1
+    assert test_config.regrid_chunk_size == 32
+    assert test_config.regrid_dask is False
+    assert test_config.input_chunks("time") is None
+    assert test_config.jobs == 1
+    assert test_config.parse_cache is False
 
     test_config_none = PriorConfig(
         domain_path="domain.nc",
@@ -116,8 +122,13 @@ end_date: 2022-12-08 00:00:00
 input_cache: null
 input_path: data/input
 intermediates_path: data/inter
+jobs: 1
 output_filename: prior-emissions.nc
 output_path: data/out
+parse_cache: false
+regrid_chunk_size: 32
+regrid_dask: false
+regrid_workers: 1
 sectors: null
 start_date: 2022-12-07 00:00:00
 static_path: data/in
@@ -135,6 +146,11 @@ def test_prior_config_from_env(reset_env, start_date, end_date):
     os.environ["STATIC_INPUTS"] = "env/static"
     os.environ["INPUT_CACHE"] = "env/cache"
     os.environ["OUTPUT_FILENAME"] = "env-output.nc"
+    os.environ["REGRID_WORKERS"] = "4"
+    os.environ["REGRID_CHUNK_SIZE"] = "7"
+    os.environ["REGRID_DASK"] = "true"
+    os.environ["JOBS"] = "3"
+    os.environ["PARSE_CACHE"] = "true"
 
     test_config = PriorConfig.from_env()
 
@@ -148,6 +164,12 @@ def test_prior_config_from_env(reset_env, start_date, end_date):
     assert test_config.static_path == pathlib.Path("env/static")
     assert test_config.input_cache == pathlib.Path("env/cache")
     assert test_config.output_filename == "env-output.nc"
+    assert test_config.regrid_workers == 4
+    assert test_config.regrid_chunk_size == 7
+    assert test_config.regrid_dask is True
+    assert test_config.input_chunks("time") == {"time": 7}
+    assert test_config.jobs == 3
+    assert test_config.parse_cache is True
 
 
 def test_prior_config_input_cache(tmp_path: pathlib.Path, start_date, end_date):
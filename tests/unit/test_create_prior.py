@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from openmethane_prior.lib.create_prior import estimate_sectors
+from openmethane_prior.lib.sector.sector import PriorSector
+
+
+def _sleeping_sector(name: str, duration: float, started: list) -> PriorSector:
+    def create_estimate(sector, sector_config, prior_ds):
+        started.append(sector.name)
+        time.sleep(duration)
+        return f"{sector.name} estimate"
+
+    return PriorSector(name=name, emission_category="natural", create_estimate=create_estimate)
+
+
+def test_estimate_sectors_sequential():
+    started = []
+    sectors = [_sleeping_sector(name, 0, started) for name in ["a", "b", "c"]]
+
+    results = list(estimate_sectors(sectors, sector_config=None, prior_ds=None))
+
+    assert [(sector.name, data) for sector, data in results] == [
+        ("a", "a estimate"), ("b", "b estimate"), ("c", "c estimate"),
+    ]
+    assert started == ["a", "b", "c"]
+
+
+def _concurrent_sector(
+    name: str, barrier: threading.Barrier, wait_for: list, done: threading.Event
+) -> PriorSector:
+    def create_estimate(sector, sector_config, prior_ds):
+        # raises BrokenBarrierError unless every sector is running at once
+        barrier.wait()
+        for event in wait_for:
+            assert event.wait(timeout=5)
+        done.set()
+        return f"{sector.name} estimate"
+
+    return PriorSector(name=name, emission_category="natural", create_estimate=create_estimate)
+
+
+def test_estimate_sectors_parallel():
+    barrier = threading.Barrier(4, timeout=5)
+    done = {name: threading.Event() for name in ["slow", "fast", "medium", "other"]}
+    # the first sector finishes last, so results must be held back until it does
+    sectors = [
+        _concurrent_sector(
+            "slow", barrier, [done["fast"], done["medium"], done["other"]], done["slow"]
+        ),
+        _concurrent_sector("fast", barrier, [], done["fast"]),
+        _concurrent_sector("medium", barrier, [done["fast"]], done["medium"]),
+        _concurrent_sector("other", barrier, [], done["other"]),
+    ]
+
+    results = list(estimate_sectors(sectors, sector_config=None, prior_ds=None, jobs=4))
+
+    assert [sector.name for sector, _ in results] == ["slow", "fast", "medium", "other"]
+    assert [data for _, data in results] == [
+        "slow estimate",
+        "fast estimate",
+        "medium estimate",
+        "other estimate",
+    ]
+
+
+def test_estimate_sectors_parallel_error():
+    def failing_estimate(sector, sector_config, prior_ds):
+        raise RuntimeError("sector failed")
+
+    started = []
+    sectors = [
+        _sleeping_sector("ok", 0, started),
+        PriorSector(name="failing", emission_category="natural", create_estimate=failing_estimate),
+    ]
+
+    with pytest.raises(RuntimeError, match="sector failed"):
+        list(estimate_sectors(sectors, sector_config=None, prior_ds=None, jobs=2))
@@ -1,4 +1,13 @@
-from openmethane_prior.data_sources.landuse import alum_codes_for_sector, alum_sector_mapping_data_source
+import numpy as np
+import xarray as xr
+
+from openmethane_prior.data_sources.landuse import (
+    LanduseCounts,
+    alum_codes_for_sector,
+    alum_sector_mapping_data_source,
+    landuse_counts_data_source,
+    landuse_map_data_source,
+)
 
 
 def test_alum_codes_for_sector(data_manager):
@@ -7,3 +16,26 @@ def test_alum_codes_for_sector(data_manager):
     assert agriculture_codes == [210, 320, 420, 520, 521, 522, 523, 524, 525, 526, 527, 542]
 
     assert alum_codes_for_sector("fake sector", sector_mapping_asset.data) == []
+
+
+def test_landuse_counts_sector_pixels():
+    counts = xr.DataArray(
+        np.arange(3 * 2 * 2).reshape(3, 2, 2),
+        dims=("code", "y", "x"),
+        coords={"code": [110, 210, 320]},
+    )
+    landuse_counts = LanduseCounts(domain=counts, inventory=counts * 10)
+
+    domain_pixels, inventory_pixels = landuse_counts.sector_pixels([110, 320, 999])
+
+    np.testing.assert_array_equal(domain_pixels, [[8, 10], [12, 14]])
+    np.testing.assert_array_equal(inventory_pixels, [[80, 100], [120, 140]])
+    assert domain_pixels.dtype == np.float64
+
+
+def test_landuse_counts_data_source():
+    # counts are read from the same GeoTIFF as the land use map
+    assert landuse_counts_data_source.name != landuse_map_data_source.name
+    assert landuse_counts_data_source.url == landuse_map_data_source.url
+    assert landuse_counts_data_source.file_path == landuse_map_data_source.file_path
+    assert landuse_counts_data_source.fetch is landuse_map_data_source.fetch
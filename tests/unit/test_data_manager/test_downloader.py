@@ -0,0 +1,397 @@
+import hashlib
+import http.server
+import socket
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from openmethane_prior.lib.data_manager.downloader import (
+    USER_AGENT,
+    Downloader,
+    partial_path,
+    validator_path,
+)
+
+
+class _FileHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("Range")))
+            server.user_agents.append(self.headers.get("User-Agent"))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failures = server.failures.get(self.path, 0)
+            server.failures[self.path] = failures - 1
+        try:
+            time.sleep(server.delay)
+            self._respond(failures)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _respond(self, failures: int):
+        if self.path in self.server.redirects:
+            self.send_response(302)
+            self.send_header("Location", self.server.redirects[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path not in self.server.files:
+            self.send_error(404)
+            return
+
+        if failures > 0:
+            self.send_error(503)
+            return
+
+        body = self.server.files[self.path]
+        etag = _etag(body)
+        range_header = self.headers.get("Range")
+        # If-Range asks for the whole file if it has changed
+        if_range = self.headers.get("If-Range")
+        unchanged = if_range is None or if_range == etag or not self.server.if_range
+        if range_header is not None and self.server.ranges and unchanged:
+            start = int(range_header.removeprefix("bytes=").removesuffix("-"))
+            if start >= len(body):
+                self.send_error(416)
+                return
+            # a misbehaving server may return a different range
+            start = max(start - self.server.range_offset, 0)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            body = body[start:]
+        else:
+            self.send_response(200)
+
+        if self.server.etags:
+            self.send_header("ETag", etag)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if failures == 0 and self.path in self.server.truncate:
+            # drop the connection part way through the body
+            self.wfile.write(body[:self.server.truncate.pop(self.path)])
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+        if self.server.drop_idle:
+            # close the connection without telling the client, like a server
+            # timing out an idle keep-alive connection
+            self.close_connection = True
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+@pytest.fixture()
+def file_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.files = {}
+    server.failures = {}
+    server.truncate = {}
+    server.redirects = {}
+    server.ranges = True
+    server.if_range = True
+    server.range_offset = 0
+    server.etags = True
+    server.delay = 0.0
+    server.drop_idle = False
+    server.requests = []
+    server.user_agents = []
+    server.connections = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def downloader():
+    downloader = Downloader(backoff=0.01, timeout=5)
+    yield downloader
+    downloader.close()
+
+
+def test_download(tmp_path, file_server, downloader):
+    file_server.files["/data.csv"] = b"a,b\n1,2\n"
+
+    save_path = downloader.download(f"{file_server.url}/data.csv", tmp_path / "data.csv")
+
+    assert save_path == tmp_path / "data.csv"
+    assert save_path.read_bytes() == b"a,b\n1,2\n"
+    assert not partial_path(save_path).exists()
+
+
+def test_download_reuses_connections(tmp_path, file_server, downloader):
+    for i in range(3):
+        file_server.files[f"/{i}.txt"] = f"file {i}".encode()
+
+    for i in range(3):
+        downloader.download(f"{file_server.url}/{i}.txt", tmp_path / f"{i}.txt")
+
+    assert file_server.connections == 1
+    assert [(tmp_path / f"{i}.txt").read_text() for i in range(3)] == ["file 0", "file 1", "file 2"]
+
+
+def test_download_user_agent(tmp_path, file_server, downloader):
+    file_server.files["/data.csv"] = b"a,b\n1,2\n"
+
+    downloader.download(f"{file_server.url}/data.csv", tmp_path / "data.csv")
+
+    assert file_server.user_agents == [USER_AGENT]
+    assert USER_AGENT.startswith("Python-urllib/")
+
+
+def test_download_reconnects_closed_connection(tmp_path, file_server):
+    file_server.files["/first.txt"] = b"first"
+    file_server.files["/second.txt"] = b"second"
+    file_server.drop_idle = True
+    # without retries, a closed pooled connection must not count as a failure
+    downloader = Downloader(retries=0, timeout=5)
+
+    downloader.download(f"{file_server.url}/first.txt", tmp_path / "first.txt")
+    downloader.download(f"{file_server.url}/second.txt", tmp_path / "second.txt")
+    downloader.close()
+
+    assert (tmp_path / "second.txt").read_bytes() == b"second"
+    assert file_server.connections == 2
+    assert [path for path, _ in file_server.requests] == ["/first.txt", "/second.txt"]
+
+
+def test_download_retries(tmp_path, file_server, downloader):
+    file_server.files["/flaky.txt"] = b"eventually"
+    file_server.failures["/flaky.txt"] = 2
+
+    save_path = downloader.download(f"{file_server.url}/flaky.txt", tmp_path / "flaky.txt")
+
+    assert save_path.read_bytes() == b"eventually"
+    assert len(file_server.requests) == 3
+
+
+def test_download_retries_exhausted(tmp_path, file_server, downloader):
+    file_server.files["/broken.txt"] = b"never"
+    file_server.failures["/broken.txt"] = 10
+
+    with pytest.raises(urllib.error.HTTPError, match="503"):
+        downloader.download(f"{file_server.url}/broken.txt", tmp_path / "broken.txt")
+
+    assert len(file_server.requests) == downloader.retries + 1
+    assert not (tmp_path / "broken.txt").exists()
+
+
+def test_download_not_found(tmp_path, file_server, downloader):
+    with pytest.raises(urllib.error.HTTPError, match="404"):
+        downloader.download(f"{file_server.url}/missing.txt", tmp_path / "missing.txt")
+
+    # client errors are not retried
+    assert len(file_server.requests) == 1
+    assert not (tmp_path / "missing.txt").exists()
+
+
+def test_download_resumes_interrupted(tmp_path, file_server, downloader):
+    body = bytes(range(256)) * 64
+    file_server.files["/big.bin"] = body
+    file_server.truncate["/big.bin"] = 1000
+
+    save_path = downloader.download(f"{file_server.url}/big.bin", tmp_path / "big.bin")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/big.bin", None), ("/big.bin", "bytes=1000-")]
+    assert not validator_path(save_path).exists()
+
+
+def test_download_restarts_interrupted_without_validator(tmp_path, file_server, downloader):
+    # without an ETag or Last-Modified, there's no way to tell if the file
+    # changed between requests
+    body = bytes(range(256)) * 64
+    file_server.files["/big.bin"] = body
+    file_server.truncate["/big.bin"] = 1000
+    file_server.etags = False
+
+    save_path = downloader.download(f"{file_server.url}/big.bin", tmp_path / "big.bin")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/big.bin", None), ("/big.bin", None)]
+
+
+def test_download_resumes_partial_file(tmp_path, file_server, downloader):
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    partial_path(tmp_path / "digits.txt").write_bytes(body[:4])
+    validator_path(tmp_path / "digits.txt").write_text(_etag(body))
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/digits.txt", "bytes=4-")]
+
+
+def test_download_partial_file_changed(tmp_path, file_server, downloader):
+    # the partial file was written from an earlier version of the file
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    partial_path(tmp_path / "digits.txt").write_bytes(b"abcd")
+    validator_path(tmp_path / "digits.txt").write_text(_etag(b"abcdefghij"))
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/digits.txt", "bytes=4-")]
+
+
+def test_download_partial_file_changed_if_range_ignored(tmp_path, file_server, downloader):
+    # servers which ignore If-Range still report the ETag of the new version
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    file_server.if_range = False
+    partial_path(tmp_path / "digits.txt").write_bytes(b"abcd")
+    validator_path(tmp_path / "digits.txt").write_text(_etag(b"abcdefghij"))
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/digits.txt", "bytes=4-"), ("/digits.txt", None)]
+
+
+def test_download_partial_file_wrong_range(tmp_path, file_server, downloader):
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    file_server.range_offset = 2
+    partial_path(tmp_path / "digits.txt").write_bytes(body[:4])
+    validator_path(tmp_path / "digits.txt").write_text(_etag(body))
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/digits.txt", "bytes=4-"), ("/digits.txt", None)]
+    assert not validator_path(save_path).exists()
+
+
+def test_download_partial_file_without_validator(tmp_path, file_server, downloader):
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    partial_path(tmp_path / "digits.txt").write_bytes(b"0123")
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+    assert file_server.requests == [("/digits.txt", None)]
+
+
+def test_download_resume_unsupported(tmp_path, file_server, downloader):
+    # servers which ignore Range respond with the whole file
+    body = b"0123456789"
+    file_server.files["/digits.txt"] = body
+    file_server.ranges = False
+    partial_path(tmp_path / "digits.txt").write_bytes(b"stale")
+
+    save_path = downloader.download(f"{file_server.url}/digits.txt", tmp_path / "digits.txt")
+
+    assert save_path.read_bytes() == body
+
+
+def test_download_redirect(tmp_path, file_server, downloader):
+    file_server.files["/new/data.txt"] = b"moved"
+    file_server.redirects["/old/data.txt"] = "/new/data.txt"
+
+    save_path = downloader.download(f"{file_server.url}/old/data.txt", tmp_path / "data.txt")
+
+    assert save_path.read_bytes() == b"moved"
+
+
+def test_download_per_host_limit(tmp_path, file_server):
+    file_server.delay = 0.05
+    downloads = []
+    for i in range(8):
+        file_server.files[f"/{i}.txt"] = f"file {i}".encode()
+        downloads.append((f"{file_server.url}/{i}.txt", tmp_path / f"{i}.txt"))
+
+    downloader = Downloader(max_per_host=2, timeout=5)
+    try:
+        # downloads may come from many threads, such as when prefetching
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            paths = list(executor.map(lambda download: downloader.download(*download), downloads))
+    finally:
+        downloader.close()
+
+    assert paths == [save_path for _, save_path in downloads]
+    assert [path.read_text() for path in paths] == [f"file {i}" for i in range(8)]
+    assert file_server.max_in_flight == 2
+
+
+def test_download_connection_refused(tmp_path, file_server, downloader):
+    url = f"{file_server.url}/data.txt"
+    file_server.shutdown()
+    file_server.server_close()
+
+    with pytest.raises(urllib.error.URLError):
+        downloader.download(url, tmp_path / "data.txt")
+
+
+def test_download_through_proxy(tmp_path, file_server, downloader, monkeypatch):
+    # the test server acts as the proxy, and receives the full URL
+    monkeypatch.setenv("http_proxy", file_server.url)
+    monkeypatch.delenv("no_proxy", raising=False)
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    file_server.files["http://data.example.com/data.csv"] = b"a,b\n1,2\n"
+
+    save_path = downloader.download("http://data.example.com/data.csv", tmp_path / "data.csv")
+
+    assert save_path.read_bytes() == b"a,b\n1,2\n"
+    assert file_server.requests == [("http://data.example.com/data.csv", None)]
+
+
+def test_download_no_proxy(tmp_path, file_server, downloader, monkeypatch):
+    # nothing is listening at the proxy address
+    monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    file_server.files["/data.csv"] = b"a,b\n1,2\n"
+
+    save_path = downloader.download(f"{file_server.url}/data.csv", tmp_path / "data.csv")
+
+    assert save_path.read_bytes() == b"a,b\n1,2\n"
+
+
+def test_download_dns_failure_not_retried(tmp_path, downloader, mocker):
+    download_spy = mocker.patch.object(
+        Downloader, "_download", side_effect=socket.gaierror(-2, "Name or service not known")
+    )
+
+    with pytest.raises(urllib.error.URLError, match="Name or service not known"):
+        downloader.download("http://data.example.invalid/data.txt", tmp_path / "data.txt")
+
+    assert download_spy.call_count == 1
+
+
+def test_download_connection_reset_retried(tmp_path, downloader, mocker):
+    download_spy = mocker.patch.object(Downloader, "_download", side_effect=ConnectionResetError())
+
+    with pytest.raises(urllib.error.URLError):
+        downloader.download("http://data.example.com/data.txt", tmp_path / "data.txt")
+
+    assert download_spy.call_count == downloader.retries + 1
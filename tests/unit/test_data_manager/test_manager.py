@@ -1,7 +1,17 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from openmethane_prior.lib.data_manager.manager import DataManager
+import pytest
+
+from openmethane_prior.lib.data_manager.manager import (
+    DataManager,
+    data_source_graph,
+    data_source_waves,
+)
 from openmethane_prior.lib.data_manager.source import DataSource, ConfiguredDataSource
+from openmethane_prior.lib.sector.sector import PriorSector
+from openmethane_prior.sectors import all_sectors
 from pytest_mock import MockerFixture
 
 
@@ -185,3 +195,131 @@ def test_manager_get_asset_dependencies(tmp_path, mocker, config):
     assert child_parse.call_count == 1
 
     assert test_asset.data == "parent of child data"
+
+
+def test_manager_get_asset_concurrent(tmp_path, config):
+    data_path = tmp_path / "data"
+    test_manager = DataManager(data_path=data_path, prior_config=config)
+
+    fetch_calls = []
+    parse_calls = []
+    def slow_fetch(data_source: ConfiguredDataSource):
+        fetch_calls.append(data_source.name)
+        time.sleep(0.1)
+        data_source.asset_path.write_text("test")
+        return data_source.asset_path
+
+    def slow_parse(data_source: ConfiguredDataSource):
+        parse_calls.append(data_source.name)
+        time.sleep(0.1)
+        return object()
+
+    test_source = DataSource(
+        name="test-slow", file_path="slow.txt", fetch=slow_fetch, parse=slow_parse
+    )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assets = list(executor.map(lambda _: test_manager.get_asset(test_source), range(4)))
+
+    # asset is prepared once and shared by every thread
+    assert fetch_calls == ["test-slow"]
+    assert parse_calls == ["test-slow"]
+    assert all(asset.data is assets[0].data for asset in assets)
+
+
+def _recording_source(name: str, calls: list, data_sources=None) -> DataSource:
+    def fetch(data_source: ConfiguredDataSource):
+        data_source.asset_path.write_text(name)
+        return data_source.asset_path
+
+    def parse(data_source: ConfiguredDataSource):
+        # dependencies must already be parsed
+        assert all(asset.data is not None for asset in data_source.data_assets)
+        calls.append(name)
+        return name
+
+    return DataSource(
+        name=name,
+        file_path=f"{name}.txt",
+        fetch=fetch,
+        parse=parse,
+        data_sources=data_sources or [],
+    )
+
+
+def test_data_source_waves():
+    calls = []
+    base = _recording_source("base", calls)
+    other = _recording_source("other", calls)
+    middle = _recording_source("middle", calls, data_sources=[base])
+    top = _recording_source("top", calls, data_sources=[middle, other])
+
+    waves = data_source_waves([top, other, base])
+
+    assert [[source.name for source in wave] for wave in waves] == [
+        ["base", "other"],
+        ["middle"],
+        ["top"],
+    ]
+    assert data_source_waves([]) == []
+
+
+def test_data_source_graph_cycle():
+    first = DataSource(name="first", file_path="first.txt")
+    second = DataSource(name="second", file_path="second.txt", data_sources=[first])
+    first.data_sources.append(second)
+
+    with pytest.raises(
+        ValueError, match="circular dependency between data sources: first -> second -> first"
+    ):
+        data_source_graph([first])
+
+
+def test_manager_get_asset_cycle(tmp_path, config):
+    test_manager = DataManager(data_path=tmp_path / "data", prior_config=config)
+    first = DataSource(name="first", file_path="first.txt")
+    second = DataSource(name="second", file_path="second.txt", data_sources=[first])
+    first.data_sources.append(second)
+
+    with pytest.raises(
+        ValueError, match="circular dependency between data sources: first -> second -> first"
+    ):
+        test_manager.get_asset(first)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_manager_prefetch(tmp_path, config, workers):
+    test_manager = DataManager(data_path=tmp_path / "data", prior_config=config)
+
+    calls = []
+    base = _recording_source("base", calls)
+    middle = _recording_source("middle", calls, data_sources=[base])
+    other = _recording_source("other", calls)
+    sectors = [
+        PriorSector(
+            name="a", emission_category="natural", create_estimate=None, data_sources=[middle]
+        ),
+        PriorSector(
+            name="b", emission_category="natural", create_estimate=None, data_sources=[base, other]
+        ),
+        PriorSector(name="c", emission_category="natural", create_estimate=None),
+    ]
+
+    test_manager.prefetch(sectors, workers=workers)
+
+    # every data source is prepared exactly once, after its dependencies
+    assert sorted(calls) == ["base", "middle", "other"]
+    assert calls.index("base") < calls.index("middle")
+    assert sorted(test_manager.data_assets.keys()) == ["base", "middle", "other"]
+
+    # later requests use the prefetched assets
+    assert test_manager.get_asset(middle).data == "middle"
+    assert len(calls) == 3
+
+
+def test_all_sectors_data_sources():
+    waves = data_source_waves([source for sector in all_sectors for source in sector.data_sources])
+
+    names = [source.name for wave in waves for source in wave]
+    assert len(names) == len(set(names))
+    assert "gfas" in names
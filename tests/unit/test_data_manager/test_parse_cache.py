@@ -0,0 +1,317 @@
+import logging
+import os
+import sys
+
+import attrs
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from geopandas.testing import assert_geodataframe_equal
+
+from openmethane_prior.lib.config import PriorConfig
+from openmethane_prior.lib.data_manager import parse_cache
+from openmethane_prior.lib.data_manager.manager import DataManager
+from openmethane_prior.lib.data_manager.parse_cache import (
+    PARSE_CACHE_FOLDER,
+    cached_parse,
+    parsed_asset_key,
+)
+from openmethane_prior.lib.data_manager.parsers import parse_geo_xlsx
+from openmethane_prior.lib.data_manager.source import (
+    ConfiguredDataSource,
+    DataSource,
+    configure_data_source,
+)
+from openmethane_prior.lib.grid.domain import Domain
+from openmethane_prior.lib.grid.grid import Grid
+
+
+def _domain(cell_size: float = 1.0, proj_params: str = "EPSG:7843") -> Domain:
+    grid = Grid(
+        dimensions=(4, 3),
+        origin_xy=(130.0, -30.0),
+        cell_size=(cell_size, cell_size),
+        proj_params=proj_params,
+    )
+    return Domain(dataset=xr.Dataset(), grid=grid)
+
+
+@pytest.fixture()
+def parse_config(tmp_path, start_date, end_date, mocker) -> PriorConfig:
+    # avoid fetching a domain file, the cache key only needs the grid
+    mocker.patch.object(PriorConfig, "domain", return_value=_domain())
+    return PriorConfig(
+        domain_path="domain.nc",
+        start_date=start_date,
+        end_date=end_date,
+        input_path=tmp_path / "inputs",
+        intermediates_path=tmp_path / "intermediates",
+        parse_cache=True,
+    )
+
+
+def _parse_values(data_source):
+    values = np.loadtxt(data_source.asset_path, delimiter=",")
+    return xr.DataArray(values, dims=("y", "x"), name="values")
+
+
+def _parse_doubled(data_source):
+    return np.loadtxt(data_source.asset_path, delimiter=",") * 2
+
+
+def _scale(values):
+    return values * 3
+
+
+def _parse_scaled(data_source):
+    return _scale(np.loadtxt(data_source.asset_path, delimiter=","))
+
+
+def _configured(tmp_path, config, parse, name="test-values", parse_uses_domain=None):
+    asset_path = tmp_path / "inputs" / "values.csv"
+    if not asset_path.exists():
+        asset_path.parent.mkdir(parents=True, exist_ok=True)
+        asset_path.write_text("1,2,3\n4,5,6\n")
+    return configure_data_source(
+        DataSource(
+            name=name,
+            file_path="values.csv",
+            parse=parse,
+            cache_parsed=True,
+            parse_uses_domain=parse_uses_domain,
+        ),
+        prior_config=config,
+        data_path=tmp_path / "inputs",
+    )
+
+
+def test_cached_parse(tmp_path, parse_config, mocker):
+    data_source = _configured(tmp_path, parse_config, _parse_values)
+    parse_spy = mocker.spy(data_source, "source_parse")
+
+    first = cached_parse(data_source, parse_config.intermediates_path)
+    second = cached_parse(data_source, parse_config.intermediates_path)
+
+    assert parse_spy.call_count == 1
+    xr.testing.assert_identical(first, second)
+    cache_folder = parse_config.intermediates_path / PARSE_CACHE_FOLDER
+    assert len(list(cache_folder.glob("test-values-*.nc"))) == 1
+
+
+def test_cached_parse_numpy(tmp_path, parse_config):
+    data_source = _configured(tmp_path, parse_config, _parse_doubled)
+
+    first = cached_parse(data_source, parse_config.intermediates_path)
+    second = cached_parse(data_source, parse_config.intermediates_path)
+
+    np.testing.assert_array_equal(second, [[2, 4, 6], [8, 10, 12]])
+    np.testing.assert_array_equal(first, second)
+
+
+def test_cached_parse_geo(tmp_path, parse_config):
+    pytest.importorskip("pyarrow")
+
+    def _parse_points(data_source):
+        values = np.loadtxt(data_source.asset_path, delimiter=",")
+        return gpd.GeoDataFrame(
+            {"value": values[:, 2]},
+            geometry=gpd.points_from_xy(values[:, 0], values[:, 1]),
+            crs="EPSG:7843",
+        )
+
+    data_source = _configured(tmp_path, parse_config, _parse_points)
+
+    first = cached_parse(data_source, parse_config.intermediates_path)
+    second = cached_parse(data_source, parse_config.intermediates_path)
+
+    cache_folder = parse_config.intermediates_path / PARSE_CACHE_FOLDER
+    assert len(list(cache_folder.glob("test-values-*.geoparquet"))) == 1
+    assert_geodataframe_equal(first, second)
+
+
+def test_cached_parse_table(tmp_path, parse_config):
+    pytest.importorskip("pyarrow")
+
+    def _parse_table(data_source):
+        values = np.loadtxt(data_source.asset_path, delimiter=",")
+        return pd.DataFrame({"name": ["a", "b"], "total": values.sum(axis=1)})
+
+    data_source = _configured(tmp_path, parse_config, _parse_table)
+
+    first = cached_parse(data_source, parse_config.intermediates_path)
+    second = cached_parse(data_source, parse_config.intermediates_path)
+
+    cache_folder = parse_config.intermediates_path / PARSE_CACHE_FOLDER
+    assert len(list(cache_folder.glob("test-values-*.parquet"))) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cached_parse_unsupported(tmp_path, parse_config, mocker):
+    data_source = _configured(tmp_path, parse_config, lambda _: {"not": "cacheable"})
+    parse_spy = mocker.spy(data_source, "source_parse")
+
+    assert cached_parse(data_source, parse_config.intermediates_path) == {"not": "cacheable"}
+    assert cached_parse(data_source, parse_config.intermediates_path) == {"not": "cacheable"}
+    assert parse_spy.call_count == 2
+
+
+def test_cached_parse_unavailable_warns_once(tmp_path, parse_config, mocker, caplog):
+    # behave as if the optional dependency for this format were missing
+    unavailable = [
+        attrs.evolve(f, available=False, unavailable_reason="test dependency is missing")
+        if f.extension == "nc" else f
+        for f in parse_cache._CACHE_FORMATS
+    ]
+    mocker.patch.object(parse_cache, "_CACHE_FORMATS", unavailable)
+    mocker.patch.object(parse_cache, "_warned_formats", set())
+    data_source = _configured(tmp_path, parse_config, _parse_values)
+    other_source = _configured(tmp_path, parse_config, _parse_values, name="other-values")
+
+    with caplog.at_level(logging.WARNING):
+        cached_parse(data_source, parse_config.intermediates_path)
+        cached_parse(other_source, parse_config.intermediates_path)
+
+    assert caplog.text.count("test dependency is missing") == 1
+    assert not list((parse_config.intermediates_path / PARSE_CACHE_FOLDER).glob("*.nc"))
+
+
+def test_cached_parse_invalidated(tmp_path, parse_config):
+    data_source = _configured(tmp_path, parse_config, _parse_values)
+    cached_parse(data_source, parse_config.intermediates_path)
+
+    # a new version of the asset is fetched
+    data_source.asset_path.write_text("7,8,9\n10,11,12\n")
+    parsed = cached_parse(data_source, parse_config.intermediates_path)
+
+    np.testing.assert_array_equal(parsed, [[7, 8, 9], [10, 11, 12]])
+    # the earlier result is kept until the cache grows too large
+    cache_folder = parse_config.intermediates_path / PARSE_CACHE_FOLDER
+    assert len(list(cache_folder.glob("test-values-*.nc"))) == 2
+
+
+def test_cached_parse_evicts_least_recently_used(tmp_path, parse_config, mocker):
+    folder = parse_config.intermediates_path / PARSE_CACHE_FOLDER
+    first = _configured(tmp_path, parse_config, _parse_values, name="first-values")
+    second = _configured(tmp_path, parse_config, _parse_doubled, name="second-values")
+    cached_parse(first, parse_config.intermediates_path)
+    cached_parse(second, parse_config.intermediates_path)
+    first_path = next(folder.glob("first-values-*.nc"))
+    second_path = next(folder.glob("second-values-*.npy"))
+
+    # using the first result makes the second the least recently used
+    os.utime(second_path, (0, 0))
+    cached_parse(first, parse_config.intermediates_path)
+
+    # room for the first result and another the same size
+    mocker.patch.object(parse_cache, "PARSE_CACHE_MAX_BYTES", 2 * first_path.stat().st_size)
+    third = _configured(tmp_path, parse_config, _parse_values, name="third-values")
+    cached_parse(third, parse_config.intermediates_path)
+
+    assert sorted(p.name.split("-")[0] for p in folder.glob("*-values-*")) == ["first", "third"]
+
+    # the newest result is always kept, even when over the limit
+    parse_cache.evict(folder, max_bytes=0, keep=next(folder.glob("third-values-*")))
+    assert [p.name.split("-")[0] for p in folder.glob("*-values-*")] == ["third"]
+
+
+def test_parsed_asset_key(tmp_path, parse_config, mocker):
+    data_source = _configured(tmp_path, parse_config, _parse_values)
+    key = parsed_asset_key(data_source)
+
+    assert parsed_asset_key(data_source) == key
+
+    # different parse function
+    assert parsed_asset_key(_configured(tmp_path, parse_config, _parse_doubled)) != key
+
+    # different asset contents
+    data_source.asset_path.write_text("1,2,3\n4,5,7\n")
+    assert parsed_asset_key(data_source) != key
+    data_source.asset_path.write_text("1,2,3\n4,5,6\n")
+    assert parsed_asset_key(data_source) == key
+
+    # a different period or domain doesn't affect a parser which doesn't use them
+    assert parsed_asset_key(attrs.evolve(data_source, prior_config=attrs.evolve(
+        parse_config, start_date=parse_config.start_date.replace(year=2021),
+    ))) == key
+    mocker.patch.object(PriorConfig, "domain", return_value=_domain(cell_size=0.5))
+    assert parsed_asset_key(data_source) == key
+
+
+def test_parsed_asset_key_domain(tmp_path, parse_config, mocker):
+    grid_source = _configured(tmp_path, parse_config, _parse_values, parse_uses_domain="grid")
+    crs_source = _configured(tmp_path, parse_config, _parse_values, parse_uses_domain="crs")
+    grid_key = parsed_asset_key(grid_source)
+    crs_key = parsed_asset_key(crs_source)
+
+    # a domain with the same CRS but different cells
+    mocker.patch.object(PriorConfig, "domain", return_value=_domain(cell_size=0.5))
+    assert parsed_asset_key(grid_source) != grid_key
+    assert parsed_asset_key(crs_source) == crs_key
+
+    # a domain in a different CRS
+    mocker.patch.object(PriorConfig, "domain", return_value=_domain(proj_params="EPSG:4326"))
+    assert parsed_asset_key(crs_source) != crs_key
+
+
+def test_file_digest_recorded(tmp_path, mocker):
+    asset_path = tmp_path / "asset.csv"
+    asset_path.write_text("1,2,3\n")
+    digest_folder = tmp_path / "digests"
+    digest = parse_cache.file_digest(asset_path, digest_folder)
+
+    # the recorded digest is reused while the file is unchanged
+    open_spy = mocker.spy(parse_cache.hashlib, "file_digest")
+    assert parse_cache.file_digest(asset_path, digest_folder) == digest
+    assert open_spy.call_count == 0
+
+    asset_path.write_text("1,2,4\n")
+    assert parse_cache.file_digest(asset_path, digest_folder) == parse_cache.file_digest(asset_path)
+    assert parse_cache.file_digest(asset_path, digest_folder) != digest
+
+
+def test_parsed_asset_key_helpers(tmp_path, parse_config, mocker):
+    data_source = _configured(tmp_path, parse_config, _parse_scaled)
+    key = parsed_asset_key(data_source)
+
+    # the parse function is unchanged, but a helper it calls is edited
+    mocker.patch.object(sys.modules[__name__], "_scale", lambda values: values * 4)
+    assert parsed_asset_key(data_source) != key
+
+    # helpers in openmethane_prior are followed through closures too
+    identity = parse_cache.function_identity(parse_geo_xlsx("x", "y", "EPSG:7844"))
+    assert "parse_geo" in identity
+    assert "0x" not in identity
+
+
+def test_manager_parse_cache(tmp_path, parse_config, mocker):
+    _configured(tmp_path, parse_config, _parse_values)
+    parse_spy = mocker.spy(ConfiguredDataSource, "parse")
+    parse_source = DataSource(
+        name="test-values", file_path="values.csv", parse=_parse_values, cache_parsed=True
+    )
+
+    # each run of the prior has its own DataManager
+    for _ in range(2):
+        test_manager = DataManager(data_path=tmp_path / "inputs", prior_config=parse_config)
+        asset = test_manager.get_asset(parse_source)
+        np.testing.assert_array_equal(asset.data, [[1, 2, 3], [4, 5, 6]])
+
+    assert parse_spy.call_count == 1
+
+
+def test_manager_parse_cache_disabled(tmp_path, parse_config, mocker):
+    _configured(tmp_path, parse_config, _parse_values)
+    parse_spy = mocker.spy(ConfiguredDataSource, "parse")
+    config = attrs.evolve(parse_config, parse_cache=False)
+    parse_source = DataSource(
+        name="test-values", file_path="values.csv", parse=_parse_values, cache_parsed=True
+    )
+
+    for _ in range(2):
+        test_manager = DataManager(data_path=tmp_path / "inputs", prior_config=config)
+        test_manager.get_asset(parse_source)
+
+    assert parse_spy.call_count == 2
+    assert not (parse_config.intermediates_path / PARSE_CACHE_FOLDER).exists()
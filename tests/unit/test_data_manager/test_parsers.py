@@ -0,0 +1,147 @@
+import json
+import pathlib
+import tempfile
+
+import geopandas as gpd
+import pandas as pd
+import pytest
+import shapely
+import xarray as xr
+from geopandas.testing import assert_geodataframe_equal
+
+from openmethane_prior.lib.config import PriorConfig
+from openmethane_prior.lib.data_manager.fetchers import write_geopackage
+from openmethane_prior.lib.data_manager.parsers import parse_geo
+from openmethane_prior.lib.data_manager.source import DataSource, configure_data_source
+from openmethane_prior.lib.grid.domain import Domain
+from openmethane_prior.lib.grid.grid import Grid
+
+
+@pytest.fixture()
+def lonlat_config(tmp_path, start_date, end_date, mocker) -> PriorConfig:
+    # a domain in lon/lat, so parsed geometries keep their coordinates
+    grid = Grid(
+        dimensions=(10, 10), origin_xy=(125.0, -35.0), cell_size=(1.0, 1.0), proj_params="EPSG:4326"
+    )
+    mocker.patch.object(PriorConfig, "domain", return_value=Domain(dataset=xr.Dataset(), grid=grid))
+    return PriorConfig(
+        domain_path="domain.nc",
+        start_date=start_date,
+        end_date=end_date,
+        input_path=tmp_path / "inputs",
+    )
+
+
+@pytest.fixture()
+def features_df() -> gpd.GeoDataFrame:
+    # features as they would be in GeoJSON, without a CRS and with dates as
+    # RFC3339 strings
+    return gpd.GeoDataFrame(
+        {
+            "name": ["b", "a", "c", None],
+            "drilled": ["2001-05-03", None, "1999-01-02", "2010-12-31"],
+            "depth": [100.0, None, 300.0, 400.0],
+        },
+        geometry=[
+            shapely.Point(130, -30),
+            shapely.Point(140, -20),
+            shapely.LineString([(126, -34), (127, -33)]),
+            shapely.Point(131, -31, 5),
+        ],
+    )
+
+
+def _configured(tmp_path, config, file_path):
+    return configure_data_source(
+        DataSource(name="test-geo", file_path=file_path, parse=parse_geo),
+        prior_config=config,
+        data_path=tmp_path,
+    )
+
+
+def test_write_geopackage(tmp_path, features_df, lonlat_config):
+    geojson_path = tmp_path / "features.geojson"
+    geojson_path.write_text(features_df.to_json())
+
+    gpkg_path = write_geopackage(features_df.to_json(), tmp_path / "features.gpkg")
+
+    assert gpkg_path == tmp_path / "features.gpkg"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["features.geojson", "features.gpkg"]
+
+    # parsing the GeoPackage gives the same result as parsing GeoJSON did
+    from_geojson = parse_geo(_configured(tmp_path, lonlat_config, "features.geojson"))
+    from_gpkg = parse_geo(_configured(tmp_path, lonlat_config, "features.gpkg"))
+
+    assert_geodataframe_equal(from_geojson, from_gpkg)
+    assert list(from_gpkg["name"]) == ["b", "a", "c", None]
+    assert from_gpkg["drilled"].dtype.kind == "M"
+    assert from_gpkg.crs == "EPSG:4326"
+
+
+def test_write_geopackage_dataframe(tmp_path, features_df):
+    features_df["drilled"] = pd.to_datetime(features_df["drilled"])
+    features_df["count"] = [1, 2, 3, 4]
+    features_df = features_df.set_crs("EPSG:4283")
+
+    write_geopackage(features_df, tmp_path / "features.gpkg")
+    written_df = gpd.read_file(tmp_path / "features.gpkg")
+
+    # GeoDataFrames are written as they are, without a GeoJSON round trip
+    assert list(written_df.columns) == ["name", "drilled", "depth", "count", "geometry"]
+    assert written_df["drilled"].dtype.kind == "M"
+    assert list(written_df["drilled"]) == list(features_df["drilled"])
+    assert written_df["count"].dtype.kind == "i"
+    assert written_df.crs == "EPSG:4283"
+
+
+def test_write_geopackage_failure(tmp_path, features_df, mocker):
+    (tmp_path / "features.gpkg").write_text("previous")
+    mocker.patch.object(gpd.GeoDataFrame, "to_file", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError, match="disk full"):
+        write_geopackage(features_df, tmp_path / "features.gpkg")
+
+    # the existing asset is untouched and the temporary file is removed
+    assert [path.name for path in tmp_path.iterdir()] == ["features.gpkg"]
+    assert (tmp_path / "features.gpkg").read_text() == "previous"
+
+
+def test_write_geopackage_unique_tmp(tmp_path, features_df, mocker):
+    mkstemp_spy = mocker.spy(tempfile, "mkstemp")
+
+    write_geopackage(features_df, tmp_path / "features.gpkg")
+    write_geopackage(features_df, tmp_path / "features.gpkg")
+
+    # concurrent fetches of the same asset never share a temporary file
+    tmp_names = [tmp_name for _, tmp_name in mkstemp_spy.spy_return_list]
+    assert len(set(tmp_names)) == 2
+    assert all(pathlib.Path(tmp_name).parent == tmp_path for tmp_name in tmp_names)
+
+
+def test_write_geopackage_esri_json(tmp_path, lonlat_config):
+    esri_json = {
+        "geometryType": "esriGeometryPoint",
+        "spatialReference": {"wkid": 4326},
+        "fields": [{"name": "WellName", "type": "esriFieldTypeString"}],
+        "features": [
+            {"attributes": {"WellName": "Well 1"}, "geometry": {"x": 130.5, "y": -30.5}},
+            {"attributes": {"WellName": "Well 2"}, "geometry": {"x": 131.5, "y": -31.5}},
+        ],
+    }
+
+    write_geopackage(json.dumps(esri_json), tmp_path / "wells.gpkg")
+    wells_df = parse_geo(_configured(tmp_path, lonlat_config, "wells.gpkg"))
+
+    assert list(wells_df["WellName"]) == ["Well 1", "Well 2"]
+    assert list(wells_df.geometry.x) == [130.5, 131.5]
+
+
+def test_parse_geo_no_crs(tmp_path, lonlat_config):
+    points_df = gpd.GeoDataFrame({"value": [1, 2]}, geometry=gpd.points_from_xy([1, 2], [3, 4]))
+    points_df.to_file(tmp_path / "points.shp")
+    data_source = _configured(tmp_path, lonlat_config, "points.shp")
+
+    with pytest.raises(ValueError, match="could not determine CRS"):
+        parse_geo(data_source)
+
+    assert parse_geo(data_source, source_crs="EPSG:4326").crs == "EPSG:4326"
@@ -1,8 +1,13 @@
 import numpy as np
 import pytest
+import shapely
 from shapely.geometry import LineString, MultiLineString, MultiPolygon, Polygon
 
-from openmethane_prior.lib.grid.geometry import grid_mask_from_polygon, grid_weights_from_linestring
+from openmethane_prior.lib.grid.geometry import (
+    grid_mask_from_polygon,
+    grid_weights_from_linestring,
+    grid_weights_from_linestrings,
+)
 from openmethane_prior.lib.grid.grid import Grid
 
 
@@ -202,3 +207,78 @@ def test_linestring_non_unit_cell_size():
 
     np.testing.assert_allclose(weights.sum(), 1.0)
     np.testing.assert_allclose(weights[0], [1 / 3, 1 / 3, 1 / 3])
+
+
+# ---------------------------------------------------------------------------
+# grid_weights_from_linestrings
+# ---------------------------------------------------------------------------
+
+
+def test_linestrings_match_single_linestring_weights(small_grid):
+    lines = [
+        LineString([(0.3, 0.7), (3.8, 2.1)]),
+        LineString([(-1, 0.5), (2, 0.5)]),
+        MultiLineString([[(0, 0.5), (1, 0.5)], [(2, 0.5), (3, 0.5)]]),
+        LineString([(10, 10), (20, 10)]),
+        LineString([(1.5, 1.5), (1.5, 1.5)]),
+    ]
+    values = [2.0, 3.0, 5.0, 7.0, 11.0]
+
+    result = grid_weights_from_linestrings(small_grid, lines, values)
+
+    expected = sum(
+        grid_weights_from_linestring(small_grid, line) * value for line, value in zip(lines, values)
+    )
+    assert result.shape == small_grid.shape
+    np.testing.assert_allclose(result, expected)
+    # lines outside the grid and without length contribute nothing
+    np.testing.assert_allclose(result.sum(), 2.0 + 3.0 * 2 / 3 + 5.0)
+
+
+def test_linestrings_empty(small_grid):
+    result = grid_weights_from_linestrings(small_grid, [], [])
+
+    np.testing.assert_array_equal(result, np.zeros(small_grid.shape))
+
+
+def test_linestrings_value_count_mismatch(small_grid):
+    with pytest.raises(ValueError, match="Expected a value for each linestring"):
+        grid_weights_from_linestrings(small_grid, [LineString([(0, 0), (1, 1)])], [1.0, 2.0])
+
+
+def test_linestrings_match_polygon_intersection():
+    # irregular lines across a projected grid, with parts outside the grid
+    grid = Grid(
+        dimensions=(20, 15),
+        origin_xy=(-100e3, -80e3),
+        cell_size=(10e3, 12e3),
+        proj_params="EPSG:3577",
+    )
+    rng = np.random.default_rng(1)
+    lines = []
+    for _ in range(50):
+        points = rng.uniform(-150e3, 150e3, 2) + np.cumsum(rng.normal(0, 20e3, (8, 2)), axis=0)
+        lines.append(LineString(points))
+    lines.append(MultiLineString([lines[0].coords, lines[1].coords]))
+    values = rng.uniform(1, 100, len(lines))
+
+    result = grid_weights_from_linestrings(grid, lines, values)
+
+    # the length of each line inside each cell polygon
+    bx, by = grid.cell_bounds_x(), grid.cell_bounds_y()
+    cell_ix, cell_iy = np.meshgrid(np.arange(grid.dimensions[0]), np.arange(grid.dimensions[1]))
+    boxes = shapely.box(bx[cell_ix], by[cell_iy], bx[cell_ix + 1], by[cell_iy + 1])
+    expected = sum(
+        shapely.length(shapely.intersection(boxes, line)) / line.length * value
+        for line, value in zip(lines, values)
+    )
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-9 * expected.max())
+
+
+def test_linestring_on_grid_line(small_grid):
+    # a line along the boundary between rows 0 and 1 is only counted once
+    line = LineString([(0.5, 1), (2.5, 1)])
+    weights = grid_weights_from_linestring(small_grid, line)
+
+    np.testing.assert_allclose(weights.sum(), 1.0)
+    np.testing.assert_allclose(weights[1], [0.25, 0.5, 0.25, 0.0])
@@ -0,0 +1,95 @@
+import gc
+
+import numpy as np
+
+from openmethane_prior.lib.grid.geometry_cache import (
+    clear_grid_geometries,
+    grid_geometries_memory_usage,
+    grid_geometry,
+)
+from openmethane_prior.lib.grid.grid import Grid
+from openmethane_prior.lib.utils import area_of_rectangle_m2
+
+
+def test_geometry_computed_lazily():
+    test_grid = Grid(dimensions=(8, 10), origin_xy=(-4, -5), cell_size=(1, 2))
+    geometry = test_grid.geometry
+
+    assert geometry.memory_usage() == 0
+
+    corners_lon, corners_lat = geometry.corners_lonlat()
+    assert corners_lon.shape == (11, 9)
+    assert geometry.memory_usage() > 0
+
+    usage = geometry.memory_usage()
+    lons, lats = test_grid.cell_bounds_lonlat()
+    assert lons.shape == (10, 8, 4)
+    assert geometry.memory_usage() == usage + lons.nbytes + lats.nbytes
+
+    # subsequent calls return the cached arrays
+    assert test_grid.cell_bounds_lonlat()[0] is lons
+
+
+def test_geometry_clear():
+    test_grid = Grid(dimensions=(8, 10), origin_xy=(-4, -5), cell_size=(1, 2))
+    bounds_x = test_grid.cell_bounds_x()
+
+    test_grid.geometry.clear()
+
+    assert test_grid.geometry.memory_usage() == 0
+    assert test_grid.cell_bounds_x() is not bounds_x
+    np.testing.assert_array_equal(test_grid.cell_bounds_x(), bounds_x)
+
+
+def test_geometry_shared_by_equal_grids():
+    test_grid = Grid(dimensions=(8, 10), origin_xy=(-4, -5), cell_size=(1, 2))
+    equal_grid = Grid(dimensions=(8, 10), origin_xy=(-4, -5), cell_size=(1, 2))
+    other_grid = Grid(dimensions=(8, 10), origin_xy=(-3, -5), cell_size=(1, 2))
+
+    assert grid_geometry(test_grid) is grid_geometry(equal_grid)
+    assert grid_geometry(test_grid) is not grid_geometry(other_grid)
+
+
+def test_geometry_released_with_grid():
+    clear_grid_geometries()
+    baseline = grid_geometries_memory_usage()
+
+    test_grid = Grid(dimensions=(80, 100), origin_xy=(-40, -50), cell_size=(1, 1))
+    test_grid.cell_bounds_lonlat()
+    assert grid_geometries_memory_usage() > baseline
+
+    del test_grid
+    gc.collect()
+
+    assert grid_geometries_memory_usage() == baseline
+
+
+def test_geometry_cell_centres_lonlat(aust10km_grid):
+    centres_lon, centres_lat = aust10km_grid.geometry.cell_centres_lonlat()
+
+    assert centres_lon.shape == aust10km_grid.shape
+    expected_lon, expected_lat = aust10km_grid.xy_to_lonlat(
+        aust10km_grid.cell_coords_x()[89], aust10km_grid.cell_coords_y()[42],
+    )
+    assert centres_lon[42, 89] == expected_lon
+    assert centres_lat[42, 89] == expected_lat
+
+
+def test_geometry_cell_areas_m2(aust10km_grid):
+    # geographic grid, compare against spherical lat/lon rectangle areas
+    lonlat_grid = Grid(dimensions=(4, 3), origin_xy=(130, -30), cell_size=(1, 1))
+    areas = lonlat_grid.geometry.cell_areas_m2()
+    expected = area_of_rectangle_m2(
+        np.arange(-30, -27)[:, None], np.arange(-29, -26)[:, None], 0, 1,
+    ) * np.ones((3, 4))
+    np.testing.assert_allclose(areas, expected, rtol=5e-3)
+
+    # 10km LCC cells are distorted away from the true latitudes, compare a
+    # sample of cells with geodesic areas on the same ellipsoid
+    lcc_areas = aust10km_grid.geometry.cell_areas_m2()
+    assert lcc_areas.shape == aust10km_grid.shape
+    lons, lats = aust10km_grid.cell_bounds_lonlat()
+    geod = aust10km_grid.projection.crs.get_geod()
+    for iy, ix in [(0, 0), (215, 227), (429, 453), (100, 300)]:
+        geodesic_area, _ = geod.polygon_area_perimeter(lons[iy, ix], lats[iy, ix])
+        np.testing.assert_allclose(lcc_areas[iy, ix], abs(geodesic_area), rtol=1e-6)
@@ -1,6 +1,10 @@
+import time
+
 import numpy as np
+import pytest
 import xarray as xr
 
+from openmethane_prior.lib.grid.create_grid import create_grid_from_mcip
 from openmethane_prior.lib.grid.grid import Grid
 
 
@@ -347,3 +351,109 @@ def test_grid_is_aligned():
     )
 
     assert test_grid_e.is_aligned(test_grid_f) == False
+
+
+def test_grid_is_aligned_other_projections():
+    albers_params = (
+        "+proj=aea +lat_0=0 +lon_0=132 +lat_1=-18 +lat_2=-36 +ellps=GRS80 +units=m +no_defs"
+    )
+    albers_grid = Grid(
+        dimensions=(10, 10), origin_xy=(0, 0), cell_size=(1000, 1000), proj_params=albers_params
+    )
+    albers_offset_grid = Grid(
+        dimensions=(5, 5), origin_xy=(0, 0), cell_size=(2000, 2000),
+        proj_params=albers_params + " +x_0=5000 +y_0=-3000",
+    )
+    albers_other_grid = Grid(
+        dimensions=(10, 10), origin_xy=(0, 0), cell_size=(1000, 1000),
+        proj_params=albers_params.replace("+lon_0=132", "+lon_0=135"),
+    )
+
+    assert albers_grid.is_aligned(albers_offset_grid)
+    assert not albers_grid.is_aligned(albers_other_grid)
+
+    # EPSG:4326 and an equivalent proj string are aligned, even though
+    # EPSG:4326 defines lat/lon axis order
+    geographic_grid = Grid(dimensions=(10, 10), origin_xy=(110, -45), cell_size=(0.1, 0.1))
+    longlat_grid = Grid(
+        dimensions=(10, 10), origin_xy=(112, -40), cell_size=(0.2, 0.2),
+        proj_params="+proj=longlat +datum=WGS84 +no_defs",
+    )
+
+    assert geographic_grid.is_aligned(longlat_grid)
+    assert not geographic_grid.is_aligned(albers_grid)
+
+
+def test_grid_fingerprint():
+    test_grid = Grid(
+        dimensions=(8, 10),
+        origin_xy=(-4, -5),
+        cell_size=(1, 2),
+    )
+    same_grid = Grid(
+        dimensions=(np.int64(8), np.int64(10)),
+        origin_xy=(-4.0, -5.0),
+        cell_size=(np.float32(1), np.float32(2)),
+    )
+    offset_grid = Grid(
+        dimensions=(8, 10),
+        origin_xy=(-3, -5),
+        cell_size=(1, 2),
+    )
+
+    assert len(test_grid.fingerprint()) == 64
+    assert test_grid.fingerprint() == same_grid.fingerprint()
+    assert test_grid.fingerprint() != offset_grid.fingerprint()
+
+
+def _cell_bounds_lonlat_per_cell(grid: Grid):
+    """Original implementation of Grid.cell_bounds_lonlat which projects the
+    corners of each cell separately, kept as a reference and benchmark."""
+    bounds_x = grid.cell_bounds_x()
+    bounds_y = grid.cell_bounds_y()
+    lon_bounds = np.ndarray(shape=(grid.shape[0], grid.shape[1], 4), dtype=np.float64)
+    lat_bounds = np.ndarray(shape=(grid.shape[0], grid.shape[1], 4), dtype=np.float64)
+    for iy in range(grid.shape[0]):
+        for ix in range(grid.shape[1]):
+            cell_bounds_x = [bounds_x[ix], bounds_x[ix + 1], bounds_x[ix + 1], bounds_x[ix]]
+            cell_bounds_y = [bounds_y[iy], bounds_y[iy], bounds_y[iy + 1], bounds_y[iy + 1]]
+            lon_bounds[iy, ix], lat_bounds[iy, ix] = grid.xy_to_lonlat(cell_bounds_x, cell_bounds_y)
+    return lon_bounds, lat_bounds
+
+
+def test_grid_lonlat_bounds_per_cell_identical():
+    test_grid = create_grid_from_mcip(
+        TRUELAT1=-15.0, TRUELAT2=-40.0, MOAD_CEN_LAT=-27.643997, STAND_LON=133.302001953125,
+        COLS=30, ROWS=25, XCENT=133.302001953125, YCENT=-27.5,
+        XORIG=-150000.0, YORIG=-125000.0, XCELL=10000.0, YCELL=10000.0,
+    )
+
+    expected_lons, expected_lats = _cell_bounds_lonlat_per_cell(test_grid)
+    lons, lats = test_grid.cell_bounds_lonlat()
+
+    # projecting every corner at once gives exactly the per-cell result
+    np.testing.assert_array_equal(lons, expected_lons)
+    np.testing.assert_array_equal(lats, expected_lats)
+
+
+@pytest.mark.benchmark
+def test_grid_lonlat_bounds_benchmark():
+    # a 10km LCC grid large enough for per-cell projection costs to dominate
+    test_grid = create_grid_from_mcip(
+        TRUELAT1=-15.0, TRUELAT2=-40.0, MOAD_CEN_LAT=-27.643997, STAND_LON=133.302001953125,
+        COLS=120, ROWS=100, XCENT=133.302001953125, YCENT=-27.5,
+        XORIG=-600000.0, YORIG=-500000.0, XCELL=10000.0, YCELL=10000.0,
+    )
+
+    start = time.perf_counter()
+    _cell_bounds_lonlat_per_cell(test_grid)
+    per_cell_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    test_grid.cell_bounds_lonlat()
+    batched_seconds = time.perf_counter() - start
+
+    print(
+        f"cell_bounds_lonlat on {test_grid.shape}: per-cell {per_cell_seconds:.3f}s, "
+        f"batched {batched_seconds:.3f}s ({per_cell_seconds / batched_seconds:.0f}x)"
+    )
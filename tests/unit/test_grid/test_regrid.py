@@ -1,7 +1,16 @@
+import itertools
+
 import numpy as np
+import shapely
+from shapely import geometry
 
 from openmethane_prior.lib.grid.grid import Grid
-from openmethane_prior.lib.grid.regrid import regrid_data
+from openmethane_prior.lib.grid.regrid import (
+    grid_overlap_areas,
+    regrid_any,
+    regrid_coarsened,
+    regrid_data,
+)
 
 
 def test_regrid_data_same_grid():
@@ -45,6 +54,64 @@ def test_regrid_data_smaller_grid():
     assert result[2:5, 1:4].sum() == 2 * 3 # cluster of 1s is at 1,2 in the smaller grid
 
 
+def test_regrid_data_coarsened():
+    source_grid = Grid(
+        dimensions=(30, 24),
+        origin_xy=(-15000, -12000),
+        cell_size=(1000, 1000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    target_grid = Grid(
+        dimensions=(8, 6),
+        origin_xy=(-12000 + 100000, -9000), # offset by x_0
+        cell_size=(3000, 3000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132, x_0=100000),
+    )
+    data = np.arange(source_grid.shape[0] * source_grid.shape[1], dtype=np.float64).reshape(
+        source_grid.shape
+    )
+
+    result = regrid_data(data, from_grid=source_grid, to_grid=target_grid)
+
+    # each target cell takes the value of the source cell at its centre
+    assert result.shape == target_grid.shape
+    np.testing.assert_array_equal(result, data[4:22:3, 4:28:3])
+
+
+def test_regrid_coarsened_even_factor():
+    data = np.arange(8 * 8).reshape(8, 8)
+
+    result = regrid_coarsened(data, factor_xy=(2, 4), start_xy=(0, 0), to_shape=(2, 4))
+
+    # target cell centres lie on source cell edges, so take the upper cell
+    # like np.digitize does
+    np.testing.assert_array_equal(result, data[2::4, 1::2])
+
+
+def test_regrid_data_aligned_albers():
+    albers_params = (
+        "+proj=aea +lat_0=0 +lon_0=132 +lat_1=-18 +lat_2=-36 +ellps=GRS80 +units=m +no_defs"
+    )
+    source_grid = Grid(
+        dimensions=(10, 10),
+        origin_xy=(0, 0),
+        cell_size=(1000, 1000),
+        proj_params=albers_params,
+    )
+    target_grid = Grid(
+        dimensions=(6, 6),
+        origin_xy=(5250, 5250), # not aligned to source cell edges
+        cell_size=(1000, 1000),
+        proj_params=albers_params + " +x_0=5000 +y_0=5000",
+    )
+    data = np.arange(100, dtype=np.float64).reshape(10, 10)
+
+    result = regrid_data(data, from_grid=source_grid, to_grid=target_grid)
+
+    assert result.shape == target_grid.shape
+    np.testing.assert_array_equal(result, data[:6, :6])
+
+
 def test_regrid_data_different_projections():
     source_grid = Grid(
         dimensions=(8, 8),
@@ -87,3 +154,74 @@ def test_regrid_data_different_projections_sizes():
     assert result.shape == target_grid.shape
     assert result.sum() == 4 # cells are the 1:4, so 1 value appears 4 times
     assert result[3:5, 4:6].sum() == 4 # result is spread from 3,4 to 4,5
+
+
+def _regrid_any_reference(data, from_grid, to_grid):
+    # original cell-by-cell implementation of regrid_any
+    from_polys = []
+    from_bounds_lon, from_bounds_lat = from_grid.cell_bounds_lonlat()
+    for iy, ix in itertools.product(range(from_grid.shape[0]), range(from_grid.shape[1])):
+        from_polys.append(geometry.Polygon(zip(from_bounds_lon[iy, ix], from_bounds_lat[iy, ix])))
+
+    result = np.zeros(to_grid.shape)
+    to_bounds_lon, to_bounds_lat = to_grid.cell_bounds_lonlat()
+    for iy, ix in itertools.product(range(to_grid.shape[0]), range(to_grid.shape[1])):
+        to_poly = geometry.Polygon(zip(to_bounds_lon[iy, ix], to_bounds_lat[iy, ix]))
+        best_area, best_value = 0.0, 0.0
+        for i, from_poly in enumerate(from_polys):
+            area = to_poly.intersection(from_poly).area
+            if area > best_area:
+                best_area, best_value = area, data.ravel()[i]
+        result[iy, ix] = best_value
+    return result
+
+
+def test_regrid_any_matches_reference():
+    source_grid = Grid(
+        dimensions=(12, 10),
+        origin_xy=(-137.38, -38.51),
+        cell_size=(0.7, 0.6),
+    )
+    target_grid = Grid(
+        dimensions=(9, 11),
+        origin_xy=(-137, -38),
+        cell_size=(1, 0.5),
+        proj_params="EPSG:7843",
+    )
+    data = np.random.default_rng(0).random(source_grid.shape)
+
+    result = regrid_any(data, from_grid=source_grid, to_grid=target_grid)
+
+    np.testing.assert_array_equal(result, _regrid_any_reference(data, source_grid, target_grid))
+
+
+def test_grid_overlap_areas():
+    source_grid = Grid(dimensions=(4, 4), origin_xy=(0, 0), cell_size=(1, 1))
+    target_grid = Grid(
+        dimensions=(2, 2), origin_xy=(0.5, 0.5), cell_size=(2, 2), proj_params="EPSG:7843"
+    )
+
+    overlap = grid_overlap_areas(from_grid=source_grid, to_grid=target_grid)
+
+    assert overlap.shape == (4, 16)
+    # target cells extend 0.5 beyond the far edges of the source grid
+    np.testing.assert_allclose(overlap.sum(axis=1), [4.0, 3.0, 3.0, 2.25])
+    # the first target cell covers a quarter of 4 source cells, and half of 4 more
+    np.testing.assert_allclose(sorted(overlap[[0]].data), [0.25] * 4 + [0.5] * 4 + [1.0])
+
+
+def test_grid_overlap_areas_stored(tmp_path, mocker):
+    source_grid = Grid(dimensions=(4, 4), origin_xy=(0, 0), cell_size=(1, 1))
+    target_grid = Grid(
+        dimensions=(2, 2), origin_xy=(0.5, 0.5), cell_size=(2, 2), proj_params="EPSG:7843"
+    )
+    expected = grid_overlap_areas(from_grid=source_grid, to_grid=target_grid)
+
+    stored = grid_overlap_areas(from_grid=source_grid, to_grid=target_grid, cache_path=tmp_path)
+    # another sector regridding between the same grids reuses the matrix
+    query_spy = mocker.spy(shapely.STRtree, "query")
+    reused = grid_overlap_areas(from_grid=source_grid, to_grid=target_grid, cache_path=tmp_path)
+
+    assert query_spy.call_count == 0
+    np.testing.assert_array_equal(stored.toarray(), expected.toarray())
+    np.testing.assert_array_equal(reused.toarray(), expected.toarray())
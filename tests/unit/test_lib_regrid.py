@@ -1,9 +1,20 @@
+import multiprocessing
+
 import numpy as np
 import pytest
 import xarray as xr
 
+from openmethane_prior.lib import regrid
+from openmethane_prior.lib.grid.create_grid import create_grid_from_mcip
 from openmethane_prior.lib.grid.grid import Grid
-from openmethane_prior.lib.regrid import _compute_cell_edges, _compute_from_areas, regrid_data_array_conservative
+from openmethane_prior.lib.regrid import (
+    _build_weights,
+    _compute_cell_edges,
+    _compute_from_areas,
+    regrid_data_array_conservative,
+)
+from openmethane_prior.lib.utils import save_zipped_pickle
+from openmethane_prior.lib.weight_store import WeightStore
 
 
 # 2×2 domain: 2° cells covering lon 138–142, lat –38 to –34 (eastern Australia)
@@ -51,9 +62,62 @@ def test_3d_time_coord_preserved(domain_grid, source_da, tmp_path):
 
 
 def test_cache_file_created(domain_grid, source_da, tmp_path):
-    assert not (tmp_path / "tcache_weights.p.gz").exists()
+    weight_store = WeightStore.from_cache_path(tmp_path)
+    assert weight_store.size() == 0
     regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tcache")
-    assert (tmp_path / "tcache_weights.p.gz").exists()
+    assert len(list(weight_store.path.glob("*.weights"))) == 1
+
+
+def test_cache_shared_between_names(domain_grid, source_da, tmp_path, mocker):
+    regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tshared_a")
+
+    build_spy = mocker.spy(regrid, "_build_weights")
+    regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tshared_b")
+
+    # same input coordinates and domain reuse the weights under any name
+    build_spy.assert_not_called()
+
+
+def test_cache_not_reused_when_resolution_changes(domain_grid, source_da, tmp_path):
+    r_coarse = regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tres")
+
+    # same name and extent, but at twice the resolution
+    lats = np.arange(-37.75, -33.9, 0.5)
+    lons = np.arange(138.25, 142.0, 0.5)
+    fine_da = xr.DataArray(
+        np.ones((8, 8), dtype=np.float32),
+        dims=["latitude", "longitude"],
+        coords={"latitude": lats, "longitude": lons},
+    )
+    r_fine = regrid_data_array_conservative(fine_da, domain_grid, tmp_path, "tres")
+
+    assert len(list(WeightStore.from_cache_path(tmp_path).path.glob("*.weights"))) == 2
+    # a uniform density regrids to the same values at either resolution
+    np.testing.assert_allclose(r_fine.values, r_coarse.values, rtol=1e-5)
+
+
+def test_cache_rebuilds_legacy_named_weights(domain_grid, source_da, tmp_path, mocker):
+    expected = regrid_data_array_conservative(
+        source_da, domain_grid, tmp_path / "expected", "tlegacy"
+    )
+
+    # weights saved by earlier versions, named after the input and domain,
+    # which may have been calculated for a different domain of the same shape
+    lat_edges = _compute_cell_edges(source_da["latitude"].values)
+    lon_edges = _compute_cell_edges(source_da["longitude"].values)
+    stale_weights = _build_weights(
+        domain_grid, lat_edges, lon_edges, _compute_from_areas(lat_edges, lon_edges)
+    )
+    stale_weights.data[:] = 0.0
+    save_zipped_pickle(stale_weights, tmp_path / "tlegacy_weights.p.gz")
+
+    build_spy = mocker.spy(regrid, "_build_weights")
+    result = regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tlegacy")
+
+    build_spy.assert_called_once()
+    np.testing.assert_array_equal(result.values, expected.values)
+    assert not (tmp_path / "tlegacy_weights.p.gz").exists()
+    assert len(list(WeightStore.from_cache_path(tmp_path).path.glob("*.weights"))) == 1
 
 
 def test_cache_hit_gives_identical_result(domain_grid, source_da, tmp_path):
@@ -143,3 +207,184 @@ def test_nan_source_cells_not_propagated(domain_grid, source_da, tmp_path):
     result_clean = regrid_data_array_conservative(da_with_zero, domain_grid, tmp_path, "tnan_clean")
 
     np.testing.assert_array_equal(result, result_clean)
+
+
+def _build_weights_reference(domain_grid, lat_edges, lon_edges, from_areas):
+    """Original per-cell implementation of _build_weights, kept as a reference
+    for the vectorised version."""
+    import bisect
+    import itertools
+
+    from scipy.sparse import csr_array
+    from shapely import geometry
+
+    n_lon = len(lon_edges) - 1
+    n_lat = len(lat_edges) - 1
+    n_out = domain_grid.shape[0] * domain_grid.shape[1]
+    cell_bounds_lon, cell_bounds_lat = domain_grid.cell_bounds_lonlat()
+
+    rows, cols, data = [], [], []
+    for i, j in itertools.product(range(domain_grid.shape[0]), range(domain_grid.shape[1])):
+        xvals = cell_bounds_lon[i, j]
+        yvals = cell_bounds_lat[i, j]
+        domain_cell = geometry.Polygon(zip(xvals, yvals))
+
+        ixminl = bisect.bisect_right(lon_edges, np.min(xvals))
+        ixmaxr = bisect.bisect_right(lon_edges, np.max(xvals))
+        iyminl = bisect.bisect_right(lat_edges, np.min(yvals))
+        iymaxr = bisect.bisect_right(lat_edges, np.max(yvals))
+
+        for ix, iy in itertools.product(
+            range(max(0, ixminl - 1), min(n_lon, ixmaxr)),
+            range(max(0, iyminl - 1), min(n_lat, iymaxr)),
+        ):
+            input_cell = geometry.box(
+                lon_edges[ix], lat_edges[iy], lon_edges[ix + 1], lat_edges[iy + 1]
+            )
+            if domain_cell.intersects(input_cell):
+                coef = domain_cell.intersection(input_cell).area / input_cell.area
+                rows.append(i * domain_grid.shape[1] + j)
+                cols.append(iy * n_lon + ix)
+                data.append(coef * from_areas[iy, ix] / domain_grid.cell_area)
+
+    return csr_array((data, (rows, cols)), shape=(n_out, n_lat * n_lon))
+
+
+def test_build_weights_matches_reference():
+    # small LCC grid over south-eastern Australia, so domain cells are not
+    # aligned with the lon/lat source grid
+    lcc_grid = create_grid_from_mcip(
+        TRUELAT1=-15.0, TRUELAT2=-40.0, MOAD_CEN_LAT=-27.643997, STAND_LON=133.302001953125,
+        COLS=12, ROWS=9, XCENT=133.302001953125, YCENT=-27.5,
+        XORIG=400000.0, YORIG=-1000000.0, XCELL=10000.0, YCELL=10000.0,
+    )
+    lat_edges = _compute_cell_edges(np.arange(-40.05, -34.0, 0.1)[::-1])[::-1]
+    lon_edges = _compute_cell_edges(np.arange(136.05, 142.0, 0.1))
+    from_areas = _compute_from_areas(lat_edges, lon_edges)
+
+    expected = _build_weights_reference(lcc_grid, lat_edges, lon_edges, from_areas)
+    result = _build_weights(lcc_grid, lat_edges, lon_edges, from_areas)
+
+    assert result.shape == expected.shape
+    assert result.nnz > 0
+    np.testing.assert_allclose(result.toarray(), expected.toarray(), rtol=1e-12, atol=0)
+
+
+def test_build_weights_parallel_identical(mocker):
+    lcc_grid = create_grid_from_mcip(
+        TRUELAT1=-15.0, TRUELAT2=-40.0, MOAD_CEN_LAT=-27.643997, STAND_LON=133.302001953125,
+        COLS=12, ROWS=9, XCENT=133.302001953125, YCENT=-27.5,
+        XORIG=400000.0, YORIG=-1000000.0, XCELL=10000.0, YCELL=10000.0,
+    )
+    lat_edges = _compute_cell_edges(np.arange(-40.05, -34.0, 0.1)[::-1])[::-1]
+    lon_edges = _compute_cell_edges(np.arange(136.05, 142.0, 0.1))
+    from_areas = _compute_from_areas(lat_edges, lon_edges)
+
+    get_context_spy = mocker.spy(multiprocessing, "get_context")
+    serial = _build_weights(lcc_grid, lat_edges, lon_edges, from_areas)
+    parallel = _build_weights(lcc_grid, lat_edges, lon_edges, from_areas, workers=2)
+
+    # forking a process with sector threads running can deadlock
+    assert get_context_spy.call_args.args[0] != "fork"
+
+    # bands must be stitched back together in exactly the serial order
+    np.testing.assert_array_equal(parallel.indptr, serial.indptr)
+    np.testing.assert_array_equal(parallel.indices, serial.indices)
+    np.testing.assert_array_equal(parallel.data, serial.data)
+
+
+def test_regrid_workers(domain_grid, source_da, tmp_path):
+    r_serial = regrid_data_array_conservative(source_da, domain_grid, tmp_path, "tserial")
+    r_parallel = regrid_data_array_conservative(
+        source_da, domain_grid, tmp_path, "tparallel", workers=2
+    )
+
+    np.testing.assert_array_equal(r_parallel.values, r_serial.values)
+
+
+def test_chunked_regrid_identical(domain_grid, source_da, tmp_path):
+    rng = np.random.default_rng(42)
+    times = np.arange("2022-01-01", "2022-01-08", dtype="datetime64[D]").astype("datetime64[ns]")
+    values = rng.random((len(times), 4, 4)).astype(np.float32)
+    values[3, 1, 2] = np.nan
+    da_3d = xr.DataArray(
+        values,
+        dims=["time", "latitude", "longitude"],
+        coords={
+            "time": times,
+            "latitude": source_da["latitude"],
+            "longitude": source_da["longitude"],
+        },
+    )
+
+    expected = regrid_data_array_conservative(da_3d, domain_grid, tmp_path, "tchunk")
+    for chunk_size in [1, 3, 7, 100]:
+        result = regrid_data_array_conservative(
+            da_3d, domain_grid, tmp_path, "tchunk", chunk_size=chunk_size
+        )
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result["time"].values, times)
+        np.testing.assert_array_equal(result.values, expected.values)
+
+    expected_extensive = regrid_data_array_conservative(
+        da_3d, domain_grid, tmp_path, "tchunk", extensive=True
+    )
+    result_extensive = regrid_data_array_conservative(
+        da_3d, domain_grid, tmp_path, "tchunk", extensive=True, chunk_size=2,
+    )
+    np.testing.assert_array_equal(result_extensive.values, expected_extensive.values)
+
+
+def test_chunked_regrid_from_file(domain_grid, source_da, tmp_path):
+    # streaming reads each chunk from a lazily loaded file
+    times = np.array(["2022-01-01", "2022-02-01", "2022-03-01"], dtype="datetime64[ns]")
+    da_3d = xr.DataArray(
+        np.stack([source_da.values * i for i in range(1, 4)]),
+        dims=["time", "latitude", "longitude"],
+        coords={
+            "time": times,
+            "latitude": source_da["latitude"],
+            "longitude": source_da["longitude"],
+        },
+        name="flux",
+    )
+    da_3d.to_netcdf(tmp_path / "input.nc")
+
+    expected = regrid_data_array_conservative(da_3d, domain_grid, tmp_path, "tfile")
+    with xr.open_dataset(tmp_path / "input.nc") as ds:
+        result = regrid_data_array_conservative(
+            ds["flux"], domain_grid, tmp_path, "tfile", chunk_size=1
+        )
+
+    np.testing.assert_array_equal(result.values, expected.values)
+
+
+def test_dask_regrid_is_lazy(domain_grid, source_da, tmp_path):
+    pytest.importorskip("dask")
+
+    times = np.array(["2022-01-01", "2022-02-01", "2022-03-01"], dtype="datetime64[ns]")
+    da_3d = xr.DataArray(
+        np.stack([source_da.values * i for i in range(1, 4)]),
+        dims=["time", "latitude", "longitude"],
+        coords={
+            "time": times,
+            "latitude": source_da["latitude"],
+            "longitude": source_da["longitude"],
+        },
+        name="flux",
+    )
+    da_3d.to_netcdf(tmp_path / "input.nc")
+    expected = regrid_data_array_conservative(da_3d, domain_grid, tmp_path, "tdask", extensive=True)
+
+    with xr.open_dataset(tmp_path / "input.nc", chunks={"time": 2}) as ds:
+        result = regrid_data_array_conservative(
+            ds["flux"], domain_grid, tmp_path, "tdask", extensive=True
+        )
+
+        # nothing has been read or regridded yet
+        assert result.chunks is not None
+        assert result.chunks[0] == (2, 1)
+        assert result.dims == ("time", "y", "x")
+        np.testing.assert_array_equal(result["time"].values, times)
+
+        np.testing.assert_array_equal(result.values, expected.values)
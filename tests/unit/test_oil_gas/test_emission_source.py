@@ -3,10 +3,18 @@ import geopandas as gpd
 import numpy as np
 import pandas as pd
 import shapely
+from scipy.sparse import csr_array
 
 from openmethane_prior.sectors.oil_gas.emission_source import (
+    SITE_FAMILY_DRILLHOLE,
+    SITE_FAMILY_FACILITY,
+    SITE_FAMILY_PIPELINE,
+    concat_emission_source_dfs,
+    site_type_family,
     normalise_emission_source_df,
+    allocate_emissions_to_source_groups,
     allocate_emissions_to_sources,
+    match_facility_sources,
 )
 
 
@@ -28,6 +36,7 @@ def test_normalise_emission_source():
     assert list(result_df.columns) == [
         "geometry",
         "site_type",
+        "site_family",
         "activity_start",
         "activity_end",
         "data_source",
@@ -41,6 +50,50 @@ def test_normalise_emission_source():
 
     assert result_df.crs == "EPSG:4326"
 
+    for column in ["site_type", "data_source", "state"]:
+        assert result_df[column].dtype == "category"
+    assert list(result_df["site_family"]) == [SITE_FAMILY_DRILLHOLE]
+
+
+def test_site_type_family():
+    site_type = pd.Series(
+        ["drillhole-csg", "pipeline-gas", "facility-unknown", None, "drillhole-unknown"]
+    )
+
+    assert list(site_type_family(site_type)) == [
+        SITE_FAMILY_DRILLHOLE,
+        SITE_FAMILY_PIPELINE,
+        SITE_FAMILY_FACILITY,
+        SITE_FAMILY_FACILITY,
+        SITE_FAMILY_DRILLHOLE,
+    ]
+    assert list(site_type_family(site_type.astype("category"))) == list(site_type_family(site_type))
+
+
+def test_concat_emission_source_dfs():
+    def _sources_df(site_type, state):
+        return normalise_emission_source_df(gpd.GeoDataFrame({
+            "geometry": [shapely.Point(1.0, 2.0)],
+            "site_type": [site_type],
+            "activity_start": [np.datetime64(datetime.datetime(2022, 1, 1, 0, 0))],
+            "activity_end": [np.datetime64(datetime.datetime(2024, 1, 1, 0, 0))],
+            "data_source": ["test-source"],
+            "data_source_id": ["1"],
+            "group_id": ["xyz"],
+            "state": [state],
+        }, crs="EPSG:4326"), "EPSG:4326")
+
+    result_df = concat_emission_source_dfs([
+        _sources_df("drillhole-csg", "NSW"),
+        _sources_df("pipeline-gas", None),
+    ])
+
+    assert result_df["site_type"].dtype == "category"
+    assert list(result_df["site_type"]) == ["drillhole-csg", "pipeline-gas"]
+    assert result_df["state"].dtype == "category"
+    assert list(result_df["state"].isna()) == [False, True]
+    assert list(result_df["site_family"]) == [SITE_FAMILY_DRILLHOLE, SITE_FAMILY_PIPELINE]
+
 
 def test_allocate_emissions_to_sources_only_masked():
     df = pd.DataFrame(
@@ -210,3 +263,74 @@ def test_allocate_emissions_to_sources_weights():
         df[drillholes_mask]["emissions_quantity"].sum(),
         df[facilities_mask]["emissions_quantity"].sum()
     )
+
+
+def test_match_facility_sources():
+    sources_df = pd.DataFrame(
+        data=[
+            ("nsw-drillholes", "1", "title-a"),
+            ("nsw-drillholes", "2", "title-a"),
+            ("nsw-drillholes", "3", None),
+            ("qld-drillholes", "1", "title-a"),
+            ("qld-drillholes", None, None),
+            (None, "1", None),
+        ],
+        columns=["data_source", "data_source_id", "group_id"],
+        # sources gathered from several datasets may repeat index values
+        index=[0, 1, 0, 1, 2, 0],
+    )
+    locations_df = pd.DataFrame(
+        data=[
+            ("facility-x", "nsw-drillholes", "1"),
+            # matches both sources in the group, including "1" again
+            ("facility-x", "nsw-drillholes", "title-a"),
+            ("facility-y", "qld-drillholes", "1"),
+            ("facility-y", "nsw-drillholes", "3"),
+            ("facility-z", "wa-drillholes", "1"),
+        ],
+        columns=["facility_name", "data_source_name", "data_source_id"],
+    )
+
+    result_df = match_facility_sources(sources_df, locations_df)
+
+    assert list(result_df["facility_name"]) == [
+        "facility-x",
+        "facility-x",
+        "facility-y",
+        "facility-y",
+    ]
+    assert list(result_df["source_index"]) == [0, 1, 2, 3]
+
+
+def test_allocate_emissions_to_source_groups():
+    sources_df = pd.DataFrame(
+        data=[
+            (None, "drillhole-csg", 1.0),
+            (None, "drillhole-csg", 1.0),
+            (None, "pipeline-gas", 2.0),
+            (None, "pipeline-gas", 6.0),
+            (None, "facility-unknown", 1.0),
+            (None, None, 1.0),
+        ],
+        columns=["emissions_quantity", "site_type", "weight"],
+    )
+    group_sources = csr_array(np.array([
+        [1, 1, 1, 1, 1, 0],
+        [0, 1, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+    ]))
+    emission_masses = [12, 6, 100]
+
+    allocate_emissions_to_source_groups(sources_df, group_sources, emission_masses)
+
+    # the same as allocating each group separately
+    expected_df = sources_df.copy()
+    expected_df["emissions_quantity"] = np.nan
+    for group_mask, emission_mass in zip(group_sources.toarray(), emission_masses):
+        if group_mask.any():
+            allocate_emissions_to_sources(expected_df, group_mask.astype(bool), emission_mass)
+
+    np.testing.assert_allclose(sources_df["emissions_quantity"], expected_df["emissions_quantity"])
+    np.testing.assert_allclose(sources_df["emissions_quantity"][:5], [2, 2 + 3, 1, 3 + 3, 4])
+    # sources which aren't in any group are not modified
+    assert np.isnan(sources_df["emissions_quantity"].iloc[5])
@@ -1,11 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import pyproj
+import pytest
+import rasterio
+import rasterio.transform
 import rioxarray as rxr
 import xarray as xr
 
 from openmethane_prior.data_sources.inventory import inventory_domain_data_source
 from openmethane_prior.data_sources.nightlights import night_lights_data_source
+from openmethane_prior.lib import raster
 from openmethane_prior.lib.grid.grid import Grid
-from openmethane_prior.lib.raster import remap_raster
+from openmethane_prior.lib.raster import (
+    RASTER_INDEX_FOLDER,
+    count_raster_categories,
+    open_raster_window,
+    raster_cell_index,
+    remap_geotiff,
+    remap_raster,
+)
+
 
 def test_remap_raster(config, input_files, data_manager, data_manager_fetch_only):
     test_coord = (2500, 3000) # let's read this in later
@@ -81,3 +96,227 @@ def test_remap_raster_input_projection():
 
     # check that our single value occurs in the right target cell
     assert result[target_y, target_x] == 1.0
+
+
+def _remap_raster_reference(input_xr, target_grid, input_crs):
+    # original row-by-row implementation of remap_raster, without clipping
+    projection_transformer = pyproj.Transformer.from_crs(
+        crs_from=input_crs, crs_to=target_grid.projection.crs, always_xy=True
+    )
+    input_np = input_xr.to_numpy()
+    result = np.zeros(target_grid.shape)
+    for iy in range(input_xr.y.size):
+        y_row = np.array([input_xr.y.item(iy)]).repeat(input_xr.x.size)
+        target_x, target_y = projection_transformer.transform(xx=input_xr.x, yy=y_row)
+        target_ix, target_iy, mask = target_grid.xy_to_cell_index(target_x, target_y)
+        if mask.any():
+            np.add.at(result, (target_iy[mask], target_ix[mask]), input_np[iy, mask])
+    return result
+
+
+@pytest.mark.parametrize("block_rows", [1, 7, 64, 10000])
+def test_remap_raster_blocks_identical(block_rows):
+    target_grid = Grid(
+        dimensions=(12, 10),
+        origin_xy=(-300000, -250000),
+        cell_size=(50000, 50000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    # source raster extends beyond the target grid on every side
+    source_grid = Grid(
+        dimensions=(90, 80),
+        origin_xy=(128.0, -31.0),
+        cell_size=(0.1, 0.1),
+        proj_params="EPSG:4326",
+    )
+    test_input = xr.DataArray(
+        coords={ "y": source_grid.cell_coords_y(), "x": source_grid.cell_coords_x() },
+        data=np.random.default_rng(0).random(source_grid.shape).astype(np.float32),
+    )
+
+    result = remap_raster(
+        test_input, target_grid, input_crs=source_grid.projection.crs, block_rows=block_rows
+    )
+
+    expected = _remap_raster_reference(test_input, target_grid, source_grid.projection.crs)
+    assert result.sum() > 0
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_remap_raster_cached_index(tmp_path, mocker):
+    target_grid = Grid(
+        dimensions=(12, 10),
+        origin_xy=(-300000, -250000),
+        cell_size=(50000, 50000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    source_grid = Grid(
+        dimensions=(90, 80),
+        origin_xy=(128.0, -31.0),
+        cell_size=(0.1, 0.1),
+        proj_params="EPSG:4326",
+    )
+    test_input = xr.DataArray(
+        coords={ "y": source_grid.cell_coords_y(), "x": source_grid.cell_coords_x() },
+        data=np.random.default_rng(0).random(source_grid.shape),
+    )
+    expected = remap_raster(test_input, target_grid, input_crs=source_grid.projection.crs)
+
+    result = remap_raster(
+        test_input, target_grid, input_crs=source_grid.projection.crs, cache_path=tmp_path
+    )
+
+    index_files = list((tmp_path / RASTER_INDEX_FOLDER).glob("*.npy"))
+    assert len(index_files) == 1
+    cell_index = np.load(index_files[0])
+    assert cell_index.dtype == np.int32
+    assert cell_index.min() == -1
+    np.testing.assert_array_equal(result, expected)
+
+    # the stored index is reused for a different raster with the same coordinates
+    compute_spy = mocker.spy(raster, "raster_cell_index")
+    result_again = remap_raster(
+        test_input * 2, target_grid, input_crs=source_grid.projection.crs, cache_path=tmp_path
+    )
+
+    assert compute_spy.call_count == 0
+    np.testing.assert_array_equal(result_again, expected * 2)
+
+    # a different grid gets its own index
+    other_grid = Grid(
+        dimensions=(6, 5),
+        origin_xy=(-300000, -250000),
+        cell_size=(100000, 100000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    remap_raster(test_input, other_grid, input_crs=source_grid.projection.crs, cache_path=tmp_path)
+
+    assert compute_spy.call_count == 1
+    assert len(list((tmp_path / RASTER_INDEX_FOLDER).glob("*.npy"))) == 2
+
+
+def test_cached_raster_cell_index_concurrent(tmp_path, mocker):
+    target_grid = Grid(
+        dimensions=(6, 5), origin_xy=(130.0, -30.0), cell_size=(1.0, 1.0), proj_params="EPSG:4326"
+    )
+    source_grid = Grid(
+        dimensions=(60, 50), origin_xy=(130.0, -30.0), cell_size=(0.1, 0.1), proj_params="EPSG:4326"
+    )
+    input_x, input_y = source_grid.cell_coords_x(), source_grid.cell_coords_y()
+    mkstemp_spy = mocker.spy(raster.tempfile, "mkstemp")
+
+    # sectors in one process may index the same raster at the same time
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        indexes = list(
+            executor.map(
+                lambda _: raster.cached_raster_cell_index(
+                    tmp_path, input_x, input_y, source_grid.projection.crs, target_grid
+                ),
+                range(8),
+            )
+        )
+
+    tmp_names = [name for _, name in mkstemp_spy.spy_return_list]
+    assert tmp_names
+    assert len(set(tmp_names)) == len(tmp_names)
+    for cell_index in indexes:
+        np.testing.assert_array_equal(cell_index, indexes[0])
+    assert len(list((tmp_path / RASTER_INDEX_FOLDER).iterdir())) == 1
+
+
+def test_count_raster_categories():
+    target_grid = Grid(
+        dimensions=(12, 10),
+        origin_xy=(-300000, -250000),
+        cell_size=(50000, 50000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    source_grid = Grid(
+        dimensions=(90, 80),
+        origin_xy=(128.0, -31.0),
+        cell_size=(0.1, 0.1),
+        proj_params="EPSG:4326",
+    )
+    categories = (
+        np.random.default_rng(0)
+        .choice([110, 210, 320, 999], size=source_grid.shape)
+        .astype(np.int16)
+    )
+    codes = np.array([320, 110, 210])  # 999 is not counted
+    cell_index = raster_cell_index(
+        source_grid.cell_coords_x(),
+        source_grid.cell_coords_y(),
+        source_grid.projection.crs,
+        target_grid,
+    )
+
+    counts = count_raster_categories(categories, codes, cell_index, target_grid, block_rows=7)
+
+    assert counts.shape == (3, *target_grid.shape)
+    for code_counts, code in zip(counts, codes):
+        category_xr = xr.DataArray(
+            coords={ "y": source_grid.cell_coords_y(), "x": source_grid.cell_coords_x() },
+            data=categories == code,
+        )
+        expected = remap_raster(category_xr, target_grid, input_crs=source_grid.projection.crs)
+        np.testing.assert_array_equal(code_counts, expected)
+
+
+def _write_geotiff(path, source_grid, data):
+    with rasterio.open(
+        path, "w",
+        driver="GTiff",
+        width=source_grid.dimensions[0],
+        height=source_grid.dimensions[1],
+        count=1,
+        dtype=data.dtype,
+        crs="EPSG:4326",
+        # GeoTIFF rows run from north to south
+        transform=rasterio.transform.from_origin(
+            source_grid.origin_xy[0],
+            source_grid.origin_xy[1] + source_grid.dimensions[1] * source_grid.cell_size[1],
+            source_grid.cell_size[0],
+            source_grid.cell_size[1],
+        ),
+        tiled=True,
+        blockxsize=16,
+        blockysize=16,
+    ) as dst:
+        dst.write(data[::-1], 1)
+
+
+def test_remap_geotiff(tmp_path):
+    target_grid = Grid(
+        dimensions=(6, 5),
+        origin_xy=(-150000, -125000),
+        cell_size=(50000, 50000),
+        proj_params=dict(proj="lcc", lat_1=-15.0, lat_2=-40.0, lat_0=-27.5, lon_0=132),
+    )
+    # national raster extends far beyond the target grid
+    source_grid = Grid(
+        dimensions=(400, 300),
+        origin_xy=(115.0, -40.0),
+        cell_size=(0.05, 0.05),
+        proj_params="EPSG:4326",
+    )
+    data = np.random.default_rng(0).integers(0, 3, size=source_grid.shape).astype(np.uint8)
+    geotiff_path = tmp_path / "test.tif"
+    _write_geotiff(geotiff_path, source_grid, data)
+
+    with open_raster_window(geotiff_path, target_grid) as window:
+        # only the window covering the grid is read
+        assert window.shape[0] < source_grid.shape[0] / 4
+        assert window.shape[1] < source_grid.shape[1] / 4
+        assert window.block_rows % 16 == 0
+        assert window[0:3].shape == (3, window.shape[1])
+
+    full_xr = rxr.open_rasterio(geotiff_path).squeeze("band", drop=True)
+    expected = remap_raster(full_xr, target_grid, input_crs=full_xr.rio.crs)
+    expected_mask = remap_raster(full_xr != 0, target_grid, input_crs=full_xr.rio.crs)
+
+    result = remap_geotiff(geotiff_path, target_grid)
+    result_mask = remap_geotiff(geotiff_path, target_grid, block_values=lambda block: block != 0)
+
+    assert result.sum() > 0
+    np.testing.assert_array_equal(result, expected)
+    np.testing.assert_array_equal(result_mask, expected_mask)
@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_array
+
+from openmethane_prior.lib import weight_store
+from openmethane_prior.lib.grid.grid import Grid
+from openmethane_prior.lib.utils import save_zipped_pickle
+from openmethane_prior.lib.weight_store import WeightStore, weights_key
+
+
+@pytest.fixture
+def weights():
+    return csr_array(np.arange(12, dtype=np.float64).reshape(3, 4))
+
+
+def test_weights_key():
+    grid = Grid(dimensions=(2, 2), origin_xy=(138.0, -38.0), cell_size=(2.0, 2.0))
+    other_grid = Grid(dimensions=(2, 2), origin_xy=(138.0, -38.0), cell_size=(1.0, 1.0))
+    lat_edges = np.arange(-38.0, -33.9, 1.0)
+    lon_edges = np.arange(138.0, 142.1, 1.0)
+
+    key = weights_key(grid, lat_edges, lon_edges)
+
+    assert key == weights_key(grid, lat_edges.copy(), lon_edges.copy())
+    assert key != weights_key(other_grid, lat_edges, lon_edges)
+    assert key != weights_key(grid, lat_edges + 0.5, lon_edges)
+    assert key != weights_key(grid, lat_edges, np.arange(138.0, 142.1, 0.5))
+
+
+def test_weight_store_roundtrip(tmp_path, weights):
+    store = WeightStore(path=tmp_path)
+
+    assert store.load("abc", weights.shape) is None
+
+    store.save("abc", weights)
+    loaded = store.load("abc", weights.shape)
+
+    np.testing.assert_array_equal(loaded.toarray(), weights.toarray())
+    # no temporary files are left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["abc.weights"]
+
+
+def test_weight_store_concurrent_save(tmp_path, weights, mocker):
+    store = WeightStore(path=tmp_path)
+    save_spy = mocker.spy(weight_store, "save_csr_arrays")
+
+    # sectors in one process may store the same matrix at the same time
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: store.save("abc", weights), range(8)))
+
+    tmp_paths = [call.args[1] for call in save_spy.call_args_list]
+    assert len(set(tmp_paths)) == len(tmp_paths)
+    np.testing.assert_array_equal(store.load("abc", weights.shape).toarray(), weights.toarray())
+    assert [p.name for p in tmp_path.iterdir()] == ["abc.weights"]
+
+
+def test_weight_store_memory_mapped(tmp_path, weights):
+    store = WeightStore(path=tmp_path)
+    store.save("abc", weights)
+
+    loaded = store.load("abc", weights.shape)
+
+    # arrays are read directly from disk rather than copied into memory
+    for name in ["indptr", "indices", "data"]:
+        array = getattr(loaded, name)
+        while not isinstance(array, np.memmap) and array.base is not None:
+            array = array.base
+        assert isinstance(array, np.memmap)
+    np.testing.assert_array_equal(loaded @ np.ones(4), weights @ np.ones(4))
+
+
+def test_weight_store_migrates_legacy(tmp_path, weights):
+    store = WeightStore(path=tmp_path)
+    save_zipped_pickle(weights, tmp_path / "abc.p.gz")
+
+    loaded = store.load("abc", weights.shape)
+
+    np.testing.assert_array_equal(loaded.toarray(), weights.toarray())
+    assert store.file_path("abc").exists()
+    assert not (tmp_path / "abc.p.gz").exists()
+
+
+def test_weight_store_removes_legacy_named(tmp_path, weights):
+    store = WeightStore.from_cache_path(tmp_path)
+    save_zipped_pickle(weights, tmp_path / "input-domain_weights.p.gz")
+
+    # legacy weights are only found by the name they were saved under
+    assert store.load("abc", weights.shape) is None
+    assert (tmp_path / "input-domain_weights.p.gz").exists()
+
+    # a name doesn't certify the geometry, so the weights aren't migrated
+    assert store.load("abc", weights.shape, legacy_name="input-domain") is None
+    assert not store.file_path("abc").exists()
+    assert not (tmp_path / "input-domain_weights.p.gz").exists()
+
+
+def test_weight_store_shape_mismatch(tmp_path, weights):
+    store = WeightStore(path=tmp_path)
+    store.save("abc", weights)
+
+    assert store.load("abc", (4, 3)) is None
+    # incompatible weights are discarded
+    assert not store.file_path("abc").exists()
+
+
+def test_weight_store_evicts_least_recently_used(tmp_path, weights):
+    store = WeightStore(path=tmp_path, max_bytes=None)
+    for i, key in enumerate(["a", "b", "c"]):
+        store.save(key, weights)
+        os.utime(store.file_path(key), (1000 + i, 1000 + i))
+
+    # loading "a" marks it as recently used
+    store.load("a", weights.shape)
+
+    store.max_bytes = store.size() * 2 // 3
+    store.evict()
+
+    assert store.file_path("a").exists()
+    assert not store.file_path("b").exists()
+    assert store.file_path("c").exists()
+
+
+def test_weight_store_evict_removed_concurrently(tmp_path, weights, mocker):
+    store = WeightStore(path=tmp_path, max_bytes=1)
+    store.save("a", weights)
+    # another process removes a matrix after the store was listed
+    removed = store.file_path("b")
+    mocker.patch.object(WeightStore, "_stored_files", return_value=[removed, store.file_path("a")])
+
+    store.save("c", weights)
+
+    assert store.file_path("c").exists()
+    # neither of the listed matrices remain, which is not an error
+    assert store.size() == 0
+
+
+def test_weight_store_keeps_newest_when_over_limit(tmp_path, weights):
+    store = WeightStore(path=tmp_path, max_bytes=1)
+
+    store.save("a", weights)
+    store.save("b", weights)
+
+    assert not store.file_path("a").exists()
+    assert store.file_path("b").exists()